@@ -1,4 +1,7 @@
 # src/config/file_types.py
+import threading
+from types import MappingProxyType
+
 FILE_TYPES = {
     "images": {
         "extensions": [".jpg", ".jpeg", ".png", ".gif", ".bmp", ".tiff", ".webp"],
@@ -17,7 +20,8 @@ FILE_TYPES = {
         "folder_name": "Áudios"
     },
     "compressed": {
-        "extensions": [".zip", ".rar", ".7z", ".tar", ".gz", ".bz2"],
+        "extensions": [".zip", ".rar", ".7z", ".tar", ".gz", ".bz2", ".xz",
+                       ".tar.gz", ".tar.bz2", ".tar.xz", ".tgz"],
         "folder_name": "Compactados"
     },
     "executables": {
@@ -35,12 +39,83 @@ FILE_TYPES = {
 }
 
 
-def get_file_type(file_extension):
-    """Retorna o tipo de arquivo com base na extensão."""
-    file_extension = file_extension.lower()
+class FileTypeTable:
+    """Tabela compilada (somente leitura) de extensão para tipo de arquivo.
+
+    As extensões são guardadas normalizadas (casefold), com o ponto, e podem ser
+    compostas (".tar.gz"); a busca usa o sufixo mais longo conhecido.
+    """
+
+    def __init__(self, file_types, overrides=None):
+        table = {}
+        for file_type, data in file_types.items():
+            for extension in data["extensions"]:
+                table.setdefault(extension.casefold(), file_type)
+
+        # Extensões extras definidas pelo usuário têm prioridade
+        for extension, file_type in (overrides or {}).items():
+            if file_type in file_types:
+                if not extension.startswith("."):
+                    extension = "." + extension
+                table[extension.casefold()] = file_type
+
+        self.extensions = MappingProxyType(table)
+        # Maior número de partes de uma extensão composta (".tar.gz" = 2)
+        self.max_parts = max((extension.count(".") for extension in table), default=1)
+
+    def classify(self, file_name):
+        """Retorna o tipo de um arquivo a partir do nome (sem o diretório)."""
+        name = file_name.casefold()
+        extensions = self.extensions
+
+        # Percorre os pontos da direita para a esquerda, guardando o sufixo mais longo
+        found = "others"
+        end = len(name)
+        for _ in range(self.max_parts):
+            dot = name.rfind(".", 0, end)
+            # Um ponto no início é arquivo oculto, não extensão (como em os.path.splitext)
+            if dot <= 0:
+                break
+            file_type = extensions.get(name[dot:])
+            if file_type is not None:
+                found = file_type
+            end = dot
+        return found
+
+    def classify_many(self, file_names):
+        """Retorna a lista de tipos de vários nomes de arquivo."""
+        classify = self.classify
+        return [classify(file_name) for file_name in file_names]
+
 
-    for file_type, data in FILE_TYPES.items():
-        if file_extension in data["extensions"]:
-            return file_type
+# Tabela em uso; substituída inteira em reload_file_types (troca atômica)
+_table = FileTypeTable(FILE_TYPES)
+_reload_lock = threading.Lock()
 
-    return "others"
\ No newline at end of file
+
+def get_file_type_table():
+    """Retorna a tabela compilada em uso."""
+    return _table
+
+
+def reload_file_types(overrides=None):
+    """Recompila a tabela de extensões (ex.: quando as extensões extras mudam)."""
+    global _table
+    with _reload_lock:
+        _table = FileTypeTable(FILE_TYPES, overrides)
+    return _table
+
+
+def classify_file(file_name):
+    """Retorna o tipo de um arquivo a partir do nome."""
+    return _table.classify(file_name)
+
+
+def classify_files(file_names):
+    """Retorna os tipos de vários nomes de arquivo em uma única chamada."""
+    return _table.classify_many(file_names)
+
+
+def get_file_type(file_extension):
+    """Retorna o tipo de arquivo com base na extensão."""
+    return _table.extensions.get(file_extension.casefold(), "others")
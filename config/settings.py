@@ -1,12 +1,73 @@
 # src/config/settings.py
 import os
+import copy
 import json
 
 
+# Configurações padrão (também usadas para chaves ausentes em arquivos antigos)
+DEFAULT_SETTINGS = {
+    "auto_start": True,
+    "show_notifications": True,
+    "auto_organize_on_start": True,
+    "check_interval": 1.0,  # segundos
+    "last_folders": [],
+    # Meta de tempo de inicialização (segundos); acima dela, um aviso nos logs
+    "startup_target_seconds": 1.0,
+    # Extensões extras por tipo de arquivo ({".ext": "tipo"}), aplicadas sem reiniciar
+    "custom_extensions": {},
+    # Classificação pelo conteúdo de arquivos sem extensão conhecida
+    "content_sniffing": True,
+    "sniff_cache_size": 10000,
+    # Detecção de duplicados pelo conteúdo (desativada por padrão)
+    "duplicate_detection": False,
+    "duplicate_action": "quarantine",  # skip, hardlink ou quarantine
+    "duplicate_hash_workers": 2,
+    # Pool de workers entre o watchdog e o organizador
+    "worker_pool_size": 4,
+    "worker_queue_size": 10000,
+    "backpressure_policy": "block",  # block, drop_newest ou drop_oldest
+    "max_moves_per_device": 2,  # movimentações simultâneas por dispositivo
+    # Subpastas monitoradas (0 = apenas a pasta, None = sem limite) e padrões
+    # de exclusão no estilo .gitignore; cada pasta pode ter sua própria profundidade
+    "watch_max_depth": 0,
+    "watch_ignore_patterns": [".git/", ".hg/", ".svn/", "node_modules/", "__pycache__/",
+                              ".venv/"],
+    # Regras de organização (lista de dicionários, ver core/rules.py); a primeira
+    # regra satisfeita define o destino, aplicadas sem reiniciar
+    "routing_rules": [],
+    # Detecção de arquivos estáveis (segundos)
+    "stability_window": 1.0,
+    "stability_min_interval": 0.05,
+    "stability_max_interval": 5.0,
+    # Cache de arquivos já processados (compartilhado entre as pastas)
+    "dedup_cache_size": 10000,
+    "dedup_cache_ttl": 600.0,  # segundos
+    # Rotação do app.log
+    "log_file_max_mb": 5,
+    "log_file_backups": 5,
+    "log_file_max_age_days": 7,
+    "log_file_compress": True,
+    # Retenção da tabela de logs (None desativa o limite)
+    "log_retention_days": 30,
+    "log_retention_max_rows": 1000000,
+    "log_retention_interval_hours": 6,
+    "log_retention_chunk_size": 5000,
+}
+
+
+def get_setting(settings, key):
+    """Obtém uma configuração, usando o valor padrão quando não há Settings."""
+    if settings is not None:
+        return settings.get(key)
+    return DEFAULT_SETTINGS.get(key)
+
+
 class Settings:
     def __init__(self, settings_file="config.json"):
         self.settings_file = settings_file
         self.settings = self._load_settings()
+        # Funções chamadas quando uma configuração muda: chave -> [callbacks]
+        self._listeners = {}
 
     def _load_settings(self):
         """Carrega as configurações do arquivo ou cria padrão."""
@@ -18,13 +79,7 @@ class Settings:
                 pass
 
         # Configurações padrão
-        return {
-            "auto_start": True,
-            "show_notifications": True,
-            "auto_organize_on_start": True,
-            "check_interval": 1.0,  # segundos
-            "last_folders": []
-        }
+        return copy.deepcopy(DEFAULT_SETTINGS)
 
     def save(self):
         """Salva as configurações no arquivo."""
@@ -37,9 +92,18 @@ class Settings:
 
     def get(self, key, default=None):
         """Obtém uma configuração pelo nome."""
+        if default is None:
+            default = DEFAULT_SETTINGS.get(key)
         return self.settings.get(key, default)
 
     def set(self, key, value):
         """Define uma configuração."""
         self.settings[key] = value
-        self.save()
\ No newline at end of file
+        self.save()
+
+        for callback in self._listeners.get(key, []):
+            callback(value)
+
+    def subscribe(self, key, callback):
+        """Registra uma função chamada com o novo valor sempre que a configuração mudar."""
+        self._listeners.setdefault(key, []).append(callback)
@@ -0,0 +1,150 @@
+# src/core/content_sniffer.py
+import os
+import threading
+from collections import OrderedDict
+
+# Assinaturas conhecidas: (tipo, [(deslocamento, bytes), ...]); todas as partes
+# precisam coincidir. Assinaturas mais específicas são testadas primeiro.
+SIGNATURES = [
+    # Imagens
+    ("images", [(0, b"\xff\xd8\xff")]),
+    ("images", [(0, b"\x89PNG\r\n\x1a\n")]),
+    ("images", [(0, b"GIF87a")]),
+    ("images", [(0, b"GIF89a")]),
+    ("images", [(0, b"RIFF"), (8, b"WEBP")]),
+    ("images", [(0, b"II*\x00")]),
+    ("images", [(0, b"MM\x00*")]),
+    ("images", [(4, b"ftypheic")]),
+    ("images", [(4, b"ftypavif")]),
+    # Documentos (OOXML e ODF são zip com um marcador no primeiro item)
+    ("documents", [(0, b"%PDF-")]),
+    ("documents", [(0, b"{\\rtf")]),
+    ("documents", [(0, b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1")]),
+    ("documents", [(0, b"PK\x03\x04"), (30, b"[Content_Types].xml")]),
+    ("documents", [(0, b"PK\x03\x04"), (30, b"mimetypeapplication/vnd.oasis")]),
+    # Áudios
+    ("audio", [(0, b"ID3")]),
+    ("audio", [(0, b"fLaC")]),
+    ("audio", [(0, b"OggS")]),
+    ("audio", [(0, b"RIFF"), (8, b"WAVE")]),
+    ("audio", [(4, b"ftypM4A")]),
+    ("audio", [(0, b"\xff\xfb")]),
+    ("audio", [(0, b"\xff\xf3")]),
+    ("audio", [(0, b"\xff\xf2")]),
+    # Vídeos
+    ("videos", [(0, b"RIFF"), (8, b"AVI ")]),
+    ("videos", [(0, b"\x1a\x45\xdf\xa3")]),
+    ("videos", [(0, b"FLV\x01")]),
+    ("videos", [(0, b"\x30\x26\xb2\x75\x8e\x66\xcf\x11")]),
+    ("videos", [(4, b"ftyp")]),
+    # Compactados
+    ("compressed", [(0, b"PK\x03\x04")]),
+    ("compressed", [(0, b"Rar!\x1a\x07")]),
+    ("compressed", [(0, b"7z\xbc\xaf\x27\x1c")]),
+    ("compressed", [(0, b"\x1f\x8b")]),
+    ("compressed", [(0, b"BZh")]),
+    ("compressed", [(0, b"\xfd7zXZ\x00")]),
+    ("compressed", [(257, b"ustar")]),
+    # Executáveis
+    ("executables", [(0, b"MZ")]),
+    ("executables", [(0, b"\x7fELF")]),
+    # Código (scripts com shebang)
+    ("code", [(0, b"#!")]),
+]
+
+
+def _compile(signatures):
+    """Agrupa as assinaturas pelo primeiro byte para testar só as candidatas."""
+    by_first_byte = {}
+    by_offset = []
+    header_size = 0
+
+    for position, (file_type, parts) in enumerate(signatures):
+        header_size = max(header_size, max(offset + len(magic) for offset, magic in parts))
+        entry = (position, file_type, tuple(parts))
+
+        offset, magic = parts[0]
+        if offset == 0:
+            by_first_byte.setdefault(magic[0], []).append(entry)
+        else:
+            by_offset.append(entry)
+
+    return by_first_byte, by_offset, header_size
+
+
+class ContentSniffer:
+    """Classifica arquivos pelos primeiros bytes (assinaturas "mágicas").
+
+    Lê apenas o cabeçalho necessário para a maior assinatura, com uma única
+    leitura, e guarda o resultado por (dispositivo, inode, tamanho, mtime),
+    então um arquivo já visto não custa nenhuma E/S.
+    """
+
+    def __init__(self, cache_size=10000, signatures=None):
+        self.cache_size = max(1, int(cache_size))
+        self._by_first_byte, self._by_offset, self.header_size = _compile(
+            signatures or SIGNATURES)
+
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def sniff(self, file_path, record=None):
+        """Retorna o tipo do arquivo pelo conteúdo, ou None se não reconhecido."""
+        if record is not None:
+            key = (record.dev, record.inode, record.size, record.mtime_ns)
+            with self._lock:
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    self.hits += 1
+                    return self._cache[key]
+
+        try:
+            header = self._read_header(file_path)
+        except OSError:
+            return None
+
+        file_type = self.match(header)
+
+        if record is not None:
+            with self._lock:
+                self.misses += 1
+                self._cache[key] = file_type
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        return file_type
+
+    def match(self, header):
+        """Retorna o tipo correspondente a um cabeçalho, ou None."""
+        if not header:
+            return None
+
+        # A assinatura que aparece primeiro na tabela vence
+        best = None
+        for candidates in (self._by_first_byte.get(header[0], ()), self._by_offset):
+            for position, file_type, parts in candidates:
+                if best is not None and position >= best[0]:
+                    break
+                if all(header.startswith(magic, offset) for offset, magic in parts):
+                    best = (position, file_type)
+                    break
+
+        return best[1] if best else None
+
+    def stats(self):
+        """Retorna os contadores do cache."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._cache)}
+
+    def _read_header(self, file_path):
+        """Lê o cabeçalho do arquivo com uma única chamada."""
+        fd = os.open(file_path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+        try:
+            if hasattr(os, "pread"):
+                return os.pread(fd, self.header_size, 0)
+            return os.read(fd, self.header_size)
+        finally:
+            os.close(fd)
@@ -0,0 +1,62 @@
+# src/core/daemon.py
+import sys
+import signal
+import threading
+from core.startup import StartupTimer
+
+# Intervalo (segundos) para verificar o fim da organização inicial
+SWEEP_CHECK_INTERVAL = 0.5
+
+
+class HeadlessDaemon:
+    """Executa o monitoramento sem interface gráfica (servidores sem tela).
+
+    Monta as pastas cadastradas, registra quando a organização inicial de
+    todas termina (estado estável) e encerra de forma limpa com SIGINT ou
+    SIGTERM, gravando o diário, os retratos e os logs pendentes.
+    """
+
+    def __init__(self, services, timer=None):
+        self.services = services
+        self.logger = services.logger
+        # Tempos da inicialização (desde o início do processo, quando informado)
+        self.timer = timer or StartupTimer()
+        self._stop_event = threading.Event()
+
+    def request_stop(self, signum=None, frame=None):
+        """Solicita o encerramento (também usado como tratador de sinais)."""
+        self._stop_event.set()
+
+    def install_signal_handlers(self):
+        """Encerra com SIGINT/SIGTERM (e SIGHUP/SIGBREAK, quando existirem)."""
+        for name in ("SIGINT", "SIGTERM", "SIGHUP", "SIGBREAK"):
+            signum = getattr(signal, name, None)
+            if signum is not None:
+                signal.signal(signum, self.request_stop)
+
+    def run(self):
+        """Inicia os serviços e bloqueia até receber um sinal de encerramento."""
+        self.install_signal_handlers()
+
+        self.services.start()
+        self.timer.mark("observador")
+        folders = self.services.watch_folders()
+        self.timer.mark("pastas")
+
+        self.logger.info("Modo sem interface iniciado", f"{folders} pastas")
+        self.timer.log(self.logger, self.services.settings.get("startup_target_seconds"))
+        if "--startup-report" in sys.argv[1:]:
+            print(self.timer.report(), file=sys.stderr)
+
+        steady = False
+        try:
+            # wait com timeout mantém o processo responsivo aos sinais
+            while not self._stop_event.wait(SWEEP_CHECK_INTERVAL):
+                if not steady and not self.services.folder_watcher.sweep_progress():
+                    steady = True
+                    self.logger.info("Organização inicial concluída em todas as pastas",
+                                     f"{self.timer.elapsed():.2f}s após o início")
+        finally:
+            self.logger.info("Encerrando modo sem interface", "")
+            self.services.stop()
+        return 0
@@ -0,0 +1,66 @@
+# src/core/dedup_cache.py
+import time
+import threading
+from collections import OrderedDict
+
+
+class DedupCache:
+    """Cache LRU com validade (TTL) para evitar processar o mesmo arquivo duas vezes.
+
+    As chaves ficam em ordem de uso; como todas têm a mesma validade, as mais
+    antigas expiram primeiro e a remoção é sempre feita pelo início (O(1)).
+    """
+
+    def __init__(self, max_size=10000, ttl=600.0):
+        self.max_size = max(1, int(max_size))
+        self.ttl = ttl
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Contadores
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def check_and_add(self, key):
+        """Retorna True se a chave já foi vista; caso contrário registra e retorna False."""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._entries[key] = now + self.ttl
+                self.hits += 1
+                return True
+
+            self.misses += 1
+            self._entries[key] = now + self.ttl
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            return False
+
+    def stats(self):
+        """Retorna os contadores do cache."""
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def _expire(self, now):
+        """Remove as chaves vencidas do início da fila (chamar com o lock)."""
+        while self._entries:
+            key, expires_at = next(iter(self._entries.items()))
+            if expires_at > now:
+                break
+            del self._entries[key]
+            self.evictions += 1
@@ -0,0 +1,217 @@
+# src/core/dispatcher.py
+import os
+import queue
+import threading
+from collections import deque
+
+
+# Políticas aceitas quando a fila de organização está cheia
+BACKPRESSURE_POLICIES = ("block", "drop_newest", "drop_oldest")
+
+_STOP = object()
+
+
+def _parent_key(file_path, record):
+    """Chave padrão: a pasta do arquivo."""
+    return os.path.dirname(file_path), record
+
+
+class FileDispatcher:
+    """Pool de workers entre os eventos do watchdog e o organizador.
+
+    Os eventos são apenas enfileirados pela thread do observador. Os workers
+    processam arquivos em paralelo, mas arquivos com a mesma chave (a pasta de
+    destino) são sempre processados em série, um de cada vez. A chave é obtida
+    pelo worker com key_func(caminho, record), que retorna (chave, record) e
+    pode criar o record para o handler. O número de movimentações simultâneas
+    em um mesmo dispositivo também pode ser limitado.
+    """
+
+    def __init__(self, handler, logger, key_func=None, pool_size=4,
+                 queue_size=10000, policy="block", max_per_device=None):
+        if policy not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"Política de backpressure inválida: {policy}")
+
+        self.handler = handler
+        self.logger = logger
+        self.key_func = key_func or _parent_key
+        self.pool_size = max(1, int(pool_size))
+        self.queue_size = max(1, int(queue_size))
+        self.policy = policy
+        self.max_per_device = max_per_device
+
+        # Fila global (sem limite próprio: o limite é controlado por _slots)
+        self._queue = queue.Queue()
+        self._slots = threading.BoundedSemaphore(self.queue_size)
+
+        # Chaves em processamento -> itens aguardando a mesma chave
+        self._active_keys = {}
+        self._keys_lock = threading.Lock()
+
+        # Dispositivo de cada diretório de origem e vagas por dispositivo
+        self._devices = {}
+        self._device_slots = {}
+        self._devices_lock = threading.Lock()
+
+        # Contador de itens pendentes (para wait_idle)
+        self._pending = 0
+        self._idle = threading.Condition()
+
+        self._workers = []
+        self.dropped = 0
+
+    def start(self):
+        """Inicia as threads do pool."""
+        if self._workers:
+            return
+
+        for i in range(self.pool_size):
+            worker = threading.Thread(target=self._worker, name=f"FileDispatcher-{i}",
+                                      daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def stop(self, timeout=None):
+        """Processa os itens restantes e encerra os workers."""
+        for _ in self._workers:
+            self._queue.put(_STOP)
+
+        for worker in self._workers:
+            worker.join(timeout)
+
+        self._workers = []
+
+    def submit(self, file_path, record=None, on_done=None, block=None):
+        """Enfileira um arquivo para organização sem esperar o processamento.
+
+        record é o FileRecord já obtido por uma varredura (repassado ao handler)
+        e on_done é chamado com o caminho quando o item sai do pool, mesmo se
+        tiver sido descartado. Retorna False quando o arquivo foi descartado
+        pela política de backpressure (nesse caso on_done não é chamado).
+        """
+        if block is None:
+            block = self.policy == "block"
+
+        if not self._slots.acquire(blocking=block):
+            if not (self.policy == "drop_oldest" and self._drop_oldest()):
+                self.dropped += 1
+                self.logger.warning("Fila de organização cheia, arquivo ignorado", file_path)
+                return False
+
+        with self._idle:
+            self._pending += 1
+
+        self._queue.put((file_path, record, on_done))
+        return True
+
+    def wait_idle(self, timeout=None):
+        """Aguarda até que não haja arquivos pendentes."""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+
+    def pending_count(self):
+        """Retorna o número de arquivos enfileirados ou em processamento."""
+        with self._idle:
+            return self._pending
+
+    def _drop_oldest(self):
+        """Descarta o item mais antigo da fila global, reaproveitando sua vaga."""
+        try:
+            item = self._queue.get_nowait()
+        except queue.Empty:
+            return False
+
+        if item is _STOP:
+            self._queue.put(_STOP)
+            return False
+
+        self.dropped += 1
+        self.logger.warning("Fila de organização cheia, arquivo antigo descartado", item[0])
+        self._finish(item)
+
+        with self._idle:
+            self._pending -= 1
+        return True
+
+    def _worker(self):
+        """Consome a fila global, serializando o trabalho por chave."""
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+
+            file_path, record, on_done = item
+            try:
+                key, record = self.key_func(file_path, record)
+                item = (file_path, record, on_done)
+            except Exception:
+                key = os.path.dirname(file_path)
+
+            # Se outro worker já está com essa chave, ele processa este item depois
+            with self._keys_lock:
+                if key in self._active_keys:
+                    self._active_keys[key].append(item)
+                    continue
+                self._active_keys[key] = deque()
+
+            while True:
+                self._run(item)
+
+                with self._keys_lock:
+                    waiting = self._active_keys[key]
+                    if not waiting:
+                        del self._active_keys[key]
+                        break
+                    item = waiting.popleft()
+
+    def _device_slot(self, file_path, record):
+        """Retorna o semáforo do dispositivo de origem do arquivo (None se sem limite)."""
+        if not self.max_per_device:
+            return None
+
+        directory = os.path.dirname(file_path)
+        device = record.dev if record is not None else self._devices.get(directory)
+        if device is None:
+            try:
+                device = os.stat(directory).st_dev
+            except OSError:
+                return None
+
+        with self._devices_lock:
+            self._devices[directory] = device
+            slot = self._device_slots.get(device)
+            if slot is None:
+                slot = threading.Semaphore(max(1, int(self.max_per_device)))
+                self._device_slots[device] = slot
+            return slot
+
+    def _run(self, item):
+        """Executa o handler para um item e libera sua vaga na fila."""
+        file_path, record, _ = item
+        try:
+            device_slot = self._device_slot(file_path, record)
+            if device_slot is None:
+                self.handler(file_path, record)
+            else:
+                with device_slot:
+                    self.handler(file_path, record)
+        except Exception as e:
+            self.logger.error("Erro ao processar arquivo", f"{file_path}: {str(e)}")
+        finally:
+            self._finish(item)
+            self._slots.release()
+            with self._idle:
+                self._pending -= 1
+                if self._pending == 0:
+                    self._idle.notify_all()
+
+    def _finish(self, item):
+        """Avisa quem enfileirou o item de que ele saiu do pool."""
+        file_path, _, on_done = item
+        if on_done is None:
+            return
+
+        try:
+            on_done(file_path)
+        except Exception as e:
+            self.logger.error("Erro ao finalizar arquivo", f"{file_path}: {str(e)}")
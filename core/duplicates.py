@@ -0,0 +1,128 @@
+# src/core/duplicates.py
+import os
+import hashlib
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+# O que fazer com um arquivo cujo conteúdo já existe nas subpastas organizadas
+DUPLICATE_ACTIONS = ("skip", "hardlink", "quarantine")
+
+# Resultado da busca: hashes do arquivo e o caminho do original (ou None)
+DuplicateMatch = namedtuple("DuplicateMatch", ["partial_hash", "full_hash", "original"])
+
+
+class DuplicateDetector:
+    """Detecta arquivos com conteúdo igual ao de um arquivo já organizado.
+
+    Cada arquivo organizado fica registrado no banco com tamanho, um hash
+    parcial (início e fim do arquivo) e, quando necessário, o hash completo.
+    O hash parcial descarta quase todos os candidatos com uma leitura
+    pequena; o BLAKE2 completo só é calculado quando tamanho e hash parcial
+    coincidem, em blocos e em paralelo no pool de threads.
+    """
+
+    def __init__(self, db, logger, action="quarantine", workers=2,
+                 sample_size=64 * 1024, chunk_size=1024 * 1024):
+        if action not in DUPLICATE_ACTIONS:
+            raise ValueError(f"Ação para duplicados inválida: {action}")
+
+        self.db = db
+        self.logger = logger
+        self.action = action
+        self.sample_size = sample_size
+        self.chunk_size = chunk_size
+        self._executor = ThreadPoolExecutor(max_workers=max(1, int(workers)),
+                                            thread_name_prefix="DuplicateHash")
+
+    def stop(self):
+        """Encerra o pool de hashing."""
+        self._executor.shutdown(wait=True)
+
+    def find(self, file_path, record):
+        """Procura um arquivo organizado com o mesmo conteúdo de record."""
+        # Arquivos vazios não são tratados como duplicados
+        if record.size == 0:
+            return DuplicateMatch(None, None, None)
+
+        partial_hash = self._partial_hash(file_path, record.size)
+        # Arquivos pequenos cabem inteiros na amostra: o hash parcial já é completo
+        whole = record.size <= 2 * self.sample_size
+
+        candidates = []
+        for row in self.db.find_file_hashes(record.size, partial_hash):
+            if row["path"] == file_path:
+                continue
+            try:
+                stat = os.stat(row["path"])
+            except OSError:
+                stat = None
+            if stat is None or stat.st_size != row["size"] or stat.st_mtime_ns != row["mtime_ns"]:
+                # Original removido ou alterado desde o registro
+                self.db.delete_file_hash(row["path"])
+                continue
+            candidates.append(row)
+
+        if not candidates:
+            return DuplicateMatch(partial_hash, partial_hash if whole else None, None)
+
+        if whole:
+            return DuplicateMatch(partial_hash, partial_hash, candidates[0]["path"])
+
+        # Hash completo do arquivo novo e dos candidatos que ainda não o têm, em paralelo
+        pending = [row["path"] for row in candidates if not row["full_hash"]]
+        results = self._executor.map(self._full_hash, [file_path] + pending)
+        full_hash = next(results)
+        computed = dict(zip(pending, results))
+        for path, value in computed.items():
+            self.db.set_full_hash(path, value)
+
+        for row in candidates:
+            if (row["full_hash"] or computed.get(row["path"])) == full_hash:
+                return DuplicateMatch(partial_hash, full_hash, row["path"])
+
+        return DuplicateMatch(partial_hash, full_hash, None)
+
+    def register(self, path, record, match):
+        """Registra um arquivo organizado no índice de hashes."""
+        if match.partial_hash is None:
+            return
+        self.db.add_file_hash(path, record.size, record.mtime_ns,
+                              match.partial_hash, match.full_hash)
+
+    def link(self, original, path):
+        """Substitui path por um hard link para original; retorna False se não for possível."""
+        temporary = path + ".link"
+        try:
+            os.link(original, temporary)
+            os.replace(temporary, path)
+            return True
+        except OSError as e:
+            self.logger.warning("Não foi possível criar hard link", f"{path}: {str(e)}")
+            try:
+                os.unlink(temporary)
+            except OSError:
+                pass
+            return False
+
+    def _partial_hash(self, file_path, size):
+        """Hash do início e do fim do arquivo."""
+        digest = hashlib.blake2b(digest_size=16)
+        with open(file_path, "rb") as f:
+            digest.update(f.read(self.sample_size))
+            if size > self.sample_size:
+                f.seek(max(self.sample_size, size - self.sample_size))
+                digest.update(f.read(self.sample_size))
+        return digest.hexdigest()
+
+    def _full_hash(self, file_path):
+        """Hash BLAKE2 do arquivo inteiro, lido em blocos."""
+        digest = hashlib.blake2b()
+        buffer = bytearray(self.chunk_size)
+        view = memoryview(buffer)
+        with open(file_path, "rb", buffering=0) as f:
+            while True:
+                read = f.readinto(buffer)
+                if not read:
+                    break
+                digest.update(view[:read])
+        return digest.hexdigest()
@@ -1,69 +1,255 @@
 # src/core/file_organizer.py
 import os
-import shutil
-from config.file_types import get_file_type, FILE_TYPES
+import stat
+from config.file_types import classify_file, classify_files, FILE_TYPES
+from core.scanner import FileRecord, scan_files
+from core.name_index import NameIndex
+from core.mover import FileMover
+
+# Subpasta de quarentena para arquivos duplicados
+DUPLICATES_FOLDER_NAME = "Duplicados"
+
+# Nomes das subpastas criadas pelo organizador (ignoradas nas varreduras)
+CATEGORY_FOLDER_NAMES = frozenset(
+    [data["folder_name"] for data in FILE_TYPES.values()] + [DUPLICATES_FOLDER_NAME])
 
 
 class FileOrganizer:
-    def __init__(self, logger):
+    def __init__(self, logger, ledger=None, sniffer=None, mover=None, duplicates=None,
+                 journal=None, rules=None):
         self.logger = logger
+        # Registro incremental de espaço ocupado (opcional)
+        self.ledger = ledger
+        # Classificação pelo conteúdo quando a extensão não é conhecida (opcional)
+        self.sniffer = sniffer
+        # Subpastas de destino já criadas (evita um mkdir por arquivo)
+        self._known_dirs = set()
+        # Nomes ocupados nas subpastas de destino (resolve conflitos sem sondar o disco)
+        self.names = NameIndex()
+        # Movimentação (renomeação no mesmo dispositivo, cópia entre dispositivos)
+        self.mover = mover or FileMover()
+        # Detecção de arquivos duplicados pelo conteúdo (opcional)
+        self.duplicates = duplicates
+        # Diário de movimentações para recuperação após uma queda (opcional)
+        self.journal = journal
+        # Regras de organização definidas pelo usuário (opcional)
+        self.rules = rules
+
+    def get_file_type(self, file_path):
+        """Retorna o tipo de um arquivo a partir do nome."""
+        return classify_file(os.path.basename(file_path))
+
+    def classify_many(self, file_paths):
+        """Retorna os tipos de vários arquivos em uma única chamada."""
+        return classify_files([os.path.basename(file_path) for file_path in file_paths])
+
+    def get_target_dir(self, file_path, record=None):
+        """Retorna (pasta de destino, record) de um arquivo.
 
-    def organize_file(self, file_path):
-        """Organiza um arquivo em sua pasta apropriada."""
+        É a mesma pasta que organize_file usará (conteúdo e regras incluídos);
+        o record obtido aqui é repassado para evitar um segundo stat. Arquivo
+        ausente ou diretório: (pasta do arquivo, None).
+        """
+        if record is None:
+            record = self._stat_record(file_path)
+            if record is None:
+                return os.path.dirname(file_path), None
+        return self.resolve_target(file_path, record)[2], record
+
+    def organize_file(self, file_path, record=None, file_type=None):
+        """Organiza um arquivo em sua pasta apropriada.
+
+        record: FileRecord da varredura, evitando um novo stat do arquivo.
+        file_type: tipo já classificado (ex.: por classify_many).
+        """
         try:
-            if not os.path.exists(file_path) or os.path.isdir(file_path):
-                return False
+            if record is None:
+                record = self._stat_record(file_path)
+                if record is None:
+                    return False
 
-            # Obtém diretório pai e extensão
             parent_dir = os.path.dirname(file_path)
-            file_name = os.path.basename(file_path)
-            file_extension = os.path.splitext(file_name)[1]
-
-            # Determina o tipo de arquivo
-            file_type = get_file_type(file_extension)
-            target_subfolder = FILE_TYPES[file_type]["folder_name"]
-
-            # Cria o subdiretório se não existir
-            target_dir = os.path.join(parent_dir, target_subfolder)
-            os.makedirs(target_dir, exist_ok=True)
-
-            # Move o arquivo
-            target_path = os.path.join(target_dir, file_name)
-
-            # Se já existir um arquivo com esse nome, adiciona um número
-            if os.path.exists(target_path):
-                base_name, ext = os.path.splitext(file_name)
-                counter = 1
-                while os.path.exists(target_path):
-                    new_name = f"{base_name}_{counter}{ext}"
-                    target_path = os.path.join(target_dir, new_name)
-                    counter += 1
-
-            shutil.move(file_path, target_path)
-            self.logger.info("Arquivo movido", f"De {file_path} para {target_path}")
+            file_name = record.name
+            file_type, type_dir, target_dir = self.resolve_target(file_path, record, file_type)
+
+            # Conteúdo já organizado antes: ignora ou separa conforme a configuração
+            match = None
+            if self.duplicates:
+                match = self.duplicates.find(file_path, record)
+                if match.original:
+                    if self.duplicates.action == "skip":
+                        self.logger.info("Arquivo duplicado ignorado",
+                                         f"{file_path} (igual a {match.original})", folder=parent_dir)
+                        return False
+                    if self.duplicates.action == "quarantine":
+                        target_dir = os.path.join(parent_dir, DUPLICATES_FOLDER_NAME)
+
+            target_path = self._relocate(file_path, record, file_type, target_dir, file_name)
+
+            if match is not None and match.original:
+                if self.duplicates.action == "quarantine":
+                    self.logger.info("Arquivo duplicado em quarentena",
+                                     f"De {file_path} para {target_path} (igual a {match.original})",
+                                     folder=parent_dir)
+                    return True
+
+                # Mesmo conteúdo: o arquivo organizado vira um hard link para o original
+                if self.duplicates.link(match.original, target_path):
+                    self.logger.info("Arquivo duplicado vinculado",
+                                     f"{target_path} -> {match.original}", folder=parent_dir)
+            elif match is not None:
+                self.duplicates.register(target_path, record, match)
+
+            self._record_move(parent_dir, file_type, type_dir, target_path, record.size)
+
+            self.logger.info("Arquivo movido", f"De {file_path} para {target_path}",
+                             folder=os.path.dirname(file_path))
             return True
 
         except Exception as e:
-            self.logger.error("Erro ao organizar arquivo", f"{file_path}: {str(e)}")
+            self.logger.error("Erro ao organizar arquivo", f"{file_path}: {str(e)}",
+                              folder=os.path.dirname(file_path))
             return False
 
-    def organize_directory(self, directory):
-        """Organiza todos os arquivos em um diretório."""
+    def _stat_record(self, file_path):
+        """Cria o FileRecord de um arquivo (None se não existir ou for um diretório)."""
+        try:
+            file_stat = os.stat(file_path)
+        except FileNotFoundError:
+            return None
+        if stat.S_ISDIR(file_stat.st_mode):
+            return None
+        return FileRecord(file_path, os.path.basename(file_path), file_stat.st_size,
+                          file_stat.st_mtime_ns, file_stat.st_ino, file_stat.st_dev)
+
+    def resolve_target(self, file_path, record, file_type=None):
+        """Classifica o arquivo e retorna (tipo, subpasta do tipo, pasta de destino)."""
+        if file_type is None:
+            file_type = self.get_file_type(file_path)
+
+        # Sem extensão conhecida: tenta identificar pelos primeiros bytes
+        if file_type == "others" and self.sniffer:
+            file_type = self.sniffer.sniff(file_path, record) or "others"
+
+        # Determina a subpasta pelo tipo de arquivo (ou por uma regra do usuário)
+        type_dir = os.path.join(os.path.dirname(file_path), FILE_TYPES[file_type]["folder_name"])
+        target_dir = None
+        if self.rules:
+            target_dir = self.rules.route(file_path, record, file_type)
+        return file_type, type_dir, target_dir or type_dir
+
+    def apply_move(self, source, destination, file_type, inode, mtime_ns, pinned=None):
+        """Executa um movimento planejado (ex.: pelo MovePlanner) sem reclassificar.
+
+        Retorna "moved", "missing", "changed" (o arquivo mudou desde o plano) ou
+        "pinned" (fixado em pinned depois do plano, ex.: devolvido por um desfazer).
+        Se o nome de destino foi ocupado depois do plano, recebe um número.
+        """
+        try:
+            file_stat = os.stat(source)
+        except FileNotFoundError:
+            return "missing"
+        if file_stat.st_ino != inode or file_stat.st_mtime_ns != mtime_ns:
+            return "changed"
+        if pinned and pinned.is_pinned(source, inode, mtime_ns):
+            return "pinned"
+
+        parent_dir = os.path.dirname(source)
+        record = FileRecord(source, os.path.basename(source), file_stat.st_size,
+                            file_stat.st_mtime_ns, file_stat.st_ino, file_stat.st_dev)
+        target_dir = os.path.dirname(destination)
+        target_path = self._relocate(source, record, file_type, target_dir,
+                                     os.path.basename(destination))
+
+        type_dir = os.path.join(parent_dir, FILE_TYPES[file_type]["folder_name"])
+        self._record_move(parent_dir, file_type, type_dir, target_path, record.size)
+
+        self.logger.info("Arquivo movido", f"De {source} para {target_path} (plano)",
+                         folder=parent_dir)
+        return "moved"
+
+    def _relocate(self, file_path, record, file_type, target_dir, file_name):
+        """Reserva o nome no destino, registra no diário e move; retorna o caminho final."""
+        parent_dir = os.path.dirname(file_path)
+        self._ensure_dir(target_dir)
+
+        # Reserva o nome de destino (com um número se o nome já existir)
+        try:
+            target_path = self.names.reserve(target_dir, file_name)
+        except FileNotFoundError:
+            # A subpasta pode ter sido removida depois de criada
+            self._known_dirs.discard(target_dir)
+            self.names.forget(target_dir)
+            self._ensure_dir(target_dir)
+            target_path = self.names.reserve(target_dir, file_name)
+
+        # Registra o movimento antes de executá-lo
+        entry_id = None
+        if self.journal:
+            entry_id = self.journal.plan(file_path, target_path, parent_dir, file_type,
+                                         record.size, record.inode, record.mtime_ns)
+
+        # Move o arquivo, substituindo o arquivo vazio da reserva
         try:
-            files = [os.path.join(directory, f) for f in os.listdir(directory)
-                     if os.path.isfile(os.path.join(directory, f))]
+            self.mover.move(file_path, target_path, record.dev)
+        except Exception:
+            self.names.release(target_path)
+            if self.journal:
+                self.journal.finish(entry_id, "failed")
+            raise
 
-            # Exclui arquivos dentro de subpastas já organizadas
-            for file_type in FILE_TYPES.values():
-                subfolder = os.path.join(directory, file_type["folder_name"])
-                if subfolder in files:
-                    files.remove(subfolder)
+        if self.journal:
+            self.journal.finish(entry_id)
+        return target_path
 
-            # Organiza cada arquivo
-            for file_path in files:
-                self.organize_file(file_path)
+    def _record_move(self, parent_dir, file_type, type_dir, target_path, size):
+        """Contabiliza o movimento no registro de espaço.
+
+        Só conta o que fica dentro da subpasta do tipo (uma regra pode mandar o
+        arquivo para outro lugar).
+        """
+        if self.ledger and target_path.startswith(type_dir + os.sep):
+            self.ledger.record_move(parent_dir, file_type, size, target_path)
+
+    def recover_journal(self):
+        """Conclui ou desfaz os movimentos que estavam em andamento na última execução."""
+        if not self.journal:
+            return {}
+
+        counts = self.journal.recover(self.mover, on_replayed=self._on_replayed)
+        if counts:
+            details = ", ".join(f"{state}={count}" for state, count in sorted(counts.items()))
+            self.logger.info("Recuperação de movimentações interrompidas", details)
+        return counts
+
+    def _on_replayed(self, entry):
+        """Contabiliza um movimento refeito pela recuperação."""
+        if self.ledger and os.path.basename(os.path.dirname(entry["destination"])) \
+                != DUPLICATES_FOLDER_NAME:
+            self.ledger.record_move(entry["folder"], entry["file_type"], entry["size"],
+                                    entry["destination"])
+
+        self.logger.info("Arquivo movido",
+                         f"De {entry['source']} para {entry['destination']} (retomado)",
+                         folder=entry["folder"])
+
+    def _ensure_dir(self, directory):
+        """Cria o diretório na primeira vez que ele é usado."""
+        if directory not in self._known_dirs:
+            os.makedirs(directory, exist_ok=True)
+            self._known_dirs.add(directory)
+
+    def organize_directory(self, directory):
+        """Organiza todos os arquivos em um diretório."""
+        try:
+            # Uma única varredura; subpastas já organizadas são ignoradas
+            records = list(scan_files(directory, CATEGORY_FOLDER_NAMES))
+            file_types = self.classify_many([record.path for record in records])
+            for record, file_type in zip(records, file_types):
+                self.organize_file(record.path, record, file_type)
 
             return True
         except Exception as e:
-            self.logger.error("Erro ao organizar diretório", f"{directory}: {str(e)}")
+            self.logger.error("Erro ao organizar diretório", f"{directory}: {str(e)}",
+                              folder=directory)
             return False
\ No newline at end of file
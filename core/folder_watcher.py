@@ -1,57 +1,407 @@
 # src/core/folder_watcher.py
 import os
 import time
+import threading
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
+from config.settings import get_setting
+from config.file_types import FILE_TYPES
+from core.dispatcher import FileDispatcher
+from core.dedup_cache import DedupCache
+from core.stability import StabilityTracker
+from core.sweep import InitialSweep
+from core.watch_scope import make_scope
+from core.file_organizer import CATEGORY_FOLDER_NAMES
+
+
+# Nomes transitórios criados por navegadores e editores antes do nome final
+TEMP_SUFFIXES = (".crdownload", ".part", ".partial", ".download", ".opdownload", ".tmp")
+TEMP_PREFIXES = ("~$", ".~lock.")
+
+
+def is_temporary_file(file_path):
+    """Indica se o arquivo tem um nome transitório (download ou salvamento em andamento)."""
+    name = os.path.basename(file_path).lower()
+    return name.endswith(TEMP_SUFFIXES) or name.startswith(TEMP_PREFIXES)
+
+
+class EventCoalescer:
+    """Agrupa os eventos de cada caminho antes de enviá-lo ao organizador.
+
+    Rajadas de created/modified/moved do mesmo arquivo são fundidas no estado
+    pendente do StabilityTracker, cuja janela de quietude funciona como janela
+    de debounce. Nomes transitórios são descartados e um caminho já liberado
+    não é enfileirado de novo enquanto estiver em processamento. O mesmo
+    arquivo (caminho, inode e mtime) também não é reenviado enquanto estiver
+    no cache de deduplicação.
+    """
+
+    def __init__(self, tracker, dispatcher, dedup_cache, pinned=None):
+        self.tracker = tracker
+        self.dispatcher = dispatcher
+        self.dedup_cache = dedup_cache
+        # Arquivos que não devem ser reorganizados (ex.: devolvidos por um desfazer)
+        self.pinned = pinned
+
+        # Caminhos liberados e ainda não processados pelo pool
+        self._in_flight = set()
+        # Arquivos que continuam na pasta porque a organização falhou ou foi descartada
+        self._unorganized = set()
+        self._lock = threading.Lock()
+
+    def created(self, file_path):
+        """Um arquivo apareceu na pasta."""
+        if not is_temporary_file(file_path):
+            self.tracker.track(file_path)
+
+    def modified(self, file_path):
+        """Um arquivo pendente foi alterado."""
+        self.tracker.touch(file_path)
+
+    def closed(self, file_path):
+        """O escritor fechou um arquivo pendente."""
+        self.tracker.mark_closed(file_path)
+
+    def moved(self, src_path, dest_path):
+        """Um arquivo foi renomeado (ex.: download temporário para o nome final)."""
+        self.tracker.forget(src_path)
+        self.created(dest_path)
+
+    def deleted(self, file_path):
+        """Um arquivo pendente foi removido antes de estabilizar."""
+        self.tracker.forget(file_path)
+        with self._lock:
+            self._unorganized.discard(file_path)
+
+    def release(self, file_path):
+        """Chamado pelo tracker: envia o arquivo estável ao pool uma única vez."""
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return
+
+        if self.pinned and self.pinned.is_pinned(file_path, stat.st_ino, stat.st_mtime_ns):
+            return
+
+        if self.dedup_cache.check_and_add((file_path, stat.st_ino, stat.st_mtime_ns)):
+            return
+
+        with self._lock:
+            if file_path in self._in_flight:
+                return
+            self._in_flight.add(file_path)
+
+        if not self.dispatcher.submit(file_path, on_done=self.done):
+            self.done(file_path)
+            self.finished(file_path, False)
+
+    def sweep(self, record, on_done):
+        """Envia ao pool um arquivo encontrado pela organização inicial.
+
+        Arquivos alterados há menos que a janela de quietude podem ainda estar
+        sendo escritos e seguem pelo tracker. Retorna True se o arquivo foi
+        enfileirado (on_done será chamado quando ele sair do pool).
+        """
+        file_path = record.path
+        if is_temporary_file(file_path):
+            return False
+
+        if time.time() - record.mtime_ns / 1e9 < self.tracker.quiet_window:
+            self.tracker.track(file_path)
+            return False
+
+        if self.pinned and self.pinned.is_pinned(file_path, record.inode, record.mtime_ns):
+            return False
+
+        if self.dedup_cache.check_and_add((file_path, record.inode, record.mtime_ns)):
+            return False
+
+        with self._lock:
+            if file_path in self._in_flight:
+                return False
+            self._in_flight.add(file_path)
+
+        def finished(path):
+            self.done(path)
+            on_done(path)
+
+        # A varredura espera por vaga na fila em vez de descartar arquivos
+        if not self.dispatcher.submit(file_path, record, finished, block=True):
+            self.done(file_path)
+            self.finished(file_path, False)
+            return False
+        return True
+
+    def done(self, file_path):
+        """Chamado depois que o pool terminou de processar o arquivo."""
+        with self._lock:
+            self._in_flight.discard(file_path)
+
+    def finished(self, file_path, organized):
+        """Registra o resultado da organização (falhas ficam fora do retrato da pasta)."""
+        with self._lock:
+            if organized:
+                self._unorganized.discard(file_path)
+            else:
+                self._unorganized.add(file_path)
+
+    def pending_paths(self):
+        """Retorna os caminhos não organizados (aguardando estabilizar, no pool ou com falha)."""
+        with self._lock:
+            pending = self._in_flight | self._unorganized
+        return pending | self.tracker.pending_paths()
 
 
 class FileHandler(FileSystemEventHandler):
-    def __init__(self, organizer, logger):
-        self.organizer = organizer
+    def __init__(self, coalescer, logger, on_directory_created=None, scope=None):
+        self.coalescer = coalescer
         self.logger = logger
-        # Controle para evitar processamento duplicado
-        self.processed_files = set()
+        self.on_directory_created = on_directory_created
+        self.set_scope(scope)
+
+    def set_scope(self, scope):
+        """Troca a profundidade e as exclusões do monitoramento (None aceita tudo)."""
+        # Sem subpastas nem padrões que excluam arquivos, não há o que verificar
+        self.scope = scope if scope is not None and scope.filters else None
+
+    def _accepts(self, file_path):
+        """Indica se o evento do arquivo está dentro do escopo monitorado."""
+        return self.scope is None or self.scope.accepts(file_path)
 
     def on_created(self, event):
         """Chamado quando um arquivo é criado."""
         if not event.is_directory:
-            # Espera um pouco para o arquivo "estabilizar" (evitar problemas de lock)
-            time.sleep(0.5)
-            self._process_file(event.src_path)
+            if self._accepts(event.src_path):
+                self.coalescer.created(event.src_path)
+        elif self.on_directory_created:
+            self.on_directory_created(event.src_path)
+
+    def on_modified(self, event):
+        """Chamado quando um arquivo é alterado (ainda sendo escrito)."""
+        if not event.is_directory and self._accepts(event.src_path):
+            self.coalescer.modified(event.src_path)
+
+    def on_closed(self, event):
+        """Chamado quando o escritor fecha o arquivo (close-write)."""
+        if not event.is_directory and self._accepts(event.src_path):
+            self.coalescer.closed(event.src_path)
+
+    def on_deleted(self, event):
+        """Chamado quando um arquivo é removido da pasta monitorada."""
+        if not event.is_directory and self._accepts(event.src_path):
+            self.coalescer.deleted(event.src_path)
 
     def on_moved(self, event):
         """Chamado quando um arquivo é movido para a pasta monitorada."""
-        if not event.is_directory and os.path.exists(event.dest_path):
-            self._process_file(event.dest_path)
+        if not event.is_directory:
+            if self._accepts(event.src_path):
+                self.coalescer.deleted(event.src_path)
+            if self._accepts(event.dest_path) and os.path.exists(event.dest_path):
+                self.coalescer.created(event.dest_path)
+
+
+class CategoryHandler(FileSystemEventHandler):
+    """Observa uma subpasta de tipo para manter o registro de espaço atualizado.
 
-    def _process_file(self, file_path):
-        """Processa um arquivo, evitando duplicações."""
-        if file_path in self.processed_files:
+    Entradas somam o tamanho do arquivo (as do organizador são contadas uma
+    única vez) e saídas subtraem o último tamanho conhecido; só pastas
+    inteiras removidas ou movidas agendam a recontagem da subpasta.
+    """
+
+    def __init__(self, ledger, folder_path, file_type, type_folder=None):
+        self.ledger = ledger
+        self.folder_path = folder_path
+        self.file_type = file_type
+        self.type_folder = type_folder
+
+    def _inside(self, path):
+        """Indica se o caminho está dentro da subpasta observada."""
+        return self.type_folder is None or path.startswith(self.type_folder + os.sep)
+
+    def _added(self, path):
+        try:
+            size = os.stat(path).st_size
+        except OSError:
             return
+        self.ledger.record_added(self.folder_path, self.file_type, path, size)
 
-        # Adiciona à lista de processados
-        self.processed_files.add(file_path)
+    def on_created(self, event):
+        """Chamado quando um arquivo é criado ou copiado para a subpasta."""
+        if not event.is_directory:
+            self._added(event.src_path)
 
-        # Organiza o arquivo
+    def on_modified(self, event):
+        """Chamado quando um arquivo da subpasta é alterado."""
+        if event.is_directory:
+            return
         try:
-            self.organizer.organize_file(file_path)
-        except Exception as e:
-            self.logger.error("Erro ao processar arquivo", f"{file_path}: {str(e)}")
+            size = os.stat(event.src_path).st_size
+        except OSError:
+            return
+        self.ledger.record_resized(self.folder_path, self.file_type, event.src_path, size)
+
+    def on_deleted(self, event):
+        """Chamado quando um arquivo sai da subpasta."""
+        if event.is_directory:
+            self.ledger.mark_dirty(self.folder_path, self.file_type, event.src_path)
+        else:
+            self.ledger.record_removed(self.folder_path, self.file_type, event.src_path)
+
+    def on_moved(self, event):
+        """Chamado quando um arquivo é renomeado ou movido a partir da subpasta."""
+        if event.is_directory:
+            self.ledger.mark_dirty(self.folder_path, self.file_type, event.src_path)
+            return
 
-        # Remove da lista após algum tempo (limpeza periódica)
-        if len(self.processed_files) > 1000:
-            self.processed_files.clear()
+        self.ledger.record_removed(self.folder_path, self.file_type, event.src_path)
+        if self._inside(event.dest_path):
+            self._added(event.dest_path)
 
 
 class FolderWatcher:
-    def __init__(self, organizer, logger):
+    def __init__(self, organizer, logger, settings=None, pinned=None, snapshot=None):
         self.organizer = organizer
         self.logger = logger
+        self.settings = settings
         self.observer = Observer()
         self.watched_folders = {}
+        # Profundidade e exclusões de cada pasta monitorada: caminho -> WatchScope
+        self.scopes = {}
+        # Handler e opções de cada pasta, para remontar o escopo: caminho -> (handler, opções)
+        self._handlers = {}
+        # Subpastas de tipo observadas para o registro de espaço: caminho -> watch
+        self.category_watches = {}
+        self._category_lock = threading.Lock()
 
-    def start_watching(self, folder_path):
-        """Inicia o monitoramento de uma pasta."""
+        # Pool de workers compartilhado por todas as pastas monitoradas
+        self.dispatcher = FileDispatcher(
+            self._organize, logger,
+            key_func=organizer.get_target_dir,
+            pool_size=get_setting(settings, "worker_pool_size"),
+            queue_size=get_setting(settings, "worker_queue_size"),
+            policy=get_setting(settings, "backpressure_policy"),
+            max_per_device=get_setting(settings, "max_moves_per_device")
+        )
+
+        # Arquivos só seguem para o pool depois de ficarem estáveis
+        self.tracker = StabilityTracker(
+            self._release, logger,
+            quiet_window=get_setting(settings, "stability_window"),
+            min_interval=get_setting(settings, "stability_min_interval"),
+            max_interval=get_setting(settings, "stability_max_interval")
+        )
+
+        # Controle para evitar processamento duplicado (compartilhado entre as pastas)
+        self.dedup_cache = DedupCache(
+            max_size=get_setting(settings, "dedup_cache_size"),
+            ttl=get_setting(settings, "dedup_cache_ttl")
+        )
+
+        # Agrupa os eventos por caminho (compartilhado entre as pastas)
+        self.coalescer = EventCoalescer(self.tracker, self.dispatcher, self.dedup_cache, pinned)
+
+        # Retrato de cada pasta, para retomar só o que chegou com o aplicativo fechado
+        self.snapshot = snapshot
+
+        # Organização dos arquivos já existentes, em segundo plano
+        self.sweep = InitialSweep(self.coalescer, logger, on_finished=self._on_sweep_finished,
+                                  snapshot=snapshot)
+
+        # Os destinos das regras e os padrões gerais entram nos escopos: remonta quando mudam
+        if settings is not None:
+            for key in ("routing_rules", "watch_ignore_patterns"):
+                settings.subscribe(key, lambda value: self.refresh_scopes())
+
+    def _release(self, file_path):
+        """Recebe do tracker um arquivo que ficou estável."""
+        self.coalescer.release(file_path)
+
+    def _organize(self, file_path, record=None):
+        """Executado pelo pool: organiza o arquivo."""
+        self.coalescer.finished(file_path, self.organizer.organize_file(file_path, record))
+
+    def _watch_category(self, folder_path, subfolder_path):
+        """Observa uma subpasta de tipo (se existir) para o registro de espaço."""
+        ledger = getattr(self.organizer, "ledger", None)
+        if not ledger:
+            return
+
+        # Só as subpastas de tipo diretas (as de subpastas aninhadas ficam fora do registro)
+        if os.path.dirname(subfolder_path) != folder_path:
+            return
+
+        # Chamado pelo observador e pela varredura inicial
+        with self._category_lock:
+            if subfolder_path in self.category_watches:
+                return
+
+            name = os.path.basename(subfolder_path)
+            for file_type, data in FILE_TYPES.items():
+                if data["folder_name"] == name and os.path.isdir(subfolder_path):
+                    handler = CategoryHandler(ledger, folder_path, file_type, subfolder_path)
+                    self.category_watches[subfolder_path] = self.observer.schedule(
+                        handler, subfolder_path, recursive=True)
+                    return
+
+    def _watch_categories(self, folder_path):
+        """Observa todas as subpastas de tipo existentes de uma pasta monitorada."""
+        if folder_path not in self.watched_folders:
+            return
+
+        for data in FILE_TYPES.values():
+            self._watch_category(folder_path, os.path.join(folder_path, data["folder_name"]))
+
+    def _on_sweep_finished(self, folder_path):
+        """Chamado quando a organização inicial de uma pasta termina."""
+        self._watch_categories(folder_path)
+        self._save_snapshot(folder_path)
+
+    def _save_snapshot(self, folder_path):
+        """Grava o retrato da pasta (e das subpastas do escopo), sem os arquivos pendentes."""
+        scope = self.scopes.get(folder_path)
+        if not self.snapshot or scope is None:
+            return
+
+        exclude = self.coalescer.pending_paths()
+        for directory in scope.walk_dirs():
+            self.snapshot.save(directory, CATEGORY_FOLDER_NAMES, exclude=exclude)
+
+    def _make_scope(self, folder_path, max_depth=None, ignore_patterns=None):
+        """Monta o escopo da pasta; None usa as configurações gerais."""
+        if max_depth is None:
+            max_depth = get_setting(self.settings, "watch_max_depth")
+        patterns = list(get_setting(self.settings, "watch_ignore_patterns") or [])
+        if ignore_patterns:
+            patterns.extend(ignore_patterns)
+
+        # As subpastas de tipo (e os destinos das regras) são sempre excluídas:
+        # as movimentações não geram eventos
+        return make_scope(folder_path, max_depth, patterns, getattr(self.organizer, "rules", None))
+
+    def refresh_scopes(self):
+        """Remonta os escopos das pastas monitoradas (ex.: regras recompiladas).
+
+        A profundidade não muda, então os agendamentos do observador continuam
+        valendo; só os filtros dos handlers são trocados.
+        """
+        for folder_path, (handler, options) in list(self._handlers.items()):
+            scope = self._make_scope(folder_path, *options)
+            self.scopes[folder_path] = scope
+            handler.set_scope(scope)
+
+    def sweep_progress(self):
+        """Retorna o andamento da organização inicial das pastas ({pasta: (feitos, total, enumerada)})."""
+        return self.sweep.progress()
+
+    def start_watching(self, folder_path, max_depth=None, ignore_patterns=None):
+        """Inicia o monitoramento de uma pasta.
+
+        max_depth (0 = apenas a pasta) e ignore_patterns complementam as
+        configurações gerais para esta pasta.
+        """
+        # Um único formato do caminho para o agendamento, os eventos e os retratos
+        # (no Windows o diálogo de pastas usa "/")
+        folder_path = os.path.normpath(folder_path)
         if folder_path in self.watched_folders:
             self.logger.warning("Pasta já monitorada", folder_path)
             return False
@@ -61,17 +411,28 @@ class FolderWatcher:
                 self.logger.error("Pasta não existe", folder_path)
                 return False
 
+            scope = self._make_scope(folder_path, max_depth, ignore_patterns)
+
             # Cria um handler
-            event_handler = FileHandler(self.organizer, self.logger)
+            event_handler = FileHandler(
+                self.coalescer, self.logger,
+                on_directory_created=lambda path: self._watch_category(folder_path, path),
+                scope=scope
+            )
 
             # Configura o observer com o handler
-            watch = self.observer.schedule(event_handler, folder_path, recursive=False)
+            watch = self.observer.schedule(event_handler, folder_path, recursive=scope.recursive)
             self.watched_folders[folder_path] = watch
+            self.scopes[folder_path] = scope
+            self._handlers[folder_path] = (event_handler, (max_depth, ignore_patterns))
 
-            self.logger.info("Iniciando monitoramento", folder_path)
+            self.logger.info("Iniciando monitoramento", folder_path, folder=folder_path)
 
-            # Organiza arquivos existentes
-            self.organizer.organize_directory(folder_path)
+            # Observa as subpastas de tipo existentes (as novas são detectadas pelo handler)
+            self._watch_categories(folder_path)
+
+            # Organiza arquivos existentes em segundo plano (o monitoramento já está ativo)
+            self.sweep.start(folder_path, scope)
 
             return True
         except Exception as e:
@@ -80,14 +441,26 @@ class FolderWatcher:
 
     def stop_watching(self, folder_path):
         """Para o monitoramento de uma pasta."""
+        folder_path = os.path.normpath(folder_path)
         if folder_path not in self.watched_folders:
             self.logger.warning("Pasta não está sendo monitorada", folder_path)
             return False
 
         try:
+            self.sweep.cancel(folder_path)
+            if self.snapshot:
+                self.snapshot.forget(folder_path)
             watch = self.watched_folders.pop(folder_path)
+            self.scopes.pop(folder_path, None)
+            self._handlers.pop(folder_path, None)
             self.observer.unschedule(watch)
-            self.logger.info("Monitoramento interrompido", folder_path)
+
+            for data in FILE_TYPES.values():
+                category_watch = self.category_watches.pop(
+                    os.path.join(folder_path, data["folder_name"]), None)
+                if category_watch is not None:
+                    self.observer.unschedule(category_watch)
+            self.logger.info("Monitoramento interrompido", folder_path, folder=folder_path)
             return True
         except Exception as e:
             self.logger.error("Erro ao parar monitoramento", f"{folder_path}: {str(e)}")
@@ -96,11 +469,38 @@ class FolderWatcher:
     def start(self):
         """Inicia o observador."""
         if not self.observer.is_alive():
+            # Resolve primeiro o que ficou pela metade na execução anterior
+            try:
+                self.organizer.recover_journal()
+            except Exception as e:
+                self.logger.error("Erro ao recuperar movimentações", str(e))
+
+            self.dispatcher.start()
+            self.tracker.start()
             self.observer.start()
             self.logger.info("Observador iniciado", "")
 
     def stop(self):
-        """Para o observador."""
+        """Para o observador e aguarda os arquivos já enfileirados."""
+        # Pastas com organização inicial incompleta mantêm o retrato anterior
+        unfinished = {folder_path for folder_path in self.watched_folders
+                      if self.sweep.is_running(folder_path)}
+        self.sweep.stop()
         self.observer.stop()
         self.observer.join()
-        self.logger.info("Observador parado", "")
\ No newline at end of file
+        self.tracker.stop()
+        self.dispatcher.stop()
+
+        journal = getattr(self.organizer, "journal", None)
+        if journal:
+            journal.flush()
+
+        for folder_path in list(self.watched_folders):
+            if folder_path not in unfinished:
+                self._save_snapshot(folder_path)
+        self.logger.info("Observador parado", "")
+
+        stats = self.dedup_cache.stats()
+        self.logger.info("Cache de deduplicação",
+                         f"acertos={stats['hits']} falhas={stats['misses']} "
+                         f"remoções={stats['evictions']}")
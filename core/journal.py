@@ -0,0 +1,139 @@
+# src/core/journal.py
+import os
+import threading
+from core.mover import PARTIAL_SUFFIX
+
+
+class MoveJournal:
+    """Diário de movimentações gravado antes de cada movimento (write-ahead).
+
+    Cada movimento é registrado como "planned" antes de acontecer. A conclusão
+    é marcada de forma preguiçosa, na transação do próximo registro (ou em
+    flush), já que a recuperação reconhece pelo disco um movimento concluído.
+    Na inicialização, apenas as entradas ainda "planned" são examinadas; a
+    origem só é removida ou movida se ainda for o mesmo arquivo (inode,
+    tamanho e mtime registrados) e nada que já esteja no destino é
+    substituído.
+    """
+
+    def __init__(self, db, logger):
+        self.db = db
+        self.logger = logger
+
+        # (id, estado) de entradas concluídas ainda não gravadas
+        self._finished = []
+        self._lock = threading.Lock()
+
+    def plan(self, source, destination, folder, file_type, size, inode=None, mtime_ns=None):
+        """Registra um movimento que vai começar e retorna o id da entrada.
+
+        inode e mtime_ns identificam a origem; sem eles a recuperação não mexe no arquivo.
+        """
+        with self._lock:
+            finished, self._finished = self._finished, []
+
+        entry_id = self.db.journal_plan(source, destination, folder, file_type, size, finished,
+                                        inode, mtime_ns)
+        if entry_id is None and finished:
+            with self._lock:
+                self._finished.extend(finished)
+        return entry_id
+
+    def finish(self, entry_id, state="done"):
+        """Marca uma entrada como concluída (done, failed ou rolled_back)."""
+        if entry_id is None:
+            return
+        with self._lock:
+            self._finished.append((entry_id, state))
+
+    def flush(self):
+        """Grava as conclusões pendentes."""
+        with self._lock:
+            finished, self._finished = self._finished, []
+        if finished:
+            self.db.journal_finish(finished)
+
+    def recover(self, mover, on_replayed=None):
+        """Conclui ou desfaz os movimentos interrompidos por uma queda.
+
+        Retorna {resultado: quantidade}; "replayed" são movimentos refeitos agora.
+        """
+        self.flush()
+
+        counts = {}
+        for entry in self.db.journal_pending():
+            try:
+                state = self._recover_entry(entry, mover)
+            except OSError as e:
+                self.logger.error("Erro ao recuperar movimentação",
+                                  f"{entry['source']}: {str(e)}", folder=entry["folder"])
+                state = "failed"
+
+            if state == "replayed" and on_replayed:
+                on_replayed(entry)
+
+            self.finish(entry["id"], "done" if state == "replayed" else state)
+            counts[state] = counts.get(state, 0) + 1
+
+        self.flush()
+        return counts
+
+    def _recover_entry(self, entry, mover):
+        """Decide pelo estado do disco como resolver uma entrada interrompida."""
+        source = entry["source"]
+        destination = entry["destination"]
+        partial = destination + PARTIAL_SUFFIX
+
+        try:
+            destination_size = os.path.getsize(destination)
+        except FileNotFoundError:
+            destination_size = None
+
+        # A origem não é mais o arquivo registrado: o movimento terminou (e outro
+        # arquivo pode ter aparecido com o mesmo nome) ou o arquivo foi removido
+        if not self._is_source(entry):
+            self._remove(partial)
+            if destination_size == 0 and entry["size"]:
+                # Só restou a reserva vazia de um movimento que não aconteceu
+                self._remove(destination)
+                return "failed"
+            return "done" if destination_size is not None else "failed"
+
+        # Cópia entre dispositivos já colocou o destino; faltou remover a origem
+        if destination_size and mover.copied(source, destination):
+            os.unlink(source)
+            return "done"
+
+        # O destino foi ocupado por outro arquivo: a origem fica onde está
+        if destination_size or not os.path.isdir(os.path.dirname(destination)):
+            self._remove(partial)
+            return "rolled_back"
+
+        # Refaz o movimento no lugar da reserva vazia, sem substituir nada
+        # (uma cópia parcial é retomada)
+        if destination_size == 0:
+            os.unlink(destination)
+        try:
+            mover.move_exclusive(source, destination)
+        except FileExistsError:
+            return "rolled_back"
+        return "replayed"
+
+    def _is_source(self, entry):
+        """Indica se o arquivo na origem ainda é o registrado no diário."""
+        if entry["inode"] is None:
+            # Entrada de uma versão anterior, sem identidade: não arrisca
+            return False
+        try:
+            stat = os.stat(entry["source"])
+        except FileNotFoundError:
+            return False
+        return (stat.st_ino == entry["inode"] and stat.st_size == entry["size"]
+                and stat.st_mtime_ns == entry["mtime_ns"])
+
+    def _remove(self, path):
+        """Remove um arquivo auxiliar, se existir."""
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
@@ -1,12 +1,59 @@
 # src/core/logger.py
 import os
+import gzip
+import time
+import shutil
 import logging
+import logging.handlers
 from datetime import datetime
+from config.settings import get_setting
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+
+class RotatingLogHandler(logging.handlers.RotatingFileHandler):
+    """Rotaciona o arquivo de log por tamanho ou por idade, com gzip opcional."""
+
+    def __init__(self, filename, max_bytes, backup_count, max_age_days=None, compress=False):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count,
+                         encoding='utf-8', delay=True)
+        self.max_age = max_age_days * 86400 if max_age_days else None
+        self.segment_start = self._read_segment_start()
+
+        if compress:
+            self.namer = lambda name: name + ".gz"
+            self.rotator = self._gzip_rotator
+
+    def _read_segment_start(self):
+        """Obtém o horário da primeira linha do arquivo atual (ou agora, se vazio)."""
+        try:
+            with open(self.baseFilename, 'r', encoding='utf-8') as f:
+                first_line = f.readline()
+            return datetime.strptime(first_line[:19], "%Y-%m-%d %H:%M:%S").timestamp()
+        except (OSError, ValueError):
+            return time.time()
+
+    def shouldRollover(self, record):
+        if self.max_age and time.time() - self.segment_start >= self.max_age:
+            return self.backupCount > 0 and os.path.exists(self.baseFilename)
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        super().doRollover()
+        self.segment_start = time.time()
+
+    @staticmethod
+    def _gzip_rotator(source, dest):
+        """Comprime o segmento rotacionado e remove o original."""
+        with open(source, 'rb') as f_in, gzip.open(dest, 'wb') as f_out:
+            shutil.copyfileobj(f_in, f_out)
+        os.remove(source)
 
 
 class Logger:
-    def __init__(self, log_dir="logs", db=None):
+    def __init__(self, log_dir="logs", db=None, settings=None):
         self.db = db
+        self.settings = settings
 
         # Configura o diretório de logs
         self.log_dir = log_dir
@@ -24,34 +71,43 @@ class Logger:
                 self.logger.removeHandler(handler)
 
             # Cria um novo handler
-            file_handler = logging.FileHandler(self.log_file, encoding='utf-8')
-            formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-            file_handler.setFormatter(formatter)
-            self.logger.addHandler(file_handler)
-
-    def info(self, action, details=""):
+            self.logger.addHandler(self._create_file_handler())
+
+    def _create_file_handler(self):
+        """Cria o handler do app.log com a política de rotação configurada."""
+        file_handler = RotatingLogHandler(
+            self.log_file,
+            max_bytes=int(get_setting(self.settings, "log_file_max_mb") * 1024 * 1024),
+            backup_count=get_setting(self.settings, "log_file_backups"),
+            max_age_days=get_setting(self.settings, "log_file_max_age_days"),
+            compress=get_setting(self.settings, "log_file_compress")
+        )
+        file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        return file_handler
+
+    def info(self, action, details="", folder=None):
         """Registra uma ação informativa."""
         message = f"{action}: {details}"
         self.logger.info(message)
 
         if self.db:
-            self.db.add_log(action, details)
+            self.db.add_log(action, details, "INFO", folder)
 
-    def error(self, action, details=""):
+    def error(self, action, details="", folder=None):
         """Registra um erro."""
         message = f"{action}: {details}"
         self.logger.error(message)
 
         if self.db:
-            self.db.add_log(f"ERRO - {action}", details)
+            self.db.add_log(action, details, "ERROR", folder)
 
-    def warning(self, action, details=""):
+    def warning(self, action, details="", folder=None):
         """Registra um aviso."""
         message = f"{action}: {details}"
         self.logger.warning(message)
 
         if self.db:
-            self.db.add_log(f"AVISO - {action}", details)
+            self.db.add_log(action, details, "WARNING", folder)
 
     def clear_log_file(self):
         """Limpa o arquivo de log (não afeta o banco de dados)."""
@@ -66,12 +122,9 @@ class Logger:
                 f.write('')
 
             # Recria o handler
-            file_handler = logging.FileHandler(self.log_file, encoding='utf-8')
-            formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-            file_handler.setFormatter(formatter)
-            self.logger.addHandler(file_handler)
+            self.logger.addHandler(self._create_file_handler())
 
             return True
         except Exception as e:
             print(f"Erro ao limpar arquivo de log: {e}")
-            return False
\ No newline at end of file
+            return False
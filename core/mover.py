@@ -0,0 +1,260 @@
+# src/core/mover.py
+import os
+import sys
+import errno
+import shutil
+import threading
+
+# Sufixo do arquivo temporário de uma cópia entre dispositivos
+PARTIAL_SUFFIX = ".part"
+
+# Trecho conferido antes de retomar uma cópia interrompida
+_RESUME_CHECK_SIZE = 64 * 1024
+
+# Erros que indicam que a cópia rápida não é suportada nesse par de arquivos
+# (ENOTSOCK: sendfile no macOS só aceita sockets como destino)
+_UNSUPPORTED_ERRNOS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP,
+                       getattr(errno, "ENOTSUP", errno.EOPNOTSUPP), errno.ENOTSOCK}
+
+# sendfile para um arquivo comum só funciona no Linux
+_SENDFILE_TO_FILE = sys.platform.startswith("linux")
+
+# Erros de os.link em sistemas de arquivos sem hard links
+_NO_LINK_ERRNOS = {errno.EPERM, errno.EMLINK, errno.EOPNOTSUPP,
+                   getattr(errno, "ENOTSUP", errno.EOPNOTSUPP)}
+
+
+class FileMover:
+    """Move arquivos escolhendo o caminho mais barato.
+
+    No mesmo dispositivo (mesmo st_dev) o movimento é um único os.replace,
+    atômico. Entre dispositivos o conteúdo é copiado sem passar pelo Python
+    (copy_file_range ou sendfile, quando disponíveis) para um arquivo ".part",
+    que recebe fsync antes de substituir o destino; só então a origem é
+    removida. Uma cópia interrompida é retomada de onde parou.
+    """
+
+    def __init__(self, chunk_size=8 * 1024 * 1024, progress_threshold=64 * 1024 * 1024,
+                 on_progress=None):
+        self.chunk_size = chunk_size
+        # Arquivos menores que isso não geram chamadas de progresso
+        self.progress_threshold = progress_threshold
+        self.on_progress = on_progress
+
+        # Dispositivo de cada diretório de destino já visto
+        self._devices = {}
+        self._lock = threading.Lock()
+
+    def move(self, source, destination, source_dev=None, on_progress=None):
+        """Move source para destination (que pode já existir e será substituído)."""
+        if source_dev is None:
+            source_dev = os.stat(source).st_dev
+
+        if source_dev == self._device_of(os.path.dirname(destination)):
+            try:
+                os.replace(source, destination)
+                return
+            except OSError as e:
+                # Ponto de montagem dentro do diretório, por exemplo
+                if e.errno != errno.EXDEV:
+                    raise
+
+        self._copy_across(source, destination, on_progress or self.on_progress)
+
+    def move_exclusive(self, source, destination, source_dev=None, on_progress=None):
+        """Move source para destination sem substituir nada.
+
+        Levanta FileExistsError se destination já existir (inclusive quando
+        aparece durante uma cópia entre dispositivos).
+        """
+        if source_dev is None:
+            source_dev = os.stat(source).st_dev
+
+        if source_dev == self._device_of(os.path.dirname(destination)):
+            try:
+                self._place(source, destination)
+                return
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
+
+        self._copy_across(source, destination, on_progress or self.on_progress,
+                          exclusive=True)
+
+    def copied(self, source, destination):
+        """Indica se destination é uma cópia completa de source feita por _copy_across.
+
+        Confere tamanho e mtime (copiado com copystat), que são arquivos
+        diferentes e o final do conteúdo, como na retomada de uma cópia.
+        """
+        try:
+            source_stat = os.stat(source)
+            destination_stat = os.stat(destination)
+        except FileNotFoundError:
+            return False
+
+        if os.path.samestat(source_stat, destination_stat) \
+                or destination_stat.st_size != source_stat.st_size \
+                or destination_stat.st_mtime_ns != source_stat.st_mtime_ns:
+            return False
+
+        check = min(source_stat.st_size, _RESUME_CHECK_SIZE)
+        with open(source, "rb") as src, open(destination, "rb") as dst:
+            src.seek(source_stat.st_size - check)
+            dst.seek(source_stat.st_size - check)
+            return src.read(check) == dst.read(check)
+
+    def _place(self, source, destination):
+        """Renomeia no mesmo dispositivo sem substituir (link + unlink).
+
+        Sem hard links, usa os.rename após conferir o destino (no Windows o
+        próprio rename falha se o destino existir).
+        """
+        try:
+            os.link(source, destination)
+        except OSError as e:
+            if e.errno not in _NO_LINK_ERRNOS:
+                raise
+            if os.name != "nt" and os.path.lexists(destination):
+                raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), destination)
+            os.rename(source, destination)
+            return
+        os.unlink(source)
+
+    def _device_of(self, directory):
+        """Retorna o st_dev de um diretório (guardado após o primeiro stat)."""
+        with self._lock:
+            device = self._devices.get(directory)
+        if device is None:
+            device = os.stat(directory).st_dev
+            with self._lock:
+                self._devices[directory] = device
+        return device
+
+    def forget(self, directory):
+        """Descarta o dispositivo guardado de um diretório (ex.: remontado)."""
+        with self._lock:
+            self._devices.pop(directory, None)
+
+    def _copy_across(self, source, destination, on_progress, exclusive=False):
+        """Copia para um arquivo temporário, confirma no disco e remove a origem.
+
+        exclusive: o temporário só entra no lugar se o destino não existir.
+        """
+        partial = destination + PARTIAL_SUFFIX
+
+        with open(source, "rb") as src:
+            total = os.fstat(src.fileno()).st_size
+            offset = self._resume_offset(src, partial, total)
+
+            with open(partial, "r+b" if offset else "wb") as dst:
+                dst.seek(offset)
+                src.seek(offset)
+
+                report = on_progress if total >= self.progress_threshold else None
+                self._copy_data(src, dst, offset, total, report)
+
+                dst.flush()
+                os.fsync(dst.fileno())
+
+        shutil.copystat(source, partial)
+        if exclusive:
+            try:
+                self._place(partial, destination)
+            except FileExistsError:
+                os.unlink(partial)
+                raise
+        else:
+            os.replace(partial, destination)
+        self._fsync_dir(os.path.dirname(destination))
+        os.unlink(source)
+
+    def _resume_offset(self, src, partial, total):
+        """Retorna de onde continuar uma cópia anterior (0 se não houver ou não conferir)."""
+        try:
+            offset = os.path.getsize(partial)
+        except OSError:
+            return 0
+
+        if offset == 0 or offset > total:
+            return 0
+
+        # Confere o final do trecho já copiado antes de confiar nele
+        check = min(offset, _RESUME_CHECK_SIZE)
+        with open(partial, "rb") as part:
+            part.seek(offset - check)
+            copied = part.read(check)
+        src.seek(offset - check)
+        if src.read(check) != copied:
+            return 0
+
+        return offset
+
+    def _copy_data(self, src, dst, offset, total, on_progress):
+        """Copia de offset até total usando a chamada mais rápida disponível."""
+        src_fd = src.fileno()
+        dst_fd = dst.fileno()
+
+        copy_calls = []
+        if hasattr(os, "copy_file_range"):
+            copy_calls.append(self._copy_file_range)
+        if _SENDFILE_TO_FILE and hasattr(os, "sendfile"):
+            copy_calls.append(self._sendfile)
+
+        for copy_call in copy_calls:
+            if offset >= total:
+                break
+            try:
+                offset = copy_call(src_fd, dst_fd, offset, total, on_progress)
+            except OSError as e:
+                if e.errno not in _UNSUPPORTED_ERRNOS:
+                    raise
+                # Reposiciona e tenta a próxima forma de cópia
+                os.lseek(src_fd, offset, os.SEEK_SET)
+                os.lseek(dst_fd, offset, os.SEEK_SET)
+
+        # Última opção (ou arquivo que cresceu): cópia em blocos
+        src.seek(offset)
+        dst.seek(offset)
+        while True:
+            data = src.read(self.chunk_size)
+            if not data:
+                break
+            dst.write(data)
+            offset += len(data)
+            if on_progress:
+                on_progress(offset, total)
+
+    def _copy_file_range(self, src_fd, dst_fd, offset, total, on_progress):
+        """Cópia no kernel com copy_file_range (Linux)."""
+        while offset < total:
+            copied = os.copy_file_range(src_fd, dst_fd, min(self.chunk_size, total - offset),
+                                        offset, offset)
+            if copied == 0:
+                break
+            offset += copied
+            if on_progress:
+                on_progress(offset, total)
+        return offset
+
+    def _sendfile(self, src_fd, dst_fd, offset, total, on_progress):
+        """Cópia no kernel com sendfile (Linux)."""
+        os.lseek(dst_fd, offset, os.SEEK_SET)
+        while offset < total:
+            sent = os.sendfile(dst_fd, src_fd, offset, min(self.chunk_size, total - offset))
+            if sent == 0:
+                break
+            offset += sent
+            if on_progress:
+                on_progress(offset, total)
+        return offset
+
+    def _fsync_dir(self, directory):
+        """Garante que a renomeação no diretório de destino chegou ao disco."""
+        if not hasattr(os, "O_DIRECTORY"):
+            return
+        fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
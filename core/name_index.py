@@ -0,0 +1,122 @@
+# src/core/name_index.py
+import os
+import re
+import threading
+
+# Nome com sufixo numérico gerado pelo organizador (ex.: "invoice_12")
+_SUFFIX_RE = re.compile(r"^(.*)_(\d+)$")
+
+
+class _DirIndex:
+    """Nomes ocupados e maior sufixo usado por (nome base, extensão) em um diretório."""
+
+    __slots__ = ("names", "suffixes")
+
+    def __init__(self):
+        self.names = set()
+        self.suffixes = {}
+
+    def add(self, name):
+        """Registra um nome ocupado."""
+        self.names.add(name)
+
+        base_name, ext = os.path.splitext(name)
+        match = _SUFFIX_RE.match(base_name)
+        if match:
+            key = (match.group(1), ext)
+            self.suffixes[key] = max(self.suffixes.get(key, 0), int(match.group(2)))
+
+
+class NameIndex:
+    """Reserva nomes livres nas subpastas de destino em tempo constante.
+
+    Para cada diretório, guarda os nomes ocupados e o maior sufixo já usado por
+    (nome base, extensão), montados com um único scandir no primeiro uso. A
+    reserva cria o arquivo de destino vazio com O_EXCL, então dois workers (ou
+    outro processo) nunca recebem o mesmo nome; o movimento depois substitui
+    esse arquivo. O nome original é tentado primeiro, e o índice só escolhe o
+    sufixo quando ele está ocupado.
+    """
+
+    def __init__(self):
+        # diretório -> _DirIndex
+        self._dirs = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, directory, file_name):
+        """Cria um arquivo vazio com um nome livre e retorna seu caminho."""
+        with self._lock:
+            index = self._dirs.get(directory)
+            if index is None:
+                index = self._scan(directory)
+                self._dirs[directory] = index
+
+            # O nome original é sempre tentado no disco: o índice não vê
+            # arquivos apagados ou levados para fora da pasta depois da listagem
+            name = file_name
+            while True:
+                path = os.path.join(directory, name)
+                try:
+                    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL)
+                except FileExistsError:
+                    # Ocupado (talvez criado fora do organizador): escolhe um sufixo
+                    index.add(name)
+                    name = self._free_name(index, file_name)
+                    continue
+
+                os.close(fd)
+                index.add(name)
+                return path
+
+    def claim(self, directory, file_name):
+        """Escolhe um nome livre apenas em memória (simulação) e retorna seu caminho.
+
+        Nada é criado no disco; um diretório que ainda não existe começa vazio.
+        """
+        with self._lock:
+            index = self._dirs.get(directory)
+            if index is None:
+                try:
+                    index = self._scan(directory)
+                except FileNotFoundError:
+                    index = _DirIndex()
+                self._dirs[directory] = index
+
+            name = self._free_name(index, file_name)
+            index.add(name)
+            return os.path.join(directory, name)
+
+    def release(self, path):
+        """Remove o arquivo reservado quando o movimento não aconteceu."""
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+    def forget(self, directory):
+        """Descarta o índice de um diretório (ex.: removido ou recriado)."""
+        with self._lock:
+            self._dirs.pop(directory, None)
+
+    def _free_name(self, index, file_name):
+        """Retorna o nome (com um número, se preciso) que ainda não está no índice."""
+        if file_name not in index.names:
+            return file_name
+
+        base_name, ext = os.path.splitext(file_name)
+        key = (base_name, ext)
+        while True:
+            counter = index.suffixes.get(key, 0) + 1
+            name = f"{base_name}_{counter}{ext}"
+            if name not in index.names:
+                return name
+            # Nome ocupado sem sufixo maior registrado: avança o sufixo
+            index.suffixes[key] = counter
+
+    def _scan(self, directory):
+        """Monta o índice de um diretório com uma única listagem."""
+        index = _DirIndex()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                index.add(entry.name)
+        return index
@@ -0,0 +1,305 @@
+# src/core/planner.py
+"""Simulação da organização de uma pasta, com aplicação posterior em lote.
+
+Uso pela linha de comando (a partir da pasta do aplicativo):
+
+    python -m core.planner plan PASTA [--output plano.jsonl | --db] [--depth N]
+    python -m core.planner apply (--input plano.jsonl | --plan-id ID) [--workers N]
+    python -m core.planner list
+"""
+import os
+import sys
+import json
+import argparse
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from config.settings import Settings
+from config.file_types import FILE_TYPES, reload_file_types
+from core.content_sniffer import ContentSniffer
+from core.file_organizer import FileOrganizer, CATEGORY_FOLDER_NAMES
+from core.journal import MoveJournal
+from core.logger import Logger
+from core.name_index import NameIndex
+from core.rules import RoutingRules
+from core.scanner import scan_files
+from core.undo import PinnedFiles
+from core.watch_scope import make_scope
+from db.database import Database
+
+# Um movimento planejado; inode e mtime identificam o arquivo na aplicação
+PlanEntry = namedtuple("PlanEntry", ["source", "destination", "file_type", "size",
+                                     "inode", "mtime_ns"])
+
+
+class PlanSummary:
+    """Quantidade de arquivos e bytes por tipo de um plano."""
+
+    def __init__(self):
+        # tipo -> [arquivos, bytes]
+        self.totals = {}
+
+    def add(self, entry):
+        """Contabiliza um movimento planejado."""
+        totals = self.totals.setdefault(entry.file_type, [0, 0])
+        totals[0] += 1
+        totals[1] += entry.size
+
+    @property
+    def files(self):
+        return sum(files for files, _ in self.totals.values())
+
+    @property
+    def bytes(self):
+        return sum(size for _, size in self.totals.values())
+
+    def lines(self):
+        """Retorna o resumo em texto, uma linha por tipo (maiores primeiro) e o total."""
+        lines = []
+        for file_type, (files, size) in sorted(self.totals.items(), key=lambda item: -item[1][1]):
+            lines.append(f"{FILE_TYPES[file_type]['folder_name']}: {files} arquivos, "
+                         f"{size / (1024 * 1024):.2f} MB")
+        lines.append(f"Total: {self.files} arquivos, {self.bytes / (1024 * 1024):.2f} MB")
+        return lines
+
+
+class MovePlanner:
+    """Planeja e aplica a organização de uma pasta.
+
+    O plano percorre a pasta em fluxo (um scandir por pasta), classifica cada
+    arquivo como o organizador faria (tipo, conteúdo e regras) e resolve os
+    conflitos de nome em memória, sem alterar nada no disco. A aplicação é um
+    passo separado que apenas move: arquivos alterados desde o plano ficam de
+    fora e um nome ocupado nesse meio tempo recebe um número. Arquivos fixados
+    (ex.: devolvidos por um desfazer) ficam fora do plano e da aplicação, como
+    no monitoramento. Duplicados não são verificados no plano (exigiria ler o
+    conteúdo de cada arquivo).
+    """
+
+    def __init__(self, organizer, workers=4, batch_size=1000, pinned=None):
+        self.organizer = organizer
+        self.workers = max(1, int(workers))
+        self.batch_size = max(1, int(batch_size))
+        # Arquivos que não devem ser reorganizados (PinnedFiles, opcional)
+        self.pinned = pinned
+
+    def plan(self, folder_path, scope=None):
+        """Gera os movimentos planejados (PlanEntry) da pasta e das subpastas do escopo."""
+        names = NameIndex()
+        directories = scope.walk_dirs() if scope else [folder_path]
+
+        for directory in directories:
+            try:
+                for record in scan_files(directory, CATEGORY_FOLDER_NAMES):
+                    if scope and not scope.accepts(record.path):
+                        continue
+                    if self.pinned and self.pinned.is_pinned(record.path, record.inode,
+                                                             record.mtime_ns):
+                        continue
+
+                    file_type, _, target_dir = self.organizer.resolve_target(record.path, record)
+                    destination = names.claim(target_dir, record.name)
+                    yield PlanEntry(record.path, destination, file_type, record.size,
+                                    record.inode, record.mtime_ns)
+            except OSError as e:
+                self.organizer.logger.error("Erro ao planejar organização",
+                                            f"{directory}: {str(e)}", folder=folder_path)
+
+    def apply(self, entries, on_progress=None):
+        """Executa os movimentos planejados em lotes paralelos; retorna {resultado: quantidade}.
+
+        on_progress(concluídos) é chamado após cada lote.
+        """
+        counts = {}
+        done = 0
+        batch = []
+
+        with ThreadPoolExecutor(max_workers=self.workers,
+                                thread_name_prefix="MovePlanner") as executor:
+            for entry in entries:
+                batch.append(entry)
+                if len(batch) < self.batch_size:
+                    continue
+                done += self._apply_batch(executor, batch, counts)
+                batch = []
+                if on_progress:
+                    on_progress(done)
+
+            if batch:
+                done += self._apply_batch(executor, batch, counts)
+                if on_progress:
+                    on_progress(done)
+
+        journal = getattr(self.organizer, "journal", None)
+        if journal:
+            journal.flush()
+
+        details = ", ".join(f"{result}={count}" for result, count in sorted(counts.items()))
+        self.organizer.logger.info("Plano de organização aplicado", details)
+        return counts
+
+    def _apply_batch(self, executor, batch, counts):
+        """Aplica um lote e soma os resultados em counts."""
+        for result in executor.map(self._apply_entry, batch):
+            counts[result] = counts.get(result, 0) + 1
+        return len(batch)
+
+    def _apply_entry(self, entry):
+        """Executa um movimento planejado; retorna o resultado."""
+        try:
+            return self.organizer.apply_move(entry.source, entry.destination, entry.file_type,
+                                             entry.inode, entry.mtime_ns, self.pinned)
+        except Exception as e:
+            self.organizer.logger.error("Erro ao aplicar movimento planejado",
+                                        f"{entry.source}: {str(e)}",
+                                        folder=os.path.dirname(entry.source))
+            return "error"
+
+
+def write_jsonl(entries, stream, summary=None):
+    """Grava os movimentos em JSON Lines (um objeto por linha)."""
+    for entry in entries:
+        stream.write(json.dumps(entry._asdict(), ensure_ascii=False))
+        stream.write("\n")
+        if summary is not None:
+            summary.add(entry)
+
+
+def read_jsonl(stream):
+    """Lê os movimentos gravados por write_jsonl (linhas vazias são ignoradas)."""
+    for line in stream:
+        line = line.strip()
+        if line:
+            yield PlanEntry(**json.loads(line))
+
+
+def save_plan(db, folder_path, entries, summary=None, batch_size=5000):
+    """Grava os movimentos no banco, em lotes; retorna o id do plano."""
+    summary = summary if summary is not None else PlanSummary()
+    plan_id = db.create_plan(folder_path)
+    if plan_id is None:
+        return None
+
+    batch = []
+    for entry in entries:
+        batch.append(entry)
+        summary.add(entry)
+        if len(batch) >= batch_size:
+            db.add_plan_entries(plan_id, batch)
+            batch = []
+    if batch:
+        db.add_plan_entries(plan_id, batch)
+
+    db.update_plan(plan_id, files=summary.files, total_bytes=summary.bytes)
+    return plan_id
+
+
+def load_plan(db, plan_id, page_size=5000):
+    """Gera os movimentos de um plano gravado no banco, página por página."""
+    after_id = 0
+    while True:
+        rows = db.get_plan_entries(plan_id, after_id, page_size)
+        if not rows:
+            return
+        for row in rows:
+            yield PlanEntry(row["source"], row["destination"], row["file_type"], row["size"],
+                            row["inode"], row["mtime_ns"])
+        after_id = rows[-1]["id"]
+
+
+def main(argv=None):
+    """Linha de comando do planejador."""
+    parser = argparse.ArgumentParser(prog="python -m core.planner",
+                                     description="Simula e aplica a organização de uma pasta.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    plan_parser = commands.add_parser("plan", help="gera o plano sem alterar a pasta")
+    plan_parser.add_argument("folder")
+    plan_parser.add_argument("--output", default="-",
+                             help="arquivo JSON Lines (padrão: saída padrão)")
+    plan_parser.add_argument("--db", action="store_true", help="grava o plano no banco de dados")
+    plan_parser.add_argument("--depth", type=int, default=0,
+                             help="níveis de subpastas incluídos (padrão: 0)")
+
+    apply_parser = commands.add_parser("apply", help="aplica um plano gerado antes")
+    source = apply_parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input", help="arquivo JSON Lines gerado por plan")
+    source.add_argument("--plan-id", type=int, help="id do plano gravado no banco de dados")
+    apply_parser.add_argument("--workers", type=int, default=None)
+
+    commands.add_parser("list", help="lista os planos gravados no banco de dados")
+    args = parser.parse_args(argv)
+
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    data_dir = os.path.join(base_dir, "data")
+    os.makedirs(data_dir, exist_ok=True)
+
+    settings = Settings(os.path.join(data_dir, "config.json"))
+    reload_file_types(settings.get("custom_extensions"))
+    db = Database(os.path.join(data_dir, "app_data.db"))
+    logger = Logger(os.path.join(base_dir, "logs"), db, settings)
+
+    try:
+        if args.command == "list":
+            for plan in db.get_plans():
+                print(f"{plan['id']}\t{plan['timestamp']}\t{plan['state']}\t{plan['files']} arquivos\t"
+                      f"{plan['bytes'] / (1024 * 1024):.2f} MB\t{plan['folder']}")
+            return 0
+
+        sniffer = None
+        if settings.get("content_sniffing"):
+            sniffer = ContentSniffer(settings.get("sniff_cache_size"))
+        rules = RoutingRules(logger, settings.get("routing_rules"))
+        organizer = FileOrganizer(logger, sniffer=sniffer, journal=MoveJournal(db, logger),
+                                  rules=rules)
+        planner = MovePlanner(organizer, workers=getattr(args, "workers", None)
+                              or settings.get("worker_pool_size"),
+                              pinned=PinnedFiles(db))
+
+        if args.command == "plan":
+            folder_path = os.path.abspath(args.folder)
+            if not os.path.isdir(folder_path):
+                print(f"Pasta não existe: {folder_path}", file=sys.stderr)
+                return 1
+
+            scope = make_scope(folder_path, args.depth,
+                               settings.get("watch_ignore_patterns") or [], rules)
+            entries = planner.plan(folder_path, scope)
+            summary = PlanSummary()
+
+            if args.db:
+                plan_id = save_plan(db, folder_path, entries, summary)
+                print(f"Plano {plan_id} gravado no banco de dados", file=sys.stderr)
+            elif args.output == "-":
+                write_jsonl(entries, sys.stdout, summary)
+            else:
+                with open(args.output, "w", encoding="utf-8") as f:
+                    write_jsonl(entries, f, summary)
+
+            for line in summary.lines():
+                print(line, file=sys.stderr)
+            return 0
+
+        # Sem recuperar o diário aqui: o aplicativo pode estar aberto com movimentos
+        # em andamento no mesmo banco (a recuperação fica para a inicialização dele)
+        progress = lambda done: print(f"{done} movimentos processados", file=sys.stderr)
+
+        if args.plan_id is not None:
+            plan = db.get_plan(args.plan_id)
+            if plan is None:
+                print(f"Plano não encontrado: {args.plan_id}", file=sys.stderr)
+                return 1
+            counts = planner.apply(load_plan(db, args.plan_id), progress)
+            db.update_plan(args.plan_id, state="applied")
+        else:
+            with open(args.input, "r", encoding="utf-8") as f:
+                counts = planner.apply(read_jsonl(f), progress)
+
+        for result, count in sorted(counts.items()):
+            print(f"{result}: {count}", file=sys.stderr)
+        return 0 if not counts.get("error") else 2
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+# src/core/retention.py
+import threading
+from config.settings import get_setting
+
+
+class LogRetention:
+    """Tarefa em segundo plano que aplica a política de retenção da tabela de logs."""
+
+    def __init__(self, db, logger, settings=None):
+        self.db = db
+        self.logger = logger
+        self.settings = settings
+
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Inicia a tarefa periódica (a primeira execução é imediata)."""
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="LogRetention", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Interrompe a tarefa (um bloco em andamento termina antes)."""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def run_once(self):
+        """Aplica a retenção uma vez e retorna quantos registros foram removidos."""
+        removed = self.db.purge_logs(
+            max_age_days=get_setting(self.settings, "log_retention_days"),
+            max_rows=get_setting(self.settings, "log_retention_max_rows"),
+            chunk_size=get_setting(self.settings, "log_retention_chunk_size")
+        )
+        if removed:
+            self.logger.info("Retenção de logs aplicada", f"{removed} registros removidos")
+
+        # O diário de movimentações concluídas segue o mesmo prazo dos logs
+        journal_removed = self.db.purge_journal(get_setting(self.settings, "log_retention_days"))
+        if journal_removed:
+            self.logger.info("Retenção do diário aplicada",
+                             f"{journal_removed} movimentações removidas")
+        return removed
+
+    def _run(self):
+        """Executa a retenção no intervalo configurado até ser interrompida."""
+        interval = get_setting(self.settings, "log_retention_interval_hours") * 3600
+        while True:
+            try:
+                self.run_once()
+            except Exception as e:
+                self.logger.error("Erro na retenção de logs", str(e))
+
+            if self._stop_event.wait(interval):
+                break
@@ -0,0 +1,289 @@
+# src/core/rules.py
+import os
+import re
+import time
+import fnmatch
+import posixpath
+import threading
+from string import Formatter
+from config.file_types import FILE_TYPES
+
+# Campos disponíveis no destino de uma regra (ex.: "Imagens/{year}/{month}")
+DESTINATION_FIELDS = {
+    "year": "2000", "month": "01", "day": "01",
+    "type": "Outros", "ext": "txt", "name": "arquivo",
+}
+_DATE_FIELDS = ("year", "month", "day")
+
+# Nomes de pasta possíveis para cada campo (exclusão dos destinos no monitoramento)
+_FIELD_PATTERNS = {"year": "[0-9]{4}", "month": "[0-9]{2}", "day": "[0-9]{2}",
+                   "ext": "[^/]*", "name": "[^/]*"}
+
+_SECONDS_PER_DAY = 86400
+
+
+class RuleError(ValueError):
+    """Regra de organização inválida."""
+
+
+def _number(data, key):
+    """Lê uma condição numérica da regra (None se ausente)."""
+    value = data.get(key)
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        raise RuleError(f"{key} inválido: {value!r}")
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise RuleError(f"{key} inválido: {value!r}")
+
+
+def _destination_pattern(destination):
+    """Converte um destino relativo (já normalizado, com "/") em expressão regular."""
+    type_names = "|".join(re.escape(data["folder_name"]) for data in FILE_TYPES.values())
+    parts = []
+    for literal, field, _, _ in Formatter().parse(destination):
+        parts.append(re.escape(literal))
+        if field is not None:
+            parts.append(f"(?:{type_names})" if field == "type" else _FIELD_PATTERNS[field])
+    return "".join(parts)
+
+
+class _Rule:
+    """Uma regra compilada: condições já convertidas e destino validado."""
+
+    __slots__ = ("order", "name", "extensions", "file_type", "name_match", "source_match",
+                 "min_size", "max_size", "min_age", "max_age", "destination", "uses_date")
+
+    def __init__(self, order, data):
+        self.order = order
+        self.name = data.get("name") or f"regra {order + 1}"
+
+        extensions = data.get("extensions") or []
+        if isinstance(extensions, str):
+            extensions = [extensions]
+        self.extensions = tuple(
+            (ext if ext.startswith(".") else "." + ext).casefold() for ext in extensions)
+
+        self.file_type = data.get("type")
+        if self.file_type is not None and self.file_type not in FILE_TYPES:
+            raise RuleError(f"tipo desconhecido: {self.file_type}")
+
+        try:
+            pattern = data.get("name_regex")
+            self.name_match = re.compile(pattern).search if pattern else None
+        except re.error as e:
+            raise RuleError(f"expressão regular inválida: {e}")
+
+        # Pasta de origem: padrão glob comparado com a pasta onde o arquivo está
+        source = data.get("source")
+        self.source_match = (re.compile(fnmatch.translate(os.path.normcase(source))).match
+                             if source else None)
+
+        # Convertidos aqui: um valor inválido descarta a regra uma única vez
+        self.min_size = _number(data, "min_size")
+        self.max_size = _number(data, "max_size")
+        # Idade pela data de modificação, em segundos
+        min_age_days = _number(data, "min_age_days")
+        max_age_days = _number(data, "max_age_days")
+        self.min_age = min_age_days * _SECONDS_PER_DAY if min_age_days is not None else None
+        self.max_age = max_age_days * _SECONDS_PER_DAY if max_age_days is not None else None
+
+        self.destination = data.get("destination")
+        if not self.destination:
+            raise RuleError("destino ausente")
+        try:
+            self.destination.format_map(DESTINATION_FIELDS)
+        except (KeyError, IndexError, ValueError) as e:
+            raise RuleError(f"destino inválido: {e}")
+
+        # Mover para a própria pasta do arquivo geraria um novo evento a cada movimento
+        # (os campos nunca contêm "/", então cada um é um único nome de pasta)
+        if not os.path.isabs(self.destination) \
+                and posixpath.normpath(self.destination.replace("\\", "/")) == ".":
+            raise RuleError(f"destino é a própria pasta do arquivo: {self.destination}")
+        self.uses_date = any("{" + field in self.destination for field in _DATE_FIELDS)
+
+    def matches(self, name, parent_dir, record, file_type, now):
+        """Indica se o arquivo satisfaz todas as condições da regra."""
+        if self.file_type is not None and file_type != self.file_type:
+            return False
+        if self.min_size is not None and record.size < self.min_size:
+            return False
+        if self.max_size is not None and record.size > self.max_size:
+            return False
+        if self.min_age is not None or self.max_age is not None:
+            age = now - record.mtime_ns / 1e9
+            if self.min_age is not None and age < self.min_age:
+                return False
+            if self.max_age is not None and age > self.max_age:
+                return False
+        if self.name_match is not None and not self.name_match(name):
+            return False
+        if self.source_match is not None and not self.source_match(os.path.normcase(parent_dir)):
+            return False
+        return True
+
+
+class RuleTable:
+    """Tabela de decisão compilada a partir da lista de regras.
+
+    As regras ficam indexadas pela extensão: cada extensão aponta para a lista,
+    já na ordem de prioridade, das regras que a citam (inclusive por um sufixo,
+    ".gz" vale para ".tar.gz") mais as regras sem extensão. Avaliar um arquivo
+    é uma busca no dicionário e o teste das poucas regras dessa lista.
+    """
+
+    def __init__(self, rules, logger=None):
+        compiled = []
+        for order, data in enumerate(rules or []):
+            try:
+                compiled.append(_Rule(order, data))
+            except (RuleError, TypeError, AttributeError) as e:
+                if logger:
+                    logger.warning("Regra de organização ignorada", f"{order + 1}: {str(e)}")
+
+        self.rules = tuple(compiled)
+        self.generic = tuple(rule for rule in compiled if not rule.extensions)
+
+        keys = {ext for rule in compiled for ext in rule.extensions}
+        index = {}
+        for key in keys:
+            index[key] = tuple(rule for rule in compiled
+                               if not rule.extensions
+                               or any(key.endswith(ext) for ext in rule.extensions))
+        self.index = index
+        self.max_parts = max((key.count(".") for key in keys), default=1)
+
+    def candidates(self, file_name):
+        """Retorna as regras a testar para um nome de arquivo, em ordem de prioridade."""
+        if not self.index:
+            return self.generic
+
+        name = file_name.casefold()
+        found = self.generic
+        end = len(name)
+        for _ in range(self.max_parts):
+            dot = name.rfind(".", 0, end)
+            if dot <= 0:
+                break
+            rules = self.index.get(name[dot:])
+            if rules is not None:
+                found = rules
+            end = dot
+        return found
+
+    def match(self, file_name, parent_dir, record, file_type, now=None):
+        """Retorna a primeira regra satisfeita pelo arquivo (ou None)."""
+        rules = self.candidates(file_name)
+        if not rules:
+            return None
+
+        if now is None:
+            now = time.time()
+        for rule in rules:
+            if rule.matches(file_name, parent_dir, record, file_type, now):
+                return rule
+        return None
+
+
+class RoutingRules:
+    """Regras de organização definidas pelo usuário (configuração "routing_rules").
+
+    Cada regra é um dicionário com condições opcionais (extensions, type,
+    name_regex, source, min_size/max_size em bytes, min_age_days/max_age_days)
+    e um destino relativo à pasta do arquivo ou absoluto, que pode usar
+    {year}, {month}, {day} (data de modificação), {type}, {ext} e {name}.
+    Vale a primeira regra satisfeita; sem regra, o arquivo vai para a
+    subpasta do seu tipo.
+    """
+
+    def __init__(self, logger, rules=None):
+        self.logger = logger
+        self._table = RuleTable(rules, logger)
+        self._lock = threading.Lock()
+
+    def load(self, rules):
+        """Recompila as regras (troca atômica; chamado quando a configuração muda)."""
+        table = RuleTable(rules, self.logger)
+        with self._lock:
+            self._table = table
+        return table
+
+    def __bool__(self):
+        return bool(self._table.rules)
+
+    def route(self, file_path, record, file_type):
+        """Retorna a pasta de destino definida pelas regras (None se nenhuma se aplica)."""
+        parent_dir = os.path.dirname(file_path)
+        rule = self._table.match(record.name, parent_dir, record, file_type)
+        if rule is None:
+            return None
+
+        base, ext = os.path.splitext(record.name)
+        fields = {
+            "type": FILE_TYPES[file_type]["folder_name"],
+            "ext": ext[1:].lower(),
+            "name": base,
+        }
+        if rule.uses_date:
+            modified = time.localtime(record.mtime_ns / 1e9)
+            fields["year"] = f"{modified.tm_year:04d}"
+            fields["month"] = f"{modified.tm_mon:02d}"
+            fields["day"] = f"{modified.tm_mday:02d}"
+
+        destination = os.path.normpath(os.path.join(parent_dir,
+                                                    rule.destination.format_map(fields)))
+        # Destino absoluto (ou com "..") que cai na própria pasta: segue o tipo
+        if os.path.normcase(destination) == os.path.normcase(os.path.normpath(parent_dir)):
+            return None
+        return destination
+
+    def destination_roots(self):
+        """Retorna as primeiras pastas (fixas) dos destinos relativos.
+
+        O monitoramento recursivo as exclui, como as subpastas de tipo, para
+        que os arquivos movidos por uma regra não voltem a ser organizados.
+        """
+        roots = set()
+        for rule in self._table.rules:
+            destination = rule.destination.replace("\\", "/")
+            if os.path.isabs(rule.destination):
+                continue
+            first = destination.split("/", 1)[0]
+            if first == "{type}":
+                roots.update(data["folder_name"] for data in FILE_TYPES.values())
+            elif first and "{" not in first and first not in (".", ".."):
+                roots.add(first)
+        return roots
+
+    def destination_patterns(self, folder_path):
+        """Retorna expressões regulares dos destinos que destination_roots não cobre.
+
+        São os destinos relativos que começam por um campo (ex.: "{year}/{month}",
+        válidos em qualquer subpasta) e os absolutos dentro de folder_path
+        (relativos a ela, ancorados com "^"). Os caminhos usam "/".
+        """
+        patterns = []
+        for rule in self._table.rules:
+            if os.path.isabs(rule.destination):
+                try:
+                    relative = os.path.relpath(os.path.normpath(rule.destination), folder_path)
+                except ValueError:
+                    # Outra unidade no Windows
+                    continue
+                if relative == "." or relative.split(os.sep, 1)[0] == "..":
+                    continue
+                patterns.append("^" + _destination_pattern(relative.replace(os.sep, "/")))
+                continue
+
+            destination = posixpath.normpath(rule.destination.replace("\\", "/"))
+            # Depois de "..", o destino pode estar em qualquer pasta acima
+            destination = destination.split("../")[-1]
+            if destination in ("..", ".") or not destination.startswith("{"):
+                continue
+            if destination.split("/", 1)[0] == "{type}":
+                continue
+            patterns.append("(?:^|/)" + _destination_pattern(destination))
+        return patterns
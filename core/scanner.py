@@ -0,0 +1,58 @@
+# src/core/scanner.py
+import os
+from collections import namedtuple
+
+# Registro de um arquivo encontrado na varredura (dados do stat já obtidos)
+FileRecord = namedtuple("FileRecord", ["path", "name", "size", "mtime_ns", "inode", "dev"])
+
+
+def _record(entry):
+    """Cria um FileRecord a partir de um DirEntry (um único stat por arquivo)."""
+    stat = entry.stat()
+    return FileRecord(entry.path, entry.name, stat.st_size, stat.st_mtime_ns,
+                      stat.st_ino, stat.st_dev)
+
+
+def scan_files(directory, skip_names=()):
+    """Gera os arquivos diretamente dentro de um diretório.
+
+    Entradas cujo nome está em skip_names são ignoradas sem stat.
+    """
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name in skip_names:
+                continue
+            try:
+                if entry.is_file():
+                    yield _record(entry)
+            except OSError:
+                continue
+
+
+def walk_files(directory):
+    """Gera todos os arquivos de um diretório e de suas subpastas."""
+    pending = [directory]
+    while pending:
+        current = pending.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                        elif entry.is_file():
+                            yield _record(entry)
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+
+
+def folder_size(directory):
+    """Retorna (bytes, arquivos) de um diretório e de suas subpastas."""
+    total_size = 0
+    count = 0
+    for record in walk_files(directory):
+        total_size += record.size
+        count += 1
+    return total_size, count
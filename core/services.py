@@ -0,0 +1,98 @@
+# src/core/services.py
+import os
+import json
+from config.settings import Settings
+from config.file_types import reload_file_types
+from db.database import Database
+from core.logger import Logger
+from core.file_organizer import FileOrganizer
+from core.journal import MoveJournal
+from core.rules import RoutingRules
+from core.undo import MoveUndo, PinnedFiles
+from core.snapshot import FolderSnapshot
+from core.folder_watcher import FolderWatcher
+from core.retention import LogRetention
+from core.size_ledger import SizeLedger
+
+
+class Services:
+    """Componentes do aplicativo (sem interface), montados a partir das configurações.
+
+    Usado pela janela e pelo modo sem interface (--headless): nada aqui importa
+    PyQt5.
+    """
+
+    def __init__(self, base_dir):
+        # Configurar diretórios
+        self.data_dir = os.path.join(base_dir, "data")
+        os.makedirs(self.data_dir, exist_ok=True)
+        self.logs_dir = os.path.join(base_dir, "logs")
+        os.makedirs(self.logs_dir, exist_ok=True)
+
+        self.settings = Settings(os.path.join(self.data_dir, "config.json"))
+
+        # Compila a tabela de extensões com as extensões extras (e recompila quando mudarem)
+        reload_file_types(self.settings.get("custom_extensions"))
+        self.settings.subscribe("custom_extensions", reload_file_types)
+
+        self.db = Database(os.path.join(self.data_dir, "app_data.db"))
+        self.logger = Logger(self.logs_dir, self.db, self.settings)
+        self.log_retention = LogRetention(self.db, self.logger, self.settings)
+        self.size_ledger = SizeLedger(self.db, self.logger)
+
+        # Iniciar organizador e monitor (componentes opcionais só são importados se ativados)
+        sniffer = None
+        if self.settings.get("content_sniffing"):
+            from core.content_sniffer import ContentSniffer
+            sniffer = ContentSniffer(self.settings.get("sniff_cache_size"))
+        self.duplicates = None
+        if self.settings.get("duplicate_detection"):
+            from core.duplicates import DuplicateDetector
+            self.duplicates = DuplicateDetector(self.db, self.logger,
+                                                self.settings.get("duplicate_action"),
+                                                self.settings.get("duplicate_hash_workers"))
+
+        # Regras de organização do usuário (recompiladas quando mudarem)
+        self.routing_rules = RoutingRules(self.logger, self.settings.get("routing_rules"))
+        self.settings.subscribe("routing_rules", self.routing_rules.load)
+
+        self.file_organizer = FileOrganizer(self.logger, self.size_ledger, sniffer,
+                                            duplicates=self.duplicates,
+                                            journal=MoveJournal(self.db, self.logger),
+                                            rules=self.routing_rules)
+        self.pinned_files = PinnedFiles(self.db)
+        self.folder_watcher = FolderWatcher(self.file_organizer, self.logger, self.settings,
+                                            self.pinned_files, FolderSnapshot(self.db, self.logger))
+        self.move_undo = MoveUndo(self.file_organizer.journal, self.file_organizer.mover,
+                                  self.logger, self.pinned_files,
+                                  workers=self.settings.get("worker_pool_size"))
+
+    def start(self):
+        """Inicia o observador, o pool e as tarefas periódicas."""
+        self.folder_watcher.start()
+        self.log_retention.start()
+        self.size_ledger.start()
+
+    def watch_folders(self):
+        """Inicia o monitoramento das pastas cadastradas; retorna quantas foram iniciadas."""
+        started = 0
+        for folder in self.db.get_all_folders():
+            if not os.path.exists(folder['path']):
+                self.logger.warning("Pasta não encontrada", folder['path'], folder=folder['path'])
+                continue
+
+            ignore_patterns = (json.loads(folder['ignore_patterns'])
+                               if folder['ignore_patterns'] else None)
+            if self.folder_watcher.start_watching(folder['path'], folder['max_depth'],
+                                                  ignore_patterns):
+                started += 1
+        return started
+
+    def stop(self):
+        """Para tudo, grava o que estiver pendente e fecha o banco de dados."""
+        self.folder_watcher.stop()
+        self.log_retention.stop()
+        self.size_ledger.stop()
+        if self.duplicates:
+            self.duplicates.stop()
+        self.db.close()
@@ -0,0 +1,251 @@
+# src/core/size_ledger.py
+import os
+import threading
+from collections import OrderedDict
+from config.file_types import FILE_TYPES
+from core.scanner import walk_files
+
+# Quantidade máxima de arquivos com tamanho conhecido (os usados há mais tempo saem primeiro)
+KNOWN_FILES_LIMIT = 100000
+
+
+class SizeLedger:
+    """Registro incremental de bytes e arquivos por pasta e tipo de arquivo.
+
+    O organizador soma cada movimentação e o observador das subpastas de tipo
+    soma as entradas e subtrai as saídas usando o último tamanho conhecido de
+    cada arquivo. Só as saídas de arquivos sem tamanho conhecido (ou de pastas
+    inteiras) marcam o par (pasta, tipo) para recontagem, feita em lote. As
+    variações ficam em memória e são gravadas no banco em lote por uma thread
+    em segundo plano.
+    """
+
+    def __init__(self, db, logger, flush_interval=2.0):
+        self.db = db
+        self.logger = logger
+        self.flush_interval = flush_interval
+
+        # (pasta, tipo) -> [bytes, arquivos]
+        self._totals = {}
+        self._deltas = {}
+        self._dirty = set()
+        # Último tamanho conhecido: caminho -> ((pasta, tipo), bytes)
+        self._sizes = OrderedDict()
+        # Variações ocorridas durante uma contagem: (pasta, tipo) -> [(caminho, bytes, arquivos)]
+        self._counting = {}
+        self._lock = threading.Lock()
+
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        for row in db.get_ledger():
+            self._totals[(row["folder"], row["file_type"])] = [row["bytes"], row["files"]]
+
+    def start(self):
+        """Inicia a thread de gravação e recontagem."""
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="SizeLedger", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Para a thread e grava as variações pendentes."""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def record_move(self, folder, file_type, size, path=None):
+        """Registra um arquivo movido para a subpasta de um tipo."""
+        if path is None:
+            self._add(folder, file_type, size, 1)
+        else:
+            self.record_added(folder, file_type, path, size)
+
+    def record_added(self, folder, file_type, path, size):
+        """Registra um arquivo que apareceu na subpasta (conta uma única vez por caminho)."""
+        key = (folder, file_type)
+        with self._lock:
+            known = self._sizes.pop(path, None)
+            self._remember(path, key, size)
+            if known is None:
+                self._apply(key, size, 1, path)
+            elif known[0] == key:
+                # O organizador e o observador informam o mesmo arquivo
+                self._apply(key, size - known[1], 0, path)
+            else:
+                self._apply(known[0], -known[1], -1, path)
+                self._apply(key, size, 1, path)
+
+    def record_resized(self, folder, file_type, path, size):
+        """Atualiza o tamanho de um arquivo conhecido (arquivos desconhecidos são ignorados)."""
+        with self._lock:
+            known = self._sizes.get(path)
+            if known is None or known[1] == size:
+                return
+            self._remember(path, known[0], size)
+            self._apply(known[0], size - known[1], 0, path)
+
+    def record_removed(self, folder, file_type, path):
+        """Registra a saída de um arquivo da subpasta.
+
+        Usa o último tamanho conhecido; sem ele, agenda a recontagem do par.
+        """
+        with self._lock:
+            known = self._sizes.pop(path, None)
+            if known is None:
+                self._dirty.add((folder, file_type))
+                return
+            self._apply(known[0], -known[1], -1, path)
+
+    def mark_dirty(self, folder, file_type, directory=None):
+        """Agenda a recontagem de uma subpasta (ex.: pasta removida pelo usuário).
+
+        Os tamanhos conhecidos dentro de directory deixam de valer.
+        """
+        with self._lock:
+            self._dirty.add((folder, file_type))
+            if directory:
+                prefix = directory.rstrip(os.sep) + os.sep
+                for path in [path for path in self._sizes if path.startswith(prefix)]:
+                    del self._sizes[path]
+
+    def schedule_reconcile(self, folder):
+        """Agenda a recontagem de todas as subpastas de tipo de uma pasta."""
+        with self._lock:
+            self._dirty.update((folder, file_type) for file_type in FILE_TYPES)
+
+    def forget(self, folder):
+        """Descarta o registro de uma pasta que deixou de ser monitorada."""
+        with self._lock:
+            for key in [key for key in self._totals if key[0] == folder]:
+                del self._totals[key]
+            for key in [key for key in self._deltas if key[0] == folder]:
+                del self._deltas[key]
+            self._dirty = {key for key in self._dirty if key[0] != folder}
+            for key in [key for key in self._counting if key[0] == folder]:
+                del self._counting[key]
+            for path in [path for path, (key, _) in self._sizes.items() if key[0] == folder]:
+                del self._sizes[path]
+        self.db.delete_ledger(folder)
+
+    def totals(self, folders):
+        """Retorna ({tipo: bytes}, {tipo: arquivos}) somando as pastas informadas."""
+        folders = set(folders)
+        type_bytes = {}
+        type_files = {}
+
+        with self._lock:
+            for (folder, file_type), (size, count) in self._totals.items():
+                if folder in folders and count > 0:
+                    type_bytes[file_type] = type_bytes.get(file_type, 0) + size
+                    type_files[file_type] = type_files.get(file_type, 0) + count
+
+        return type_bytes, type_files
+
+    def begin_count(self, folder, file_type):
+        """Indica o início de uma contagem completa de um par (pasta, tipo).
+
+        As variações ocorridas até set_totals são aplicadas sobre o resultado.
+        """
+        with self._lock:
+            self._counting[(folder, file_type)] = []
+            # Saídas sem tamanho conhecido a partir daqui pedem outra recontagem
+            self._dirty.discard((folder, file_type))
+
+    def cancel_count(self, folder, file_type):
+        """Descarta uma contagem interrompida."""
+        with self._lock:
+            self._counting.pop((folder, file_type), None)
+
+    def set_totals(self, folder, file_type, size, count, paths=None):
+        """Substitui o total de um par (pasta, tipo) após uma contagem completa.
+
+        paths (caminhos vistos na contagem) evita contar duas vezes as variações
+        que a própria contagem já encontrou.
+        """
+        key = (folder, file_type)
+        with self._lock:
+            for path, size_delta, count_delta in self._counting.pop(key, ()):
+                if paths is not None and path is not None:
+                    if count_delta > 0 and path in paths:
+                        continue
+                    if count_delta < 0 and path not in paths:
+                        continue
+                size += size_delta
+                count += count_delta
+
+            self._totals[key] = [size, count]
+            self._deltas.pop(key, None)
+            # Gravado com o lock: uma variação posterior não é sobrescrita
+            self.db.set_ledger_totals([(folder, file_type, size, count)])
+
+    def reconcile(self, folder, file_types=None):
+        """Reconta as subpastas de tipo de uma pasta, percorrendo o disco."""
+        for file_type in file_types or FILE_TYPES:
+            key = (folder, file_type)
+            type_folder = os.path.join(folder, FILE_TYPES[file_type]["folder_name"])
+            self.begin_count(folder, file_type)
+
+            sizes = {}
+            for record in walk_files(type_folder):
+                sizes[record.path] = record.size
+
+            with self._lock:
+                for path, size in sizes.items():
+                    if path not in self._sizes:
+                        self._remember(path, key, size)
+            self.set_totals(folder, file_type, sum(sizes.values()), len(sizes), sizes)
+
+    def flush(self):
+        """Grava no banco as variações acumuladas."""
+        with self._lock:
+            deltas, self._deltas = self._deltas, {}
+
+        if deltas:
+            self.db.apply_ledger_deltas(
+                [(folder, file_type, size, count)
+                 for (folder, file_type), (size, count) in deltas.items()]
+            )
+
+    def _add(self, folder, file_type, size, count):
+        """Soma uma variação ao total em memória e às variações pendentes."""
+        with self._lock:
+            self._apply((folder, file_type), size, count)
+
+    def _apply(self, key, size, count, path=None):
+        """Soma uma variação (chamar com o lock)."""
+        total = self._totals.setdefault(key, [0, 0])
+        total[0] += size
+        total[1] += count
+
+        delta = self._deltas.setdefault(key, [0, 0])
+        delta[0] += size
+        delta[1] += count
+
+        changes = self._counting.get(key)
+        if changes is not None:
+            changes.append((path, size, count))
+
+    def _remember(self, path, key, size):
+        """Guarda o último tamanho conhecido de um arquivo (chamar com o lock)."""
+        self._sizes[path] = (key, size)
+        self._sizes.move_to_end(path)
+        if len(self._sizes) > KNOWN_FILES_LIMIT:
+            self._sizes.popitem(last=False)
+
+    def _run(self):
+        """Grava as variações e recontagens pendentes periodicamente."""
+        while not self._stop_event.wait(self.flush_interval):
+            try:
+                self.flush()
+
+                with self._lock:
+                    dirty, self._dirty = self._dirty, set()
+                for folder, file_type in dirty:
+                    self.reconcile(folder, [file_type])
+            except Exception as e:
+                self.logger.error("Erro ao atualizar registro de espaço", str(e))
@@ -0,0 +1,89 @@
+# src/core/snapshot.py
+import os
+import json
+import zlib
+from core.scanner import FileRecord
+
+
+class FolderSnapshot:
+    """Retrato persistido de cada pasta monitorada (uma linha por pasta ou subpasta).
+
+    Guarda (nome, inode, tamanho, mtime) dos arquivos que ficaram na pasta ao
+    encerrar (ou ao fim da organização inicial), comprimido em uma linha do
+    banco. Arquivos cuja organização falhou não entram no retrato, para serem
+    tentados de novo. Na inicialização, a pasta é listada com um scandir e só
+    os arquivos novos ou alterados (outro inode, tamanho ou mtime) seguem para
+    a organização.
+    """
+
+    def __init__(self, db, logger):
+        self.db = db
+        self.logger = logger
+
+    def load(self, folder_path):
+        """Retorna {nome: (inode, tamanho, mtime_ns)} do último retrato (vazio se não houver)."""
+        data = self.db.get_snapshot(folder_path)
+        if not data:
+            return {}
+
+        try:
+            return {name: tuple(values)
+                    for name, values in json.loads(zlib.decompress(data)).items()}
+        except (ValueError, zlib.error) as e:
+            self.logger.warning("Retrato da pasta inválido", f"{folder_path}: {str(e)}",
+                                folder=folder_path)
+            return {}
+
+    def changed_files(self, folder_path, skip_names=()):
+        """Gera FileRecords dos arquivos novos ou alterados desde o último retrato."""
+        previous = self.load(folder_path)
+
+        with os.scandir(folder_path) as entries:
+            for entry in entries:
+                if entry.name in skip_names:
+                    continue
+                try:
+                    if not entry.is_file():
+                        continue
+
+                    stat = entry.stat()
+                except OSError:
+                    continue
+
+                # Mesmo arquivo e sem alterações desde o retrato
+                if previous.get(entry.name) == (stat.st_ino, stat.st_size, stat.st_mtime_ns):
+                    continue
+
+                yield FileRecord(entry.path, entry.name, stat.st_size, stat.st_mtime_ns,
+                                 stat.st_ino, stat.st_dev)
+
+    def save(self, folder_path, skip_names=(), exclude=()):
+        """Grava o retrato atual da pasta.
+
+        Caminhos em exclude ficam de fora (pendentes ou com falha na organização).
+        """
+        current = {}
+
+        try:
+            with os.scandir(folder_path) as entries:
+                for entry in entries:
+                    if entry.name in skip_names or entry.path in exclude:
+                        continue
+                    try:
+                        if not entry.is_file():
+                            continue
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    current[entry.name] = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        except OSError as e:
+            self.logger.warning("Não foi possível gravar o retrato da pasta",
+                                f"{folder_path}: {str(e)}", folder=folder_path)
+            return False
+
+        data = zlib.compress(json.dumps(current, separators=(",", ":")).encode("utf-8"))
+        return self.db.set_snapshot(folder_path, data)
+
+    def forget(self, folder_path):
+        """Descarta o retrato de uma pasta que deixou de ser monitorada (e de suas subpastas)."""
+        self.db.delete_snapshot(folder_path)
@@ -0,0 +1,194 @@
+# src/core/stability.py
+import os
+import time
+import threading
+
+
+class _Pending:
+    """Estado de um arquivo aguardando estabilizar."""
+
+    __slots__ = ("path", "signature", "last_change", "interval", "due_tick", "closed",
+                 "active")
+
+    def __init__(self, path, now, interval):
+        self.path = path
+        self.signature = None
+        self.last_change = now
+        self.interval = interval
+        self.due_tick = 0
+        self.closed = False
+        self.active = False
+
+
+class StabilityTracker:
+    """Libera arquivos para organização somente depois de ficarem estáveis.
+
+    Cada arquivo pendente é verificado (tamanho e mtime) com intervalos que
+    crescem exponencialmente. Quando o arquivo fica sem alterações durante a
+    janela de quietude, on_stable(path) é chamado. Todos os arquivos pendentes
+    ficam em uma única roda de tempo (timer wheel) atendida por uma thread.
+    """
+
+    def __init__(self, on_stable, logger, quiet_window=1.0, min_interval=0.05,
+                 max_interval=5.0, tick=0.05, wheel_size=256):
+        self.on_stable = on_stable
+        self.logger = logger
+        self.quiet_window = quiet_window
+        self.min_interval = max(min_interval, tick)
+        self.max_interval = max(max_interval, self.min_interval)
+        self.tick = tick
+
+        # Roda de tempo: cada posição guarda os caminhos que vencem naquele tick
+        self._wheel = [set() for _ in range(wheel_size)]
+        self._current_tick = 0
+        self._started_at = time.monotonic()
+
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Inicia a thread da roda de tempo."""
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="StabilityTracker", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Para a thread (arquivos ainda pendentes são descartados)."""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def track(self, path):
+        """Passa a acompanhar um arquivo (ou reinicia a janela se já acompanhado)."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._pending.get(path)
+            if entry is not None:
+                entry.last_change = now
+                entry.closed = False
+                entry.active = True
+                return
+
+            entry = _Pending(path, now, self.min_interval)
+            self._pending[path] = entry
+            self._schedule(entry, now + self.min_interval)
+
+    def touch(self, path):
+        """Registra atividade em um arquivo acompanhado (evento de modificação)."""
+        with self._lock:
+            entry = self._pending.get(path)
+            if entry is not None:
+                entry.last_change = time.monotonic()
+                entry.closed = False
+                entry.active = True
+
+    def mark_closed(self, path):
+        """Indica que o escritor fechou o arquivo, antecipando a verificação."""
+        with self._lock:
+            entry = self._pending.get(path)
+            if entry is not None:
+                entry.closed = True
+                entry.interval = self.min_interval
+                self._schedule(entry, time.monotonic() + self.min_interval)
+
+    def forget(self, path):
+        """Deixa de acompanhar um arquivo (removido ou renomeado)."""
+        with self._lock:
+            self._pending.pop(path, None)
+
+    def pending_paths(self):
+        """Retorna os caminhos que ainda aguardam estabilizar."""
+        with self._lock:
+            return set(self._pending)
+
+    def pending_count(self):
+        """Retorna quantos arquivos aguardam estabilizar."""
+        with self._lock:
+            return len(self._pending)
+
+    def _tick_for(self, moment):
+        """Converte um instante monotônico em número de tick."""
+        return int((moment - self._started_at) / self.tick) + 1
+
+    def _schedule(self, entry, moment):
+        """Agenda a próxima verificação de um arquivo (chamar com o lock)."""
+        entry.due_tick = max(self._tick_for(moment), self._current_tick + 1)
+        self._wheel[entry.due_tick % len(self._wheel)].add(entry.path)
+
+    def _run(self):
+        """Avança a roda de tempo e verifica os arquivos vencidos."""
+        while not self._stop_event.wait(self.tick):
+            target_tick = self._tick_for(time.monotonic())
+            due = []
+
+            with self._lock:
+                while self._current_tick < target_tick:
+                    self._current_tick += 1
+                    slot = self._wheel[self._current_tick % len(self._wheel)]
+                    if not slot:
+                        continue
+
+                    # Entradas de voltas futuras ou reagendadas permanecem na posição
+                    for path in list(slot):
+                        entry = self._pending.get(path)
+                        if entry is None:
+                            slot.discard(path)
+                        elif entry.due_tick <= self._current_tick:
+                            slot.discard(path)
+                            due.append(entry)
+                        elif entry.due_tick % len(self._wheel) != self._current_tick % len(self._wheel):
+                            slot.discard(path)
+
+            for entry in due:
+                self._check(entry)
+
+    def _check(self, entry):
+        """Verifica tamanho e mtime de um arquivo, liberando-o se estiver estável."""
+        try:
+            stat = os.stat(entry.path)
+            signature = (stat.st_size, stat.st_mtime_ns)
+        except OSError:
+            self.forget(entry.path)
+            return
+
+        now = time.monotonic()
+        release = False
+
+        with self._lock:
+            if self._pending.get(entry.path) is not entry:
+                return
+
+            # A primeira leitura serve apenas de referência
+            unchanged = entry.signature is not None and signature == entry.signature
+            if entry.signature is not None and not unchanged:
+                entry.last_change = now
+                entry.closed = False
+                entry.active = True
+            entry.signature = signature
+
+            # Sem atividade observada, um mtime antigo (ex.: arquivo movido para a
+            # pasta) já conta como tempo de quietude
+            window = self.min_interval if entry.closed else self.quiet_window
+            quiet_for = now - entry.last_change
+            if not entry.active:
+                quiet_for = max(quiet_for, time.time() - stat.st_mtime)
+
+            if unchanged and quiet_for >= window:
+                del self._pending[entry.path]
+                release = True
+            else:
+                entry.interval = min(entry.interval * 2, self.max_interval)
+                remaining = max(window - quiet_for, self.min_interval)
+                self._schedule(entry, now + min(entry.interval, remaining))
+
+        if release:
+            try:
+                self.on_stable(entry.path)
+            except Exception as e:
+                self.logger.error("Erro ao liberar arquivo estável", f"{entry.path}: {str(e)}")
@@ -0,0 +1,38 @@
+# src/core/startup.py
+import time
+
+
+class StartupTimer:
+    """Mede as etapas da inicialização e gera o relatório de tempos."""
+
+    def __init__(self, started=None):
+        # Início da contagem (ex.: antes das importações de main.py)
+        self.started = started if started is not None else time.monotonic()
+        # (etapa, instante) na ordem em que foram marcadas
+        self.marks = []
+
+    def mark(self, name):
+        """Registra o fim de uma etapa."""
+        self.marks.append((name, time.monotonic()))
+
+    def elapsed(self):
+        """Segundos desde o início."""
+        return time.monotonic() - self.started
+
+    def report(self):
+        """Retorna a duração de cada etapa e o total ("qt=0.05s ... total=0.30s")."""
+        parts = []
+        previous = self.started
+        for name, instant in self.marks:
+            parts.append(f"{name}={instant - previous:.3f}s")
+            previous = instant
+        parts.append(f"total={previous - self.started:.3f}s")
+        return " ".join(parts)
+
+    def log(self, logger, target=None):
+        """Grava o relatório nos logs, com um aviso se o total passou da meta (segundos)."""
+        logger.info("Tempo de inicialização", self.report())
+
+        total = self.marks[-1][1] - self.started if self.marks else 0.0
+        if target and total > target:
+            logger.warning("Inicialização acima da meta", f"{total:.2f}s (meta: {target:.2f}s)")
@@ -0,0 +1,156 @@
+# src/core/sweep.py
+import threading
+import time
+from core.file_organizer import CATEGORY_FOLDER_NAMES
+from core.scanner import scan_files
+
+
+class SweepProgress:
+    """Andamento da organização inicial de uma pasta."""
+
+    def __init__(self, folder_path):
+        self.folder_path = folder_path
+        self.started = time.monotonic()
+        self.submitted = 0
+        self.done = 0
+        self.enumerated = False
+        self.cancelled = False
+        self.finished = False
+
+
+class InitialSweep:
+    """Organiza em segundo plano os arquivos que já existiam nas pastas monitoradas.
+
+    Uma thread por pasta enumera os arquivos (um scandir por pasta, incluindo
+    as subpastas dentro do WatchScope no monitoramento recursivo) e os envia ao
+    pool de workers pelo agrupador de eventos, que é o mesmo caminho usado pelo
+    watchdog: um arquivo que chega durante a varredura nunca é processado duas
+    vezes. O monitoramento fica ativo desde o início da varredura.
+    """
+
+    def __init__(self, coalescer, logger, on_finished=None, snapshot=None):
+        self.coalescer = coalescer
+        self.logger = logger
+        self.on_finished = on_finished
+        # Retrato da última execução: só arquivos novos desde então são enumerados
+        self.snapshot = snapshot
+
+        # pasta -> (SweepProgress, thread, evento de cancelamento)
+        self._sweeps = {}
+        self._lock = threading.Lock()
+
+    def start(self, folder_path, scope=None):
+        """Inicia (ou reinicia) a varredura de uma pasta (e das subpastas do escopo)."""
+        self.cancel(folder_path)
+
+        progress = SweepProgress(folder_path)
+        cancel_event = threading.Event()
+        thread = threading.Thread(target=self._run, args=(progress, cancel_event, scope),
+                                  name="InitialSweep", daemon=True)
+
+        with self._lock:
+            self._sweeps[folder_path] = (progress, thread, cancel_event)
+        thread.start()
+
+    def cancel(self, folder_path, wait=False):
+        """Interrompe a enumeração de uma pasta (arquivos já enfileirados seguem)."""
+        with self._lock:
+            entry = self._sweeps.pop(folder_path, None)
+
+        if entry is None:
+            return
+
+        progress, thread, cancel_event = entry
+        progress.cancelled = True
+        cancel_event.set()
+        if wait and thread is not threading.current_thread():
+            thread.join()
+
+    def stop(self):
+        """Cancela todas as varreduras e aguarda o fim das enumerações."""
+        with self._lock:
+            folders = list(self._sweeps)
+
+        for folder_path in folders:
+            self.cancel(folder_path, wait=True)
+
+    def progress(self):
+        """Retorna {pasta: (concluídos, enviados, enumeração terminada)} das varreduras ativas."""
+        with self._lock:
+            return {
+                folder_path: (progress.done, progress.submitted, progress.enumerated)
+                for folder_path, (progress, _, _) in self._sweeps.items()
+                if not progress.finished
+            }
+
+    def is_running(self, folder_path):
+        """Indica se a pasta ainda está em organização inicial."""
+        with self._lock:
+            entry = self._sweeps.get(folder_path)
+            return entry is not None and not entry[0].finished
+
+    def _run(self, progress, cancel_event, scope=None):
+        """Enumera a pasta (e as subpastas do escopo) e envia os arquivos ao pool."""
+        folder_path = progress.folder_path
+        on_done = lambda file_path: self._file_done(progress)
+        directories = scope.walk_dirs() if scope else [folder_path]
+
+        for directory in directories:
+            if cancel_event.is_set():
+                break
+
+            if self.snapshot:
+                records = self.snapshot.changed_files(directory, CATEGORY_FOLDER_NAMES)
+            else:
+                records = scan_files(directory, CATEGORY_FOLDER_NAMES)
+
+            try:
+                for record in records:
+                    if cancel_event.is_set():
+                        break
+                    if scope and not scope.accepts(record.path):
+                        continue
+
+                    # Conta antes de enviar: o worker pode terminar antes do retorno
+                    with self._lock:
+                        progress.submitted += 1
+                    if not self.coalescer.sweep(record, on_done):
+                        with self._lock:
+                            progress.submitted -= 1
+            except OSError as e:
+                self.logger.error("Erro na organização inicial", f"{directory}: {str(e)}")
+
+        with self._lock:
+            progress.enumerated = True
+        self._check_finished(progress)
+
+    def _file_done(self, progress):
+        """Chamado pelo pool quando um arquivo da varredura termina."""
+        with self._lock:
+            progress.done += 1
+        self._check_finished(progress)
+
+    def _check_finished(self, progress):
+        """Conclui a varredura quando tudo o que foi enviado terminou."""
+        with self._lock:
+            if (progress.finished or not progress.enumerated
+                    or progress.done < progress.submitted):
+                return
+            progress.finished = True
+            if self._sweeps.get(progress.folder_path, (None,))[0] is progress:
+                del self._sweeps[progress.folder_path]
+
+        if progress.cancelled:
+            return
+
+        elapsed = time.monotonic() - progress.started
+        self.logger.info("Organização inicial concluída",
+                         f"{progress.done} arquivos em {elapsed:.1f}s",
+                         folder=progress.folder_path)
+
+        if self.on_finished:
+            try:
+                self.on_finished(progress.folder_path)
+            except Exception as e:
+                self.logger.error("Erro ao concluir organização inicial",
+                                  f"{progress.folder_path}: {str(e)}")
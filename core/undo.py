@@ -0,0 +1,164 @@
+# src/core/undo.py
+import os
+import errno
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class PinnedFiles:
+    """Arquivos que o monitor não deve reorganizar (ex.: devolvidos por um desfazer).
+
+    Um arquivo deixa de ser fixado quando muda (outro inode ou mtime), então
+    uma nova versão com o mesmo nome volta a ser organizada normalmente.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        # caminho -> (inode, mtime_ns)
+        self._files = {row["path"]: (row["inode"], row["mtime_ns"])
+                       for row in db.get_pinned_files()}
+        self._lock = threading.Lock()
+
+    def add_many(self, files, persist=True):
+        """Fixa vários arquivos (lista de (caminho, inode, mtime_ns)).
+
+        persist=False fixa apenas em memória (gravar depois com save).
+        """
+        with self._lock:
+            for path, inode, mtime_ns in files:
+                self._files[path] = (inode, mtime_ns)
+        if persist:
+            self.save(files)
+
+    def save(self, files):
+        """Grava no banco arquivos já fixados em memória."""
+        self.db.add_pinned_files(files)
+
+    def is_pinned(self, path, inode, mtime_ns):
+        """Indica se o arquivo está fixado; um arquivo alterado é liberado."""
+        with self._lock:
+            pinned = self._files.get(path)
+            if pinned is None:
+                return False
+            if pinned == (inode, mtime_ns):
+                return True
+            del self._files[path]
+
+        self.db.delete_pinned_file(path)
+        return False
+
+
+class MoveUndo:
+    """Desfaz movimentações registradas no diário, em lotes e em paralelo.
+
+    Cada arquivo volta para o caminho de origem sem substituir nada que esteja
+    lá: no mesmo dispositivo com link + unlink (uma renomeação que falha se o
+    nome estiver ocupado), entre dispositivos pelo FileMover.move_exclusive,
+    que também não substitui o que aparecer na origem. Os arquivos
+    devolvidos ficam fixados para não serem reorganizados pelo monitor.
+    """
+
+    def __init__(self, journal, mover, logger, pinned=None, workers=4, batch_size=500):
+        self.journal = journal
+        self.db = journal.db
+        self.mover = mover
+        self.logger = logger
+        self.pinned = pinned
+        self.workers = max(1, int(workers))
+        self.batch_size = max(1, int(batch_size))
+
+    def select(self, last=None, folder=None, since=None, until=None):
+        """Retorna as movimentações a desfazer (as últimas N ou de uma pasta em um período)."""
+        # Conclusões ainda em memória também entram no histórico
+        self.journal.flush()
+        return self.db.journal_history(limit=last, folder=folder, since=since, until=until)
+
+    def run(self, entries, on_progress=None, is_cancelled=None):
+        """Desfaz as movimentações informadas; retorna {resultado: quantidade}.
+
+        on_progress(concluídas, total) é chamado após cada lote.
+        """
+        entries = list(entries)
+        total = len(entries)
+        counts = {}
+        done = 0
+
+        with ThreadPoolExecutor(max_workers=self.workers,
+                                thread_name_prefix="MoveUndo") as executor:
+            for start in range(0, total, self.batch_size):
+                if is_cancelled and is_cancelled():
+                    break
+
+                batch = entries[start:start + self.batch_size]
+                results = list(executor.map(self._restore, batch))
+
+                finished = []
+                pinned = []
+                for entry, (result, stat) in zip(batch, results):
+                    counts[result] = counts.get(result, 0) + 1
+                    if result == "undone":
+                        finished.append((entry["id"], "undone"))
+                        pinned.append((entry["source"], stat.st_ino, stat.st_mtime_ns))
+                    elif result == "missing":
+                        finished.append((entry["id"], "missing"))
+
+                # Um lote por transação
+                self.db.journal_finish(finished)
+                if self.pinned and pinned:
+                    self.pinned.save(pinned)
+
+                done += len(batch)
+                if on_progress:
+                    on_progress(done, total)
+
+        details = ", ".join(f"{result}={count}" for result, count in sorted(counts.items()))
+        self.logger.info("Movimentações desfeitas", details)
+        return counts
+
+    def _restore(self, entry):
+        """Devolve um arquivo à origem; retorna (resultado, stat do arquivo devolvido)."""
+        source = entry["source"]
+        destination = entry["destination"]
+
+        try:
+            # Fixa antes de devolver, para o monitor nunca reorganizar o arquivo
+            try:
+                self._pin(source, os.stat(destination))
+            except FileNotFoundError:
+                return "missing", None
+
+            try:
+                os.link(destination, source)
+                os.unlink(destination)
+            except FileExistsError:
+                return "conflict", None
+            except FileNotFoundError:
+                if not os.path.lexists(destination):
+                    return "missing", None
+                # A pasta de origem foi removida: recria e tenta de novo
+                os.makedirs(os.path.dirname(source), exist_ok=True)
+                os.link(destination, source)
+                os.unlink(destination)
+            except OSError as e:
+                # Sem hard links (outro dispositivo ou sistema de arquivos): move
+                if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP,
+                                   errno.EOPNOTSUPP):
+                    raise
+                # Copia para um temporário e o coloca no lugar sem substituir nada
+                try:
+                    self.mover.move_exclusive(destination, source)
+                except FileExistsError:
+                    return "conflict", None
+                # A cópia entre dispositivos gera outro inode
+                self._pin(source, os.stat(source))
+
+            return "undone", os.stat(source)
+        except OSError as e:
+            self.logger.error("Erro ao desfazer movimentação", f"{destination}: {str(e)}",
+                              folder=entry["folder"])
+            return "error", None
+
+    def _pin(self, path, stat):
+        """Fixa um arquivo em memória (gravado no banco ao fim do lote)."""
+        if self.pinned:
+            self.pinned.add_many([(path, stat.st_ino, stat.st_mtime_ns)], persist=False)
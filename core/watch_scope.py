@@ -0,0 +1,219 @@
+# src/core/watch_scope.py
+import os
+import re
+from core.file_organizer import CATEGORY_FOLDER_NAMES
+
+
+def _translate(glob):
+    """Converte um padrão estilo .gitignore (sem ! e sem a / final) em expressão regular."""
+    parts = []
+    i = 0
+    n = len(glob)
+    while i < n:
+        c = glob[i]
+        if c == "*":
+            if glob.startswith("**", i):
+                # "**/" casa zero ou mais pastas; "**" no fim casa qualquer coisa
+                if glob.startswith("**/", i):
+                    parts.append("(?:.*/)?")
+                    i += 3
+                else:
+                    parts.append(".*")
+                    i += 2
+                continue
+            parts.append("[^/]*")
+        elif c == "?":
+            parts.append("[^/]")
+        elif c == "[":
+            end = glob.find("]", i + 2)
+            if end == -1:
+                parts.append(re.escape(c))
+            else:
+                content = glob[i + 1:end].replace("\\", "\\\\")
+                if content[0] == "!":
+                    content = "^" + content[1:]
+                parts.append(f"[{content}]")
+                i = end
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            parts.append(re.escape(glob[i]))
+        else:
+            parts.append(re.escape(c))
+        i += 1
+    return "".join(parts)
+
+
+def _is_literal(glob):
+    """Indica se o padrão é um nome simples, sem curingas."""
+    return not any(c in glob for c in "*?[\\")
+
+
+class IgnoreMatcher:
+    """Padrões de exclusão no estilo .gitignore, compilados uma única vez.
+
+    Suporta *, ?, [abc], ** (qualquer número de pastas), / final (só pastas),
+    / no início ou no meio (relativo à pasta monitorada) e ! (reinclui o que
+    outro padrão excluiu). Nomes simples ("node_modules/", ".git/") viram um
+    conjunto consultado por componente do caminho; os demais padrões formam
+    uma única expressão regular. Uma pasta excluída exclui tudo o que está
+    dentro dela. Os caminhos são relativos à pasta monitorada, separados por
+    "/"; pastas terminam em "/".
+    """
+
+    def __init__(self, patterns=(), excluded_dirs=(), excluded_patterns=()):
+        # Nomes de pastas sempre excluídas (não podem ser reincluídos com !)
+        self.excluded_dirs = frozenset(excluded_dirs)
+        self.patterns = [p for p in (line.strip() for line in patterns)
+                         if p and not p.startswith("#")]
+
+        self._names = set()      # nomes simples excluídos (arquivo ou pasta)
+        self._dir_names = set()  # nomes simples excluídos apenas como pasta
+        ignore = []
+        negate = []
+
+        for pattern in self.patterns:
+            negated = pattern.startswith("!")
+            if negated or pattern.startswith("\\!") or pattern.startswith("\\#"):
+                pattern = pattern[1:]
+
+            dir_only = pattern.endswith("/")
+            pattern = pattern.rstrip("/")
+            if not pattern:
+                continue
+
+            # Uma / no início ou no meio ancora o padrão na pasta monitorada
+            anchored = "/" in pattern
+            pattern = pattern.lstrip("/")
+
+            if not negated and not anchored and _is_literal(pattern):
+                (self._dir_names if dir_only else self._names).add(pattern)
+                continue
+
+            prefix = "^" if anchored else "(?:^|/)"
+            suffix = "/" if dir_only else "(?:/|$)"
+            (negate if negated else ignore).append(f"{prefix}{_translate(pattern)}{suffix}")
+
+        flags = re.IGNORECASE if os.name == "nt" else 0
+        self._ignore = re.compile("|".join(ignore), flags).search if ignore else None
+        self._negate = re.compile("|".join(negate), flags).search if negate else None
+        # Pastas sempre excluídas descritas por expressões regulares (ex.: destinos
+        # "{year}/{month}" das regras); cada uma casa a pasta seguida de "/"
+        self._excluded = (re.compile("|".join(f"(?:{p})/" for p in excluded_patterns),
+                                     flags).search
+                          if excluded_patterns else None)
+
+        # Algum padrão pode excluir um arquivo direto na pasta monitorada
+        self.filters_files = bool(self._names or self._ignore)
+
+    def matches(self, relative_path):
+        """Indica se o caminho relativo está excluído (pastas terminam em "/")."""
+        if not relative_path:
+            return False
+        if self._excluded is not None and self._excluded(relative_path):
+            return True
+
+        components = relative_path.split("/")
+        # O último componente só é pasta quando o caminho termina em "/"
+        last = len(components) - 1
+        for index, name in enumerate(components):
+            if index == last:
+                if name and name in self._names:
+                    break
+                continue
+            if name in self.excluded_dirs:
+                return True
+            if name in self._dir_names or name in self._names:
+                break
+        else:
+            if self._ignore is None or not self._ignore(relative_path):
+                return False
+
+        return self._negate is None or not self._negate(relative_path)
+
+
+def make_scope(folder_path, max_depth=0, patterns=(), rules=None):
+    """Monta o escopo de uma pasta excluindo as subpastas de tipo e os destinos das regras."""
+    excluded_dirs = set(CATEGORY_FOLDER_NAMES)
+    excluded_patterns = ()
+    if rules:
+        excluded_dirs.update(rules.destination_roots())
+        excluded_patterns = rules.destination_patterns(os.path.normpath(folder_path))
+    return WatchScope(folder_path, max_depth, patterns, excluded_dirs=excluded_dirs,
+                      excluded_patterns=excluded_patterns)
+
+
+class WatchScope:
+    """Define quais arquivos abaixo de uma pasta monitorada são organizados.
+
+    max_depth limita as subpastas (0 = apenas a própria pasta, None = sem
+    limite) e o IgnoreMatcher exclui caminhos; as subpastas de tipo criadas
+    pelo próprio aplicativo são sempre excluídas, para que as movimentações
+    não gerem novos eventos.
+    """
+
+    def __init__(self, root, max_depth=0, patterns=(), excluded_dirs=(), excluded_patterns=()):
+        self.root = os.path.normpath(root)
+        self.max_depth = max_depth
+        self.matcher = IgnoreMatcher(patterns, excluded_dirs, excluded_patterns)
+        self._prefix = self.root.rstrip(os.sep) + os.sep
+
+    @property
+    def recursive(self):
+        """Indica se as subpastas também são monitoradas."""
+        return self.max_depth is None or self.max_depth > 0
+
+    @property
+    def filters(self):
+        """Indica se o escopo pode recusar algum evento (senão a verificação é dispensável)."""
+        return self.recursive or self.matcher.filters_files
+
+    def relative(self, path):
+        """Retorna o caminho relativo à pasta monitorada, separado por "/" (None se estiver fora).
+
+        Aceita os dois separadores no Windows (o watchdog monta os caminhos dos
+        eventos a partir do caminho agendado, ex.: "C:/Users/x\\a.txt").
+        """
+        if os.altsep:
+            path = path.replace(os.altsep, os.sep)
+        if not path.startswith(self._prefix):
+            return None
+        relative = path[len(self._prefix):]
+        if os.sep != "/":
+            relative = relative.replace(os.sep, "/")
+        return relative
+
+    def accepts(self, path, is_dir=False):
+        """Indica se o arquivo (ou os arquivos dentro da pasta) deve ser organizado."""
+        relative = self.relative(path)
+        if not relative:
+            return relative is not None and is_dir
+
+        # Profundidade dos arquivos: 0 para os que estão direto na pasta monitorada
+        depth = relative.count("/") + (1 if is_dir else 0)
+        if self.max_depth is not None and depth > self.max_depth:
+            return False
+
+        return not self.matcher.matches(relative + "/" if is_dir else relative)
+
+    def walk_dirs(self):
+        """Gera a pasta monitorada e as subpastas dentro do escopo (sem stat)."""
+        pending = [(self.root, 0)]
+        while pending:
+            directory, depth = pending.pop()
+            yield directory
+
+            if self.max_depth is not None and depth >= self.max_depth:
+                continue
+
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        try:
+                            if not entry.is_dir(follow_symlinks=False):
+                                continue
+                        except OSError:
+                            continue
+                        if self.accepts(entry.path, is_dir=True):
+                            pending.append((entry.path, depth + 1))
+            except OSError:
+                continue
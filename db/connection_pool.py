@@ -0,0 +1,127 @@
+# src/db/connection_pool.py
+import os
+import sqlite3
+import pathlib
+import threading
+from contextlib import contextmanager
+
+
+class ConnectionPool:
+    """Gerencia as conexões SQLite: uma de escrita e um pool de leitura.
+
+    O banco usa WAL, então leituras nunca esperam pelos commits da conexão de
+    escrita. A conexão de escrita é compartilhada entre threads e protegida
+    por write_lock; as de leitura são abertas em modo somente leitura.
+    """
+
+    def __init__(self, db_file, max_readers=2, cache_size_mb=16, mmap_size_mb=64):
+        self.db_file = os.path.abspath(db_file)
+        self.max_readers = max(1, int(max_readers))
+        self.cache_size_mb = cache_size_mb
+        self.mmap_size_mb = mmap_size_mb
+
+        self.write_lock = threading.RLock()
+        self._writer = None
+
+        # Conexões de leitura livres; as emprestadas só são fechadas ao serem devolvidas
+        self._idle = []
+        self._reader_count = 0
+        self._readers_cond = threading.Condition()
+        self._closed = False
+
+    def _configure(self, conn):
+        """Aplica os pragmas de desempenho a uma conexão."""
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA busy_timeout = 5000")
+        conn.execute(f"PRAGMA cache_size = -{int(self.cache_size_mb * 1024)}")
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size_mb * 1024 * 1024)}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        return conn
+
+    def writer(self):
+        """Retorna a conexão de escrita (usar sempre com write_lock).
+
+        Depois de close() levanta sqlite3.ProgrammingError em vez de reabrir.
+        """
+        if self._writer is None:
+            with self.write_lock:
+                if self._closed:
+                    raise sqlite3.ProgrammingError("Pool de conexões fechado")
+                if self._writer is None:
+                    conn = sqlite3.connect(self.db_file, check_same_thread=False)
+                    conn.execute("PRAGMA journal_mode = WAL")
+                    conn.execute("PRAGMA synchronous = NORMAL")
+                    self._writer = self._configure(conn)
+        return self._writer
+
+    @contextmanager
+    def reader(self):
+        """Empresta uma conexão somente leitura do pool."""
+        conn = self._acquire_reader()
+        try:
+            yield conn
+        finally:
+            self._release_reader(conn)
+
+    def _acquire_reader(self):
+        """Obtém uma conexão livre, criando uma nova se o pool ainda não está cheio.
+
+        Espera por uma conexão devolvida quando todas estão emprestadas; depois
+        de close() levanta sqlite3.ProgrammingError (inclusive para quem espera).
+        """
+        with self._readers_cond:
+            while True:
+                if self._closed:
+                    raise sqlite3.ProgrammingError("Pool de conexões fechado")
+                if self._idle:
+                    return self._idle.pop()
+                if self._reader_count < self.max_readers:
+                    self._reader_count += 1
+                    break
+                self._readers_cond.wait()
+
+        try:
+            # Garante que o banco (e o WAL) exista antes de abrir em modo somente leitura
+            self.writer()
+            uri = pathlib.Path(self.db_file).as_uri() + "?mode=ro"
+            return self._configure(sqlite3.connect(uri, uri=True, check_same_thread=False))
+        except sqlite3.Error:
+            with self._readers_cond:
+                self._reader_count -= 1
+                self._readers_cond.notify()
+            raise
+
+    def _release_reader(self, conn):
+        """Devolve uma conexão ao pool (ou a fecha, se o pool já foi fechado)."""
+        with self._readers_cond:
+            if not self._closed:
+                self._idle.append(conn)
+                self._readers_cond.notify()
+                return
+            self._reader_count -= 1
+
+        conn.close()
+
+    def close(self):
+        """Fecha as conexões livres e a de escrita.
+
+        As conexões de leitura emprestadas continuam válidas até serem
+        devolvidas; novas requisições levantam sqlite3.ProgrammingError.
+        """
+        with self._readers_cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._reader_count -= len(idle)
+            # Acorda quem espera por uma conexão livre
+            self._readers_cond.notify_all()
+
+        for conn in idle:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+        with self.write_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
@@ -1,39 +1,57 @@
 # src/db/database.py
 import os
+import json
 import sqlite3
+import time
 import datetime
 import threading
 import queue
+from db.connection_pool import ConnectionPool
+
+# Marcador para encerrar a thread de escrita de logs
+_STOP = object()
+
+# Versão do esquema (PRAGMA user_version), usada pelas migrações
+SCHEMA_VERSION = 4
+
+# Prefixos usados nas ações antes da coluna "level" existir
+_LEGACY_LEVEL_PREFIXES = (("ERRO - ", "ERROR"), ("AVISO - ", "WARNING"))
 
 
 class Database:
-    def __init__(self, db_file="app_data.db"):
+    def __init__(self, db_file="app_data.db", log_batch_size=500, log_flush_interval=0.5,
+                 max_readers=2, cache_size_mb=16, mmap_size_mb=64):
         # Garante que o diretório existe
         os.makedirs(os.path.dirname(os.path.abspath(db_file)), exist_ok=True)
 
         self.db_file = db_file
-        self.thread_local = threading.local()
-        self.lock = threading.Lock()
 
-        # Fila para operações assíncronas
-        self._queue = queue.Queue()
-        self._worker_thread = threading.Thread(target=self._worker, daemon=True)
-        self._worker_thread.start()
+        # Uma conexão de escrita (WAL) e um pool de conexões somente leitura
+        self.pool = ConnectionPool(db_file, max_readers=max_readers,
+                                   cache_size_mb=cache_size_mb, mmap_size_mb=mmap_size_mb)
+        self.lock = self.pool.write_lock
+
+        # Fila de logs gravados em lote (uma transação por lote)
+        self.log_batch_size = log_batch_size
+        self.log_flush_interval = log_flush_interval
+        self._log_queue = queue.Queue()
+        # Depois de close() os logs são descartados (com o erro informado)
+        self._log_lock = threading.Lock()
+        self._logs_closed = False
+        self._log_thread = threading.Thread(target=self._log_writer, daemon=True)
+        self._log_thread.start()
 
-        # Conecta no thread principal
+        # Conecta e cria as tabelas
         self.get_connection()
         self._create_tables()
 
     def get_connection(self):
-        """Obtém uma conexão específica para cada thread."""
-        if not hasattr(self.thread_local, "conn"):
-            try:
-                self.thread_local.conn = sqlite3.connect(self.db_file)
-                self.thread_local.conn.row_factory = sqlite3.Row
-            except sqlite3.Error as e:
-                print(f"Erro ao conectar ao banco de dados: {e}")
-                return None
-        return self.thread_local.conn
+        """Obtém a conexão de escrita (compartilhada, usar com self.lock)."""
+        try:
+            return self.pool.writer()
+        except sqlite3.Error as e:
+            print(f"Erro ao conectar ao banco de dados: {e}")
+            return None
 
     def _create_tables(self):
         """Cria as tabelas se não existirem."""
@@ -42,61 +60,181 @@ class Database:
             return
 
         try:
-            cursor = conn.cursor()
+            with self.lock:
+                cursor = conn.cursor()
+
+                # Permite devolver páginas livres aos poucos (só vale para bancos novos)
+                cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+
+                # Tabela de pastas monitoradas
+                cursor.execute('''
+                CREATE TABLE IF NOT EXISTS monitored_folders (
+                    id INTEGER PRIMARY KEY,
+                    path TEXT UNIQUE,
+                    active BOOLEAN,
+                    max_depth INTEGER,
+                    ignore_patterns TEXT
+                )
+                ''')
+
+                # Tabela de logs (id crescente é a ordem de paginação)
+                cursor.execute('''
+                CREATE TABLE IF NOT EXISTS logs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp TEXT,
+                    action TEXT,
+                    details TEXT,
+                    level TEXT DEFAULT 'INFO',
+                    folder TEXT
+                )
+                ''')
+
+                # Espaço ocupado por pasta monitorada e tipo de arquivo
+                cursor.execute('''
+                CREATE TABLE IF NOT EXISTS size_ledger (
+                    folder TEXT,
+                    file_type TEXT,
+                    bytes INTEGER DEFAULT 0,
+                    files INTEGER DEFAULT 0,
+                    PRIMARY KEY (folder, file_type)
+                )
+                ''')
+
+                # Índice de conteúdo dos arquivos organizados (detecção de duplicados)
+                cursor.execute('''
+                CREATE TABLE IF NOT EXISTS file_hashes (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER,
+                    mtime_ns INTEGER,
+                    partial_hash TEXT,
+                    full_hash TEXT
+                )
+                ''')
+
+                # Diário de movimentações: gravado antes de cada movimento (planned) e
+                # concluído depois (done, failed ou rolled_back)
+                cursor.execute('''
+                CREATE TABLE IF NOT EXISTS move_journal (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp TEXT,
+                    source TEXT,
+                    destination TEXT,
+                    folder TEXT,
+                    file_type TEXT,
+                    size INTEGER,
+                    state TEXT DEFAULT 'planned',
+                    inode INTEGER,
+                    mtime_ns INTEGER
+                )
+                ''')
+
+                # Retrato compacto de cada pasta monitorada ao encerrar (varredura de retomada)
+                cursor.execute('''
+                CREATE TABLE IF NOT EXISTS folder_snapshots (
+                    folder TEXT PRIMARY KEY,
+                    timestamp TEXT,
+                    data BLOB
+                )
+                ''')
 
-            # Tabela de pastas monitoradas
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS monitored_folders (
-                id INTEGER PRIMARY KEY,
-                path TEXT UNIQUE,
-                active BOOLEAN
-            )
-            ''')
+                # Arquivos devolvidos por um desfazer: não são reorganizados enquanto
+                # continuarem iguais (mesmo inode e mtime)
+                cursor.execute('''
+                CREATE TABLE IF NOT EXISTS pinned_files (
+                    path TEXT PRIMARY KEY,
+                    inode INTEGER,
+                    mtime_ns INTEGER
+                )
+                ''')
 
-            # Tabela de logs
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS logs (
-                id INTEGER PRIMARY KEY,
-                timestamp TEXT,
-                action TEXT,
-                details TEXT
-            )
-            ''')
+                # Planos de organização (simulação revisável, aplicada depois em lote)
+                cursor.execute('''
+                CREATE TABLE IF NOT EXISTS move_plans (
+                    id INTEGER PRIMARY KEY,
+                    timestamp TEXT,
+                    folder TEXT,
+                    files INTEGER DEFAULT 0,
+                    bytes INTEGER DEFAULT 0,
+                    state TEXT DEFAULT 'pending'
+                )
+                ''')
 
-            conn.commit()
+                cursor.execute('''
+                CREATE TABLE IF NOT EXISTS move_plan_entries (
+                    id INTEGER PRIMARY KEY,
+                    plan_id INTEGER,
+                    source TEXT,
+                    destination TEXT,
+                    file_type TEXT,
+                    size INTEGER,
+                    inode INTEGER,
+                    mtime_ns INTEGER
+                )
+                ''')
+
+                self._migrate(cursor)
+
+                # Índices para consultas filtradas com paginação por cursor (id)
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_logs_timestamp ON logs (timestamp)")
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_logs_level ON logs (level, id)")
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_logs_action ON logs (action, id)")
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_logs_folder ON logs (folder, id)")
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_file_hashes_partial "
+                               "ON file_hashes (size, partial_hash)")
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_move_journal_state "
+                               "ON move_journal (state, id)")
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_move_journal_folder "
+                               "ON move_journal (folder, id)")
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_move_plan_entries_plan "
+                               "ON move_plan_entries (plan_id, id)")
+
+                conn.commit()
         except sqlite3.Error as e:
             print(f"Erro ao criar tabelas: {e}")
 
-    def _worker(self):
-        """Thread worker para processar operações assíncronas."""
-        while True:
-            try:
-                # Obtem um item da fila (bloqueia até que um item esteja disponível)
-                func, args, kwargs, result_queue = self._queue.get()
+    def _migrate(self, cursor):
+        """Atualiza bancos criados por versões anteriores (chamar com self.lock)."""
+        version = cursor.execute("PRAGMA user_version").fetchone()[0]
 
-                # Executa a função
-                try:
-                    result = func(*args, **kwargs)
-                    result_queue.put((True, result))
-                except Exception as e:
-                    result_queue.put((False, str(e)))
-                finally:
-                    self._queue.task_done()
-            except Exception as e:
-                print(f"Erro no worker do banco de dados: {e}")
-
-    def execute_async(self, func, *args, **kwargs):
-        """Executa uma função no thread worker."""
-        result_queue = queue.Queue()
-        self._queue.put((func, args, kwargs, result_queue))
-        success, result = result_queue.get()
-        if success:
-            return result
-        else:
-            raise Exception(f"Erro na execução assíncrona: {result}")
-
-    def add_folder(self, path):
-        """Adiciona uma pasta para monitoramento."""
+        if version < 1:
+            # Logs ganham nível e pasta; o nível deixa de ficar no texto da ação
+            columns = {row[1] for row in cursor.execute("PRAGMA table_info(logs)")}
+            if "level" not in columns:
+                cursor.execute("ALTER TABLE logs ADD COLUMN level TEXT DEFAULT 'INFO'")
+                for prefix, level in _LEGACY_LEVEL_PREFIXES:
+                    cursor.execute("UPDATE logs SET level = ?, action = substr(action, ?) "
+                                   "WHERE action LIKE ?", (level, len(prefix) + 1, prefix + "%"))
+            if "folder" not in columns:
+                cursor.execute("ALTER TABLE logs ADD COLUMN folder TEXT")
+
+        # Versão 2 não muda o esquema: bancos antigos seguem sem auto_vacuum
+        # incremental (ativá-lo exigiria um VACUUM completo, lento e com o dobro
+        # do espaço em disco); a retenção em blocos reaproveita as páginas livres
+
+        if version < 3:
+            # Profundidade e padrões de exclusão por pasta (NULL usa as configurações)
+            columns = {row[1] for row in cursor.execute("PRAGMA table_info(monitored_folders)")}
+            if "max_depth" not in columns:
+                cursor.execute("ALTER TABLE monitored_folders ADD COLUMN max_depth INTEGER")
+            if "ignore_patterns" not in columns:
+                cursor.execute("ALTER TABLE monitored_folders ADD COLUMN ignore_patterns TEXT")
+
+        if version < 4:
+            # Identidade da origem no diário (a recuperação só mexe no mesmo arquivo)
+            columns = {row[1] for row in cursor.execute("PRAGMA table_info(move_journal)")}
+            if "inode" not in columns:
+                cursor.execute("ALTER TABLE move_journal ADD COLUMN inode INTEGER")
+            if "mtime_ns" not in columns:
+                cursor.execute("ALTER TABLE move_journal ADD COLUMN mtime_ns INTEGER")
+
+        cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def add_folder(self, path, max_depth=None, ignore_patterns=None):
+        """Adiciona uma pasta para monitoramento.
+
+        max_depth e ignore_patterns (lista) valem só para esta pasta; None usa
+        as configurações gerais.
+        """
         conn = self.get_connection()
         if not conn:
             return None
@@ -104,8 +242,10 @@ class Database:
         try:
             with self.lock:
                 cursor = conn.cursor()
-                cursor.execute("INSERT OR IGNORE INTO monitored_folders (path, active) VALUES (?, ?)",
-                               (path, True))
+                cursor.execute("INSERT OR IGNORE INTO monitored_folders "
+                               "(path, active, max_depth, ignore_patterns) VALUES (?, ?, ?, ?)",
+                               (path, True, max_depth,
+                                json.dumps(ignore_patterns) if ignore_patterns is not None else None))
                 conn.commit()
                 return cursor.lastrowid
         except sqlite3.Error as e:
@@ -130,56 +270,580 @@ class Database:
 
     def get_all_folders(self):
         """Retorna todas as pastas monitoradas."""
+        try:
+            with self.pool.reader() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT * FROM monitored_folders WHERE active = 1")
+                return cursor.fetchall()
+        except sqlite3.Error as e:
+            print(f"Erro ao buscar pastas: {e}")
+            return []
+
+    def add_log(self, action, details, level="INFO", folder=None):
+        """Adiciona um registro de log (thread-safe, sem esperar a gravação).
+
+        Depois de close() o registro é descartado e o erro é informado.
+        """
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        row = (timestamp, action, details, level, folder)
+        with self._log_lock:
+            if not self._logs_closed:
+                self._log_queue.put(row)
+                return
+        print(f"Erro ao gravar log \"{action}\": banco de dados fechado")
+
+    def flush_logs(self, timeout=None):
+        """Aguarda a gravação de todos os logs enfileirados até agora."""
+        if not self._log_thread.is_alive():
+            return False
+
+        done = threading.Event()
+        self._log_queue.put(done)
+        return done.wait(timeout)
+
+    def _log_writer(self):
+        """Thread que grava os logs em lote, por tamanho ou por tempo."""
+        while True:
+            batch = []
+            waiters = []
+            stop = False
+
+            # Bloqueia até o primeiro item e então junta o que chegar no intervalo
+            item = self._log_queue.get()
+            deadline = time.monotonic() + self.log_flush_interval
+
+            while True:
+                if item is _STOP:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    batch.append(item)
+
+                if stop or waiters or len(batch) >= self.log_batch_size:
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._log_queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+
+            if batch:
+                self._write_logs(batch)
+
+            for waiter in waiters:
+                waiter.set()
+
+            if stop:
+                break
+
+    def _write_logs(self, batch):
+        """Grava um lote de logs em uma única transação."""
         conn = self.get_connection()
         if not conn:
+            print(f"Erro ao gravar logs ({len(batch)} registros): banco de dados indisponível")
+            return
+
+        try:
+            with self.lock, conn:
+                conn.executemany("INSERT INTO logs (timestamp, action, details, level, folder) "
+                                 "VALUES (?, ?, ?, ?, ?)", batch)
+        except sqlite3.Error as e:
+            print(f"Erro ao gravar logs ({len(batch)} registros): {e}")
+
+    def get_logs(self, limit=100):
+        """Retorna os logs mais recentes."""
+        return self.get_logs_before(None, limit)[0]
+
+    def get_logs_before(self, cursor=None, limit=100, level=None, action=None, folder=None):
+        """Retorna uma página de logs mais antigos que o cursor (id), do mais novo ao mais antigo.
+
+        Retorna (logs, próximo_cursor); o próximo cursor é None na última página.
+        """
+        logs = self._query_logs("<", cursor, limit, level, action, folder)
+        next_cursor = logs[-1]["id"] if len(logs) == limit else None
+        return logs, next_cursor
+
+    def get_logs_after(self, cursor, limit=100, level=None, action=None, folder=None):
+        """Retorna os logs mais novos que o cursor (id), do mais antigo ao mais novo."""
+        return self._query_logs(">", cursor, limit, level, action, folder)
+
+    def _query_logs(self, direction, cursor, limit, level, action, folder):
+        """Consulta paginada por id usando os índices de (filtro, id)."""
+        conditions = []
+        params = []
+
+        if cursor is not None:
+            conditions.append(f"id {direction} ?")
+            params.append(cursor)
+        for column, value in (("level", level), ("action", action), ("folder", folder)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        order = "DESC" if direction == "<" else "ASC"
+        params.append(limit)
+
+        try:
+            with self.pool.reader() as conn:
+                return conn.execute(f"SELECT * FROM logs {where} ORDER BY id {order} LIMIT ?",
+                                    params).fetchall()
+        except sqlite3.Error as e:
+            print(f"Erro ao buscar logs: {e}")
             return []
 
+    def purge_logs(self, max_age_days=None, max_rows=None, chunk_size=5000):
+        """Remove logs antigos em blocos, liberando o lock entre eles.
+
+        Retorna a quantidade de registros removidos.
+        """
+        cutoff_id = None
+
+        try:
+            with self.pool.reader() as conn:
+                if max_age_days is not None:
+                    cutoff = datetime.datetime.now() - datetime.timedelta(days=max_age_days)
+                    row = conn.execute("SELECT MAX(id) FROM logs WHERE timestamp < ?",
+                                       (cutoff.strftime("%Y-%m-%d %H:%M:%S"),)).fetchone()
+                    cutoff_id = row[0]
+
+                if max_rows is not None:
+                    row = conn.execute("SELECT id FROM logs ORDER BY id DESC LIMIT 1 OFFSET ?",
+                                       (max_rows,)).fetchone()
+                    if row and (cutoff_id is None or row[0] > cutoff_id):
+                        cutoff_id = row[0]
+        except sqlite3.Error as e:
+            print(f"Erro ao calcular retenção de logs: {e}")
+            return 0
+
+        if cutoff_id is None:
+            return 0
+
+        conn = self.get_connection()
+        if not conn:
+            return 0
+
+        removed = 0
         try:
+            while True:
+                with self.lock:
+                    cursor = conn.execute(
+                        "DELETE FROM logs WHERE id IN "
+                        "(SELECT id FROM logs WHERE id <= ? ORDER BY id LIMIT ?)",
+                        (cutoff_id, chunk_size)
+                    )
+                    conn.commit()
+                removed += cursor.rowcount
+                if cursor.rowcount < chunk_size:
+                    break
+
+            # Devolve ao sistema as páginas liberadas (executescript executa o
+            # pragma até o fim; execute liberaria apenas uma página). Sem efeito
+            # em bancos criados antes do auto_vacuum incremental
             with self.lock:
-                cursor = conn.cursor()
-                cursor.execute("SELECT * FROM monitored_folders WHERE active = 1")
-                return cursor.fetchall()
+                conn.executescript("PRAGMA incremental_vacuum;")
         except sqlite3.Error as e:
-            print(f"Erro ao buscar pastas: {e}")
+            print(f"Erro ao remover logs antigos: {e}")
+
+        return removed
+
+    def apply_ledger_deltas(self, deltas):
+        """Soma variações de (bytes, arquivos) ao registro de espaço em uma transação.
+
+        deltas: lista de (pasta, tipo, bytes, arquivos).
+        """
+        conn = self.get_connection()
+        if not conn or not deltas:
+            return False
+
+        try:
+            with self.lock, conn:
+                conn.executemany(
+                    "INSERT INTO size_ledger (folder, file_type, bytes, files) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (folder, file_type) DO UPDATE SET "
+                    "bytes = bytes + excluded.bytes, files = files + excluded.files",
+                    deltas
+                )
+            return True
+        except sqlite3.Error as e:
+            print(f"Erro ao atualizar registro de espaço: {e}")
+            return False
+
+    def set_ledger_totals(self, totals):
+        """Substitui os totais de (pasta, tipo) após uma contagem completa.
+
+        totals: lista de (pasta, tipo, bytes, arquivos).
+        """
+        conn = self.get_connection()
+        if not conn or not totals:
+            return False
+
+        try:
+            with self.lock, conn:
+                conn.executemany("INSERT OR REPLACE INTO size_ledger (folder, file_type, bytes, files) "
+                                 "VALUES (?, ?, ?, ?)", totals)
+            return True
+        except sqlite3.Error as e:
+            print(f"Erro ao gravar registro de espaço: {e}")
+            return False
+
+    def get_ledger(self):
+        """Retorna todo o registro de espaço por pasta e tipo."""
+        try:
+            with self.pool.reader() as conn:
+                return conn.execute("SELECT * FROM size_ledger").fetchall()
+        except sqlite3.Error as e:
+            print(f"Erro ao buscar registro de espaço: {e}")
             return []
 
-    def add_log(self, action, details):
-        """Adiciona um registro de log (thread-safe)."""
-        # Usa o método async para garantir que seja executado no thread worker
+    def delete_ledger(self, folder):
+        """Remove o registro de espaço de uma pasta."""
+        conn = self.get_connection()
+        if not conn:
+            return False
+
+        try:
+            with self.lock, conn:
+                conn.execute("DELETE FROM size_ledger WHERE folder = ?", (folder,))
+            return True
+        except sqlite3.Error as e:
+            print(f"Erro ao remover registro de espaço: {e}")
+            return False
+
+    def add_file_hash(self, path, size, mtime_ns, partial_hash, full_hash=None):
+        """Registra (ou substitui) o hash de um arquivo organizado."""
+        conn = self.get_connection()
+        if not conn:
+            return False
+
         try:
-            def _add_log(action, details):
-                conn = self.get_connection()
-                if not conn:
-                    return None
+            with self.lock, conn:
+                conn.execute("INSERT OR REPLACE INTO file_hashes "
+                             "(path, size, mtime_ns, partial_hash, full_hash) VALUES (?, ?, ?, ?, ?)",
+                             (path, size, mtime_ns, partial_hash, full_hash))
+            return True
+        except sqlite3.Error as e:
+            print(f"Erro ao registrar hash: {e}")
+            return False
 
-                timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                cursor = conn.cursor()
-                cursor.execute("INSERT INTO logs (timestamp, action, details) VALUES (?, ?, ?)",
-                               (timestamp, action, details))
-                conn.commit()
-                return cursor.lastrowid
+    def find_file_hashes(self, size, partial_hash):
+        """Retorna os arquivos registrados com o mesmo tamanho e hash parcial."""
+        try:
+            with self.pool.reader() as conn:
+                return conn.execute("SELECT * FROM file_hashes WHERE size = ? AND partial_hash = ?",
+                                    (size, partial_hash)).fetchall()
+        except sqlite3.Error as e:
+            print(f"Erro ao buscar hashes: {e}")
+            return []
 
-            # Adiciona o log de forma assíncrona
-            return self.execute_async(_add_log, action, details)
-        except Exception as e:
-            print(f"Erro ao adicionar log (assíncrono): {e}")
+    def set_full_hash(self, path, full_hash):
+        """Guarda o hash completo calculado para um arquivo já registrado."""
+        conn = self.get_connection()
+        if not conn:
+            return False
+
+        try:
+            with self.lock, conn:
+                conn.execute("UPDATE file_hashes SET full_hash = ? WHERE path = ?",
+                             (full_hash, path))
+            return True
+        except sqlite3.Error as e:
+            print(f"Erro ao gravar hash: {e}")
+            return False
+
+    def delete_file_hash(self, path):
+        """Remove um arquivo do índice de hashes (ex.: apagado ou alterado)."""
+        conn = self.get_connection()
+        if not conn:
+            return False
+
+        try:
+            with self.lock, conn:
+                conn.execute("DELETE FROM file_hashes WHERE path = ?", (path,))
+            return True
+        except sqlite3.Error as e:
+            print(f"Erro ao remover hash: {e}")
+            return False
+
+    def journal_plan(self, source, destination, folder, file_type, size, finished=(),
+                     inode=None, mtime_ns=None):
+        """Registra uma movimentação antes de executá-la e retorna o id da entrada.
+
+        inode e mtime_ns identificam o arquivo de origem na recuperação.
+        finished: lista de (id, estado) de entradas já concluídas, gravadas na
+        mesma transação (evita um commit extra por arquivo).
+        """
+        conn = self.get_connection()
+        if not conn:
             return None
 
-    def get_logs(self, limit=100):
-        """Retorna os logs mais recentes."""
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        try:
+            with self.lock, conn:
+                if finished:
+                    conn.executemany("UPDATE move_journal SET state = ? WHERE id = ?",
+                                     [(state, entry_id) for entry_id, state in finished])
+                cursor = conn.execute(
+                    "INSERT INTO move_journal (timestamp, source, destination, folder, file_type, "
+                    "size, inode, mtime_ns, state) VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'planned')",
+                    (timestamp, source, destination, folder, file_type, size, inode, mtime_ns)
+                )
+            return cursor.lastrowid
+        except sqlite3.Error as e:
+            print(f"Erro ao registrar movimentação: {e}")
+            return None
+
+    def journal_finish(self, finished):
+        """Grava o estado final de entradas do diário (lista de (id, estado))."""
+        conn = self.get_connection()
+        if not conn or not finished:
+            return False
+
+        try:
+            with self.lock, conn:
+                conn.executemany("UPDATE move_journal SET state = ? WHERE id = ?",
+                                 [(state, entry_id) for entry_id, state in finished])
+            return True
+        except sqlite3.Error as e:
+            print(f"Erro ao concluir movimentações: {e}")
+            return False
+
+    def journal_pending(self):
+        """Retorna as movimentações registradas e não concluídas (em andamento em uma queda)."""
+        try:
+            with self.pool.reader() as conn:
+                return conn.execute("SELECT * FROM move_journal WHERE state = 'planned' "
+                                    "ORDER BY id").fetchall()
+        except sqlite3.Error as e:
+            print(f"Erro ao buscar movimentações pendentes: {e}")
+            return []
+
+    def journal_history(self, limit=None, folder=None, since=None, until=None):
+        """Retorna as movimentações concluídas, da mais recente para a mais antiga.
+
+        folder inclui as subpastas (monitoramento recursivo); since/until:
+        limites de data e hora ("AAAA-MM-DD HH:MM:SS").
+        """
+        conditions = ["state = 'done'"]
+        params = []
+        if folder is not None:
+            # Subpastas como intervalo (usa o índice): folder + sep <= x < folder + (sep + 1)
+            prefix = os.path.join(folder, "")
+            conditions.append("(folder = ? OR (folder >= ? AND folder < ?))")
+            params.extend((folder, prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)))
+        if since is not None:
+            conditions.append("timestamp >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("timestamp <= ?")
+            params.append(until)
+
+        query = f"SELECT * FROM move_journal WHERE {' AND '.join(conditions)} ORDER BY id DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        try:
+            with self.pool.reader() as conn:
+                return conn.execute(query, params).fetchall()
+        except sqlite3.Error as e:
+            print(f"Erro ao buscar histórico de movimentações: {e}")
+            return []
+
+    def create_plan(self, folder):
+        """Cria um plano de organização vazio e retorna seu id."""
+        conn = self.get_connection()
+        if not conn:
+            return None
+
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        try:
+            with self.lock, conn:
+                cursor = conn.execute("INSERT INTO move_plans (timestamp, folder) VALUES (?, ?)",
+                                      (timestamp, folder))
+            return cursor.lastrowid
+        except sqlite3.Error as e:
+            print(f"Erro ao criar plano: {e}")
+            return None
+
+    def add_plan_entries(self, plan_id, entries):
+        """Grava um lote de movimentos planejados (uma transação por lote).
+
+        entries: lista de (origem, destino, tipo, tamanho, inode, mtime_ns).
+        """
+        conn = self.get_connection()
+        if not conn or not entries:
+            return False
+
+        try:
+            with self.lock, conn:
+                conn.executemany(
+                    "INSERT INTO move_plan_entries (plan_id, source, destination, file_type, "
+                    "size, inode, mtime_ns) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(plan_id,) + tuple(entry) for entry in entries]
+                )
+            return True
+        except sqlite3.Error as e:
+            print(f"Erro ao gravar movimentos do plano: {e}")
+            return False
+
+    def update_plan(self, plan_id, files=None, total_bytes=None, state=None):
+        """Atualiza os totais e/ou o estado (pending, applied) de um plano."""
         conn = self.get_connection()
         if not conn:
+            return False
+
+        assignments = []
+        params = []
+        for column, value in (("files", files), ("bytes", total_bytes), ("state", state)):
+            if value is not None:
+                assignments.append(f"{column} = ?")
+                params.append(value)
+        if not assignments:
+            return True
+
+        try:
+            with self.lock, conn:
+                conn.execute(f"UPDATE move_plans SET {', '.join(assignments)} WHERE id = ?",
+                             params + [plan_id])
+            return True
+        except sqlite3.Error as e:
+            print(f"Erro ao atualizar plano: {e}")
+            return False
+
+    def get_plans(self):
+        """Retorna os planos gravados, do mais recente para o mais antigo."""
+        try:
+            with self.pool.reader() as conn:
+                return conn.execute("SELECT * FROM move_plans ORDER BY id DESC").fetchall()
+        except sqlite3.Error as e:
+            print(f"Erro ao buscar planos: {e}")
             return []
 
+    def get_plan(self, plan_id):
+        """Retorna um plano pelo id, ou None."""
         try:
-            with self.lock:
-                cursor = conn.cursor()
-                cursor.execute("SELECT * FROM logs ORDER BY timestamp DESC LIMIT ?", (limit,))
-                return cursor.fetchall()
+            with self.pool.reader() as conn:
+                return conn.execute("SELECT * FROM move_plans WHERE id = ?",
+                                    (plan_id,)).fetchone()
         except sqlite3.Error as e:
-            print(f"Erro ao buscar logs: {e}")
+            print(f"Erro ao buscar plano: {e}")
+            return None
+
+    def get_plan_entries(self, plan_id, after_id=0, limit=5000):
+        """Retorna uma página de movimentos do plano (paginação por cursor no id)."""
+        try:
+            with self.pool.reader() as conn:
+                return conn.execute(
+                    "SELECT * FROM move_plan_entries WHERE plan_id = ? AND id > ? "
+                    "ORDER BY id LIMIT ?", (plan_id, after_id, limit)
+                ).fetchall()
+        except sqlite3.Error as e:
+            print(f"Erro ao buscar movimentos do plano: {e}")
             return []
 
+    def add_pinned_files(self, files):
+        """Registra arquivos que não devem ser reorganizados (lista de (caminho, inode, mtime_ns))."""
+        conn = self.get_connection()
+        if not conn or not files:
+            return False
+
+        try:
+            with self.lock, conn:
+                conn.executemany("INSERT OR REPLACE INTO pinned_files (path, inode, mtime_ns) "
+                                 "VALUES (?, ?, ?)", files)
+            return True
+        except sqlite3.Error as e:
+            print(f"Erro ao registrar arquivos fixados: {e}")
+            return False
+
+    def get_pinned_files(self):
+        """Retorna todos os arquivos fixados."""
+        try:
+            with self.pool.reader() as conn:
+                return conn.execute("SELECT * FROM pinned_files").fetchall()
+        except sqlite3.Error as e:
+            print(f"Erro ao buscar arquivos fixados: {e}")
+            return []
+
+    def delete_pinned_file(self, path):
+        """Remove um arquivo da lista de fixados."""
+        conn = self.get_connection()
+        if not conn:
+            return False
+
+        try:
+            with self.lock, conn:
+                conn.execute("DELETE FROM pinned_files WHERE path = ?", (path,))
+            return True
+        except sqlite3.Error as e:
+            print(f"Erro ao remover arquivo fixado: {e}")
+            return False
+
+    def set_snapshot(self, folder, data):
+        """Grava o retrato (já serializado) de uma pasta monitorada."""
+        conn = self.get_connection()
+        if not conn:
+            return False
+
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        try:
+            with self.lock, conn:
+                conn.execute("INSERT OR REPLACE INTO folder_snapshots (folder, timestamp, data) "
+                             "VALUES (?, ?, ?)", (folder, timestamp, data))
+            return True
+        except sqlite3.Error as e:
+            print(f"Erro ao gravar retrato da pasta: {e}")
+            return False
+
+    def get_snapshot(self, folder):
+        """Retorna o retrato serializado de uma pasta, ou None."""
+        try:
+            with self.pool.reader() as conn:
+                row = conn.execute("SELECT data FROM folder_snapshots WHERE folder = ?",
+                                   (folder,)).fetchone()
+                return row["data"] if row else None
+        except sqlite3.Error as e:
+            print(f"Erro ao buscar retrato da pasta: {e}")
+            return None
+
+    def delete_snapshot(self, folder):
+        """Remove o retrato de uma pasta e de suas subpastas."""
+        conn = self.get_connection()
+        if not conn:
+            return False
+
+        try:
+            with self.lock, conn:
+                prefix = folder.rstrip(os.sep) + os.sep
+                conn.execute("DELETE FROM folder_snapshots WHERE folder = ? OR substr(folder, 1, ?) = ?",
+                             (folder, len(prefix), prefix))
+            return True
+        except sqlite3.Error as e:
+            print(f"Erro ao remover retrato da pasta: {e}")
+            return False
+
+    def purge_journal(self, max_age_days):
+        """Remove entradas concluídas do diário mais antigas que max_age_days."""
+        conn = self.get_connection()
+        if not conn or max_age_days is None:
+            return 0
+
+        cutoff = datetime.datetime.now() - datetime.timedelta(days=max_age_days)
+        try:
+            with self.lock, conn:
+                cursor = conn.execute("DELETE FROM move_journal WHERE state != 'planned' "
+                                      "AND timestamp < ?",
+                                      (cutoff.strftime("%Y-%m-%d %H:%M:%S"),))
+            return cursor.rowcount
+        except sqlite3.Error as e:
+            print(f"Erro ao remover movimentações antigas: {e}")
+            return 0
+
     def clear_logs(self):
         """Limpa todos os logs do banco de dados."""
         conn = self.get_connection()
@@ -197,7 +861,15 @@ class Database:
             return False
 
     def close(self):
-        """Fecha a conexão com o banco de dados."""
-        if hasattr(self.thread_local, "conn"):
-            self.thread_local.conn.close()
-            delattr(self.thread_local, "conn")
\ No newline at end of file
+        """Grava os logs pendentes e fecha todas as conexões com o banco de dados.
+
+        Logs adicionados depois disso são descartados.
+        """
+        # O marcador entra na fila depois de todos os logs aceitos por add_log
+        with self._log_lock:
+            self._logs_closed = True
+            self._log_queue.put(_STOP)
+        if self._log_thread.is_alive():
+            self._log_thread.join()
+
+        self.pool.close()
@@ -1,35 +1,45 @@
 # main.py
+import time
+
+# Início do processo, antes das demais importações (relatório de inicialização)
+_STARTED = time.monotonic()
+
 import os
 import sys
-from PyQt5.QtWidgets import QApplication
 
-# Importações locais (sem usar 'src')
-from db.database import Database
-from core.logger import Logger
-from core.file_organizer import FileOrganizer
-from core.folder_watcher import FolderWatcher
-from ui.main_window import MainWindow
-from ui.tray_icon import SystemTrayIcon
-from config.settings import Settings
+# Importações locais (sem usar 'src'); PyQt5 só é importado no modo com interface
+from core.services import Services
+from core.startup import StartupTimer
 
 
-def main():
-    # Configura o diretório de trabalho
-    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+def run_headless(base_dir, timer):
+    """Executa apenas o monitoramento, sem importar PyQt5 (servidores sem tela)."""
+    from core.daemon import HeadlessDaemon
+
+    services = Services(base_dir)
+    timer.mark("serviços")
+    return HeadlessDaemon(services, timer).run()
+
+
+def run_gui(base_dir, timer):
+    """Executa o aplicativo com janela e ícone na bandeja.
+
+    O ícone aparece antes do trabalho pesado: o observador, a recuperação do
+    diário e o monitoramento das pastas começam na primeira volta do laço de
+    eventos, e as abas da janela só são montadas quando exibidas.
+    """
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtCore import QTimer
+    from ui.main_window import MainWindow
+    from ui.tray_icon import SystemTrayIcon
 
     # Inicia a aplicação Qt
     app = QApplication(sys.argv)
     app.setApplicationName("Organizador Automático de Pastas")
     app.setQuitOnLastWindowClosed(False)
+    timer.mark("qt")
 
-    # Configurar diretórios
-    data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
-    os.makedirs(data_dir, exist_ok=True)
-
-    logs_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs")
-    os.makedirs(logs_dir, exist_ok=True)
-
-    assets_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+    assets_dir = os.path.join(base_dir, "assets")
     icon_path = os.path.join(assets_dir, "icons", "tray_icon.png")
 
     # Verifica se o ícone existe, se não, cria um diretório e um arquivo vazio
@@ -39,41 +49,60 @@ def main():
             pass
 
     # Inicializar componentes
-    db = Database(os.path.join(data_dir, "app_data.db"))
-    logger = Logger(logs_dir, db)
-    settings = Settings(os.path.join(data_dir, "config.json"))
-
-    # Iniciar organizador e monitor
-    file_organizer = FileOrganizer(logger)
-    folder_watcher = FolderWatcher(file_organizer, logger)
+    services = Services(base_dir)
+    timer.mark("serviços")
 
     # Iniciar interface
-    main_window = MainWindow(db, folder_watcher, logger)
+    main_window = MainWindow(services.db, services.folder_watcher, services.logger,
+                             services.size_ledger, services.move_undo)
     tray_icon = SystemTrayIcon(main_window, icon_path)
 
-    # Iniciar monitoramento
-    folder_watcher.start()
-
     # Mostra o ícone na bandeja
     tray_icon.show()
+    timer.mark("bandeja")
 
     # Se for a primeira execução, mostrar a janela
-    if not settings.get("last_folders"):
+    if not services.settings.get("last_folders"):
         main_window.show()
         tray_icon.show_notification(
             "Organizador de Pastas",
             "Bem-vindo! Adicione pastas para começar a monitorar."
         )
 
+    def finish_startup():
+        # O observador e o pool já rodam quando a janela inicia a organização inicial
+        services.start()
+        timer.mark("observador")
+        main_window.load_folders()
+        timer.mark("pastas")
+        timer.log(services.logger, services.settings.get("startup_target_seconds"))
+        if "--startup-report" in sys.argv[1:]:
+            print(timer.report(), file=sys.stderr)
+
+    QTimer.singleShot(0, finish_startup)
+
     # Executa a aplicação
     exit_code = app.exec_()
 
     # Encerramento
-    folder_watcher.stop()
-    db.close()
+    main_window.stop_background_tasks()
+    services.stop()
 
     return exit_code
 
 
+def main():
+    # Configura o diretório de trabalho
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    os.chdir(base_dir)
+
+    timer = StartupTimer(_STARTED)
+    timer.mark("importações")
+
+    if "--headless" in sys.argv[1:]:
+        return run_headless(base_dir, timer)
+    return run_gui(base_dir, timer)
+
+
 if __name__ == "__main__":
-    sys.exit(main())
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,150 @@
+# tests/test_journal_recovery.py
+import os
+import shutil
+import tempfile
+import unittest
+from db.database import Database
+from core.journal import MoveJournal
+from core.mover import FileMover
+
+
+class _Logger:
+    def info(self, *args, **kwargs):
+        pass
+
+    def error(self, *args, **kwargs):
+        pass
+
+
+class JournalRecoveryTest(unittest.TestCase):
+    """Recuperação após uma queda: só mexe na origem se ainda for o arquivo registrado."""
+
+    def setUp(self):
+        self.base = tempfile.mkdtemp()
+        self.db = Database(os.path.join(self.base, "app_data.db"))
+        self.journal = MoveJournal(self.db, _Logger())
+        self.folder = os.path.join(self.base, "Downloads")
+        self.type_dir = os.path.join(self.folder, "Documentos")
+        os.makedirs(self.type_dir)
+        self.source = os.path.join(self.folder, "inv.pdf")
+        self.destination = os.path.join(self.type_dir, "inv.pdf")
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.base, ignore_errors=True)
+
+    def _write(self, path, data):
+        with open(path, "wb") as f:
+            f.write(data)
+
+    def _read(self, path):
+        with open(path, "rb") as f:
+            return f.read()
+
+    def _plan(self, inode=True):
+        """Cria a origem, a reserva vazia no destino e a entrada "planned"."""
+        self._write(self.source, b"original")
+        open(self.destination, "wb").close()
+        stat = os.stat(self.source)
+        self.journal.plan(self.source, self.destination, self.folder, "documents",
+                          stat.st_size, stat.st_ino if inode else None,
+                          stat.st_mtime_ns if inode else None)
+
+    def _recover(self):
+        # Um diário novo: as conclusões em memória se perderam na queda
+        return MoveJournal(self.db, _Logger()).recover(FileMover())
+
+    def test_interrupted_before_move_is_replayed(self):
+        self._plan()
+        self.assertEqual(self._recover(), {"replayed": 1})
+        self.assertFalse(os.path.exists(self.source))
+        self.assertEqual(self._read(self.destination), b"original")
+
+    def test_finished_move_keeps_new_file_of_same_size(self):
+        self._plan()
+        os.replace(self.source, self.destination)
+        self._write(self.source, b"newfile!")
+
+        self.assertEqual(self._recover(), {"done": 1})
+        self.assertEqual(self._read(self.source), b"newfile!")
+        self.assertEqual(self._read(self.destination), b"original")
+
+    def test_finished_move_keeps_new_file_of_other_size(self):
+        self._plan()
+        os.replace(self.source, self.destination)
+        self._write(self.source, b"a different new file")
+
+        self.assertEqual(self._recover(), {"done": 1})
+        self.assertEqual(self._read(self.source), b"a different new file")
+        self.assertEqual(self._read(self.destination), b"original")
+
+    def test_finished_copy_removes_source(self):
+        self._plan()
+        # Cópia entre dispositivos concluída antes de remover a origem
+        os.unlink(self.destination)
+        shutil.copy2(self.source, self.destination)
+
+        self.assertEqual(self._recover(), {"done": 1})
+        self.assertFalse(os.path.exists(self.source))
+        self.assertEqual(self._read(self.destination), b"original")
+
+    def test_copy_with_other_content_is_not_trusted(self):
+        self._plan()
+        os.unlink(self.destination)
+        shutil.copy2(self.source, self.destination)
+        self._write(self.destination, b"ORIGINAL")
+        shutil.copystat(self.source, self.destination)
+
+        self.assertEqual(self._recover(), {"rolled_back": 1})
+        self.assertEqual(self._read(self.source), b"original")
+        self.assertEqual(self._read(self.destination), b"ORIGINAL")
+
+    def test_occupied_destination_is_not_replaced(self):
+        self._plan()
+        self._write(self.destination, b"someone else's file")
+
+        self.assertEqual(self._recover(), {"rolled_back": 1})
+        self.assertEqual(self._read(self.source), b"original")
+        self.assertEqual(self._read(self.destination), b"someone else's file")
+
+    def test_changed_source_is_left_alone(self):
+        self._plan()
+        self._write(self.source, b"edited after the crash")
+
+        self.assertEqual(self._recover(), {"failed": 1})
+        self.assertEqual(self._read(self.source), b"edited after the crash")
+        self.assertFalse(os.path.exists(self.destination))
+
+    def test_entry_without_identity_is_left_alone(self):
+        self._plan(inode=False)
+
+        self.assertEqual(self._recover(), {"failed": 1})
+        self.assertEqual(self._read(self.source), b"original")
+
+
+class JournalHistoryTest(unittest.TestCase):
+    """Histórico usado pelo desfazer por pasta."""
+
+    def setUp(self):
+        self.base = tempfile.mkdtemp()
+        self.db = Database(os.path.join(self.base, "app_data.db"))
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.base, ignore_errors=True)
+
+    def test_folder_includes_subfolders_only(self):
+        folder = os.path.join(self.base, "Downloads")
+        for parent in (folder, os.path.join(folder, "fotos", "2024"), folder + "-old",
+                       folder + "0"):
+            entry_id = self.db.journal_plan(os.path.join(parent, "a.txt"),
+                                            os.path.join(parent, "Documentos", "a.txt"),
+                                            parent, "documents", 1)
+            self.db.journal_finish([(entry_id, "done")])
+
+        found = {row["folder"] for row in self.db.journal_history(folder=folder)}
+        self.assertEqual(found, {folder, os.path.join(folder, "fotos", "2024")})
+
+
+if __name__ == "__main__":
+    unittest.main()
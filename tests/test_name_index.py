@@ -0,0 +1,31 @@
+# tests/test_name_index.py
+import os
+import tempfile
+import unittest
+from core.name_index import NameIndex
+
+
+class NameIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.dir = self._tmp.name
+        self.names = NameIndex()
+
+    def test_name_freed_after_listing_is_reused(self):
+        path = self.names.reserve(self.dir, "a.pdf")
+        os.unlink(path)
+        self.assertEqual(self.names.reserve(self.dir, "a.pdf"), path)
+
+    def test_occupied_names_get_increasing_suffixes(self):
+        open(os.path.join(self.dir, "a.pdf"), "w").close()
+        self.names.reserve(self.dir, "b.pdf")
+        # Criado por outro processo depois da listagem
+        open(os.path.join(self.dir, "a_1.pdf"), "w").close()
+        self.assertEqual(os.path.basename(self.names.reserve(self.dir, "a.pdf")), "a_2.pdf")
+        self.assertEqual(os.path.basename(self.names.reserve(self.dir, "a.pdf")), "a_3.pdf")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+# tests/test_rules.py
+import os
+import time
+import unittest
+from core.rules import RoutingRules
+from core.scanner import FileRecord
+from core.watch_scope import make_scope
+
+
+class _Logger:
+    def __init__(self):
+        self.warnings = []
+
+    def warning(self, action, details, **kwargs):
+        self.warnings.append(details)
+
+
+def _record(path, size=10, mtime=None):
+    mtime_ns = int((mtime if mtime is not None else time.time()) * 1e9)
+    return FileRecord(path, os.path.basename(path), size, mtime_ns, 1, 1)
+
+
+class RuleValidationTest(unittest.TestCase):
+
+    def test_destination_in_the_file_folder_is_rejected(self):
+        for destination in (".", "./", "{type}/..", "{name}/../."):
+            logger = _Logger()
+            rules = RoutingRules(logger, [{"extensions": ["txt"], "destination": destination}])
+            self.assertFalse(rules, destination)
+            self.assertEqual(len(logger.warnings), 1)
+
+    def test_absolute_destination_equal_to_source_folder_falls_back_to_type(self):
+        folder = os.path.abspath("w")
+        rules = RoutingRules(_Logger(), [{"extensions": ["txt"], "destination": folder}])
+        path = os.path.join(folder, "a.txt")
+        self.assertIsNone(rules.route(path, _record(path), "documents"))
+
+    def test_invalid_numbers_are_reported_once(self):
+        logger = _Logger()
+        rules = RoutingRules(logger, [
+            {"min_size": "big", "destination": "Grandes"},
+            {"max_age_days": [1], "destination": "Antigos"},
+            {"min_size": "1024", "destination": "Medios"},
+        ])
+        self.assertEqual(len(logger.warnings), 2)
+
+        path = os.path.abspath(os.path.join("w", "a.bin"))
+        self.assertEqual(rules.route(path, _record(path, size=2048), "others"),
+                         os.path.join(os.path.dirname(path), "Medios"))
+
+
+class DestinationScopeTest(unittest.TestCase):
+
+    def test_templated_destinations_are_excluded_from_recursive_scopes(self):
+        rules = RoutingRules(_Logger(), [{"extensions": ["jpg"], "destination": "{year}/{month}"}])
+        root = os.path.abspath("w")
+        scope = make_scope(root, max_depth=3, rules=rules)
+
+        path = os.path.join(root, "sub", "a.jpg")
+        routed = rules.route(path, _record(path), "images")
+        self.assertFalse(scope.accepts(os.path.join(routed, "a.jpg")))
+        self.assertFalse(scope.accepts(routed, is_dir=True))
+        self.assertTrue(scope.accepts(path))
+        self.assertTrue(scope.accepts(os.path.join(root, "2026", "a.jpg")))
+
+    def test_absolute_destination_inside_the_folder_is_excluded(self):
+        root = os.path.abspath("w")
+        rules = RoutingRules(_Logger(), [{"extensions": ["jpg"],
+                                          "destination": os.path.join(root, "Fotos", "{year}")}])
+        scope = make_scope(root, max_depth=None, rules=rules)
+
+        self.assertFalse(scope.accepts(os.path.join(root, "Fotos", "2026", "a.jpg")))
+        self.assertTrue(scope.accepts(os.path.join(root, "Fotos", "a.jpg")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+# tests/test_watch_scope.py
+import os
+import ntpath
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+from core import watch_scope
+from core.folder_watcher import FileHandler
+from core.watch_scope import WatchScope
+
+
+# os do Windows: "\\" como separador e "/" como alternativo
+_WINDOWS_OS = SimpleNamespace(path=ntpath, sep="\\", altsep="/", name="nt", scandir=os.scandir)
+
+
+class _Event:
+    def __init__(self, src_path):
+        self.src_path = src_path
+        self.is_directory = False
+
+
+class _Coalescer:
+    def __init__(self):
+        self.created_paths = []
+
+    def created(self, file_path):
+        self.created_paths.append(file_path)
+
+
+class WindowsPathsTest(unittest.TestCase):
+    """Eventos com separadores misturados, como o watchdog gera no Windows."""
+
+    def setUp(self):
+        patcher = mock.patch.object(watch_scope, "os", _WINDOWS_OS)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_relative_accepts_mixed_separators(self):
+        # O diálogo de pastas do Qt devolve "/"; o watchdog junta o nome com "\\"
+        scope = WatchScope("C:/Users/x/Downloads", max_depth=2)
+
+        self.assertEqual(scope.relative("C:/Users/x/Downloads\\a.txt"), "a.txt")
+        self.assertEqual(scope.relative("C:\\Users\\x\\Downloads\\sub\\b.txt"), "sub/b.txt")
+        self.assertIsNone(scope.relative("C:/Users/x/Other\\a.txt"))
+
+    def test_accepts_mixed_separators(self):
+        scope = WatchScope("C:/Users/x/Downloads", max_depth=1, patterns=["*.log"],
+                           excluded_dirs=["Documentos"])
+
+        self.assertTrue(scope.accepts("C:/Users/x/Downloads\\a.txt"))
+        self.assertTrue(scope.accepts("C:/Users/x/Downloads/sub\\b.txt"))
+        self.assertFalse(scope.accepts("C:/Users/x/Downloads\\a.log"))
+        self.assertFalse(scope.accepts("C:/Users/x/Downloads\\Documentos\\c.txt"))
+        self.assertFalse(scope.accepts("C:/Users/x/Downloads\\sub\\deep\\d.txt"))
+
+    def test_handler_delivers_mixed_separator_events(self):
+        coalescer = _Coalescer()
+        scope = WatchScope("C:/Users/x/Downloads", max_depth=1)
+        handler = FileHandler(coalescer, None, scope=scope)
+
+        handler.on_created(_Event("C:/Users/x/Downloads\\a.txt"))
+        self.assertEqual(coalescer.created_paths, ["C:/Users/x/Downloads\\a.txt"])
+
+
+class ScopeCheckTest(unittest.TestCase):
+
+    def test_flat_scope_without_file_patterns_is_not_checked(self):
+        # Padrões só de pastas não excluem nada sem subpastas
+        scope = WatchScope("/tmp/w", max_depth=0, patterns=[".git/", "node_modules/"])
+        self.assertIsNone(FileHandler(_Coalescer(), None, scope=scope).scope)
+
+    def test_flat_scope_with_file_patterns_is_checked(self):
+        scope = WatchScope("/tmp/w", max_depth=0, patterns=["*.log"])
+        self.assertIs(FileHandler(_Coalescer(), None, scope=scope).scope, scope)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,20 +1,54 @@
 # src/ui/main_window.py
 import os
+import json
 from PyQt5.QtWidgets import (QMainWindow, QVBoxLayout, QHBoxLayout, QWidget,
                              QPushButton, QListWidget, QListWidgetItem, QLabel,
                              QFileDialog, QProgressBar, QMessageBox, QDialog,
-                             QTextEdit, QTabWidget)
-from PyQt5.QtCore import Qt, QEvent
+                             QTextEdit, QTabWidget, QComboBox, QInputDialog)
+from PyQt5.QtCore import Qt, QEvent, QTimer
 from config.file_types import FILE_TYPES
+from config.settings import get_setting
+
+# Quantidade de logs carregados por página
+LOGS_PAGE_SIZE = 500
+
+# Intervalo de atualização do andamento da organização inicial (ms)
+SWEEP_STATUS_INTERVAL = 500
+
+# Filtros de nível da aba de logs e prefixos exibidos antes da ação
+LOG_LEVEL_FILTERS = [("Todos", None), ("Informações", "INFO"), ("Avisos", "WARNING"),
+                     ("Erros", "ERROR")]
+LOG_LEVEL_PREFIXES = {"ERROR": "ERRO - ", "WARNING": "AVISO - "}
 
 
 class MainWindow(QMainWindow):
-    def __init__(self, db, folder_watcher, logger, parent=None):
+    """Janela principal.
+
+    Só a aba de pastas é montada na criação; as abas de estatísticas e de logs
+    são montadas e preenchidas na primeira vez em que são exibidas. As pastas
+    são carregadas por load_folders, chamado depois que o ícone da bandeja
+    aparece.
+    """
+
+    def __init__(self, db, folder_watcher, logger, ledger=None, undo=None, parent=None):
         super().__init__(parent)
 
         self.db = db
         self.folder_watcher = folder_watcher
         self.logger = logger
+        # Registro incremental de espaço (sem ele, as estatísticas varrem o disco)
+        self.ledger = ledger
+        # Desfazer movimentações registradas no diário (opcional)
+        self.undo = undo
+        self.undo_worker = None
+
+        # Varredura de estatísticas em andamento (em segundo plano)
+        self.stats_worker = None
+
+        # Acompanha a organização inicial das pastas (feita em segundo plano)
+        self.sweep_timer = QTimer(self)
+        self.sweep_timer.setInterval(SWEEP_STATUS_INTERVAL)
+        self.sweep_timer.timeout.connect(self._update_sweep_status)
 
         self.setWindowTitle("Organizador Automático de Pastas")
         self.setMinimumSize(800, 500)
@@ -45,14 +79,12 @@ class MainWindow(QMainWindow):
         # Configurar layout da tab de pastas
         self._setup_folders_tab()
 
-        # Configurar layout da tab de estatísticas
-        self._setup_stats_tab()
-
-        # Configurar layout da tab de logs
-        self._setup_logs_tab()
-
-        # Carregar pastas monitoradas
-        self.load_folders()
+        # Abas ainda não montadas: aba -> (montagem, preenchimento inicial)
+        self._pending_tabs = {
+            self.stats_tab: (self._setup_stats_tab, self.update_statistics),
+            self.logs_tab: (self._setup_logs_tab, self.update_logs),
+        }
+        self.tabs.currentChanged.connect(self._on_tab_changed)
 
         # Instalar event filter para capturar o evento de minimização
         self.installEventFilter(self)
@@ -67,6 +99,25 @@ class MainWindow(QMainWindow):
                 return True
         return super().eventFilter(source, event)
 
+    def _on_tab_changed(self, index):
+        """Monta a aba na primeira vez em que é exibida."""
+        self._ensure_tab(self.tabs.widget(index))
+
+    def _ensure_tab(self, tab):
+        """Monta e preenche a aba se ainda não foi montada; retorna True se montou agora."""
+        pending = self._pending_tabs.pop(tab, None)
+        if pending is None:
+            return False
+
+        setup, populate = pending
+        setup()
+        populate()
+        return True
+
+    def _is_built(self, tab):
+        """Indica se a aba já foi montada."""
+        return tab not in self._pending_tabs
+
     def _setup_folders_tab(self):
         """Configura a aba de pastas monitoradas."""
         layout = QVBoxLayout(self.folders_tab)
@@ -76,6 +127,15 @@ class MainWindow(QMainWindow):
         self.folders_list.setSelectionMode(QListWidget.SingleSelection)
         layout.addWidget(self.folders_list)
 
+        # Andamento da organização inicial
+        self.sweep_status_label = QLabel("")
+        layout.addWidget(self.sweep_status_label)
+
+        # Andamento de um desfazer em lote
+        self.undo_progress = QProgressBar()
+        self.undo_progress.setVisible(False)
+        layout.addWidget(self.undo_progress)
+
         # Botões
         buttons_layout = QHBoxLayout()
 
@@ -87,6 +147,11 @@ class MainWindow(QMainWindow):
         self.remove_button.clicked.connect(self.remove_folder)
         buttons_layout.addWidget(self.remove_button)
 
+        self.undo_button = QPushButton("Desfazer Movimentações")
+        self.undo_button.clicked.connect(self.undo_moves)
+        self.undo_button.setEnabled(self.undo is not None)
+        buttons_layout.addWidget(self.undo_button)
+
         layout.addLayout(buttons_layout)
 
     def _setup_stats_tab(self):
@@ -110,10 +175,31 @@ class MainWindow(QMainWindow):
         self.stats_layout = QVBoxLayout(self.stats_container)
         layout.addWidget(self.stats_container)
 
-        # Botão para atualizar estatísticas
+        # Progresso da varredura em segundo plano
+        self.stats_status_label = QLabel("")
+        layout.addWidget(self.stats_status_label)
+
+        self.stats_scan_progress = QProgressBar()
+        self.stats_scan_progress.setVisible(False)
+        layout.addWidget(self.stats_scan_progress)
+
+        # Botões para atualizar ou cancelar as estatísticas
+        stats_buttons_layout = QHBoxLayout()
+
         self.update_stats_button = QPushButton("Atualizar Estatísticas")
         self.update_stats_button.clicked.connect(self.update_statistics)
-        layout.addWidget(self.update_stats_button)
+        stats_buttons_layout.addWidget(self.update_stats_button)
+
+        self.recalculate_stats_button = QPushButton("Recalcular")
+        self.recalculate_stats_button.clicked.connect(self.recalculate_statistics)
+        stats_buttons_layout.addWidget(self.recalculate_stats_button)
+
+        self.cancel_stats_button = QPushButton("Cancelar")
+        self.cancel_stats_button.setEnabled(False)
+        self.cancel_stats_button.clicked.connect(self.cancel_statistics)
+        stats_buttons_layout.addWidget(self.cancel_stats_button)
+
+        layout.addLayout(stats_buttons_layout)
 
         # Espaço flexível
         layout.addStretch(1)
@@ -122,6 +208,16 @@ class MainWindow(QMainWindow):
         """Configura a aba de logs."""
         layout = QVBoxLayout(self.logs_tab)
 
+        # Filtro por nível
+        self.log_level_combo = QComboBox()
+        for label, level in LOG_LEVEL_FILTERS:
+            self.log_level_combo.addItem(label, level)
+        self.log_level_combo.currentIndexChanged.connect(self.update_logs)
+        layout.addWidget(self.log_level_combo)
+
+        # Cursor da próxima página de logs mais antigos
+        self.logs_cursor = None
+
         # Widget de texto para os logs
         self.log_text = QTextEdit()
         self.log_text.setReadOnly(True)
@@ -134,6 +230,10 @@ class MainWindow(QMainWindow):
         self.refresh_logs_button.clicked.connect(self.update_logs)
         buttons_layout.addWidget(self.refresh_logs_button)
 
+        self.more_logs_button = QPushButton("Carregar Mais Antigos")
+        self.more_logs_button.clicked.connect(self.load_more_logs)
+        buttons_layout.addWidget(self.more_logs_button)
+
         self.clear_logs_button = QPushButton("Limpar Logs")
         self.clear_logs_button.clicked.connect(self.clear_logs)
         buttons_layout.addWidget(self.clear_logs_button)
@@ -152,15 +252,27 @@ class MainWindow(QMainWindow):
 
             # Verifica se a pasta existe antes de iniciar o monitoramento
             if os.path.exists(folder['path']):
-                # Inicia o monitoramento
-                self.folder_watcher.start_watching(folder['path'])
+                # Inicia o monitoramento com a profundidade e as exclusões da pasta
+                ignore_patterns = (json.loads(folder['ignore_patterns'])
+                                   if folder['ignore_patterns'] else None)
+                self.folder_watcher.start_watching(folder['path'], folder['max_depth'],
+                                                   ignore_patterns)
             else:
                 # Marca a pasta como não existente
                 item.setForeground(Qt.red)
                 item.setText(f"{folder['path']} (Não encontrada)")
-                self.logger.warning("Pasta não encontrada", folder['path'])
+                self.logger.warning("Pasta não encontrada", folder['path'], folder=folder['path'])
 
-        # Atualiza os logs e estatísticas
+        self._update_sweep_status()
+        self.sweep_timer.start()
+
+        # Reconcilia o registro de espaço com o disco em segundo plano (conta os
+        # arquivos que já estavam nas subpastas de tipo antes do registro)
+        if self.ledger:
+            for folder_path in self._existing_folders():
+                self.ledger.schedule_reconcile(folder_path)
+
+        # Atualiza os logs e as estatísticas (se as abas já foram exibidas)
         self.update_logs()
         self.update_statistics()
 
@@ -172,6 +284,9 @@ class MainWindow(QMainWindow):
         )
 
         if folder_path:
+            # Mesmo formato de caminho usado pelo monitor (no Windows o diálogo usa "/")
+            folder_path = os.path.normpath(folder_path)
+
             # Verifica se a pasta já está sendo monitorada
             for i in range(self.folders_list.count()):
                 if self.folders_list.item(i).text() == folder_path:
@@ -189,8 +304,17 @@ class MainWindow(QMainWindow):
                 )
                 return
 
+            # Profundidade de subpastas monitoradas para esta pasta
+            max_depth, accepted = QInputDialog.getInt(
+                self, "Subpastas",
+                "Níveis de subpastas a monitorar (0 = apenas a pasta):",
+                get_setting(self.folder_watcher.settings, "watch_max_depth") or 0, 0, 100
+            )
+            if not accepted:
+                return
+
             # Adiciona ao banco de dados
-            folder_id = self.db.add_folder(folder_path)
+            folder_id = self.db.add_folder(folder_path, max_depth)
 
             if folder_id:
                 # Adiciona à lista
@@ -199,8 +323,14 @@ class MainWindow(QMainWindow):
                 self.folders_list.addItem(item)
 
                 # Inicia o monitoramento
-                self.folder_watcher.start_watching(folder_path)
-                self.logger.info("Pasta adicionada", folder_path)
+                self.folder_watcher.start_watching(folder_path, max_depth)
+                self.logger.info("Pasta adicionada", folder_path, folder=folder_path)
+                self._update_sweep_status()
+                self.sweep_timer.start()
+
+                # Conta o que já existia nas subpastas de tipo da nova pasta
+                if self.ledger:
+                    self.ledger.schedule_reconcile(folder_path)
 
                 # Atualiza logs e estatísticas
                 self.update_logs()
@@ -222,6 +352,7 @@ class MainWindow(QMainWindow):
         # Remove as indicações de "não encontrada" se existirem
         if "(Não encontrada)" in folder_path:
             folder_path = folder_path.split(" (Não encontrada)")[0]
+        folder_path = os.path.normpath(folder_path)
 
         folder_id = item.data(Qt.UserRole)
 
@@ -240,27 +371,75 @@ class MainWindow(QMainWindow):
                 if os.path.exists(folder_path):
                     self.folder_watcher.stop_watching(folder_path)
 
+                if self.ledger:
+                    self.ledger.forget(folder_path)
+
                 # Remove da lista
                 self.folders_list.takeItem(self.folders_list.row(item))
-                self.logger.info("Pasta removida", folder_path)
+                self.logger.info("Pasta removida", folder_path, folder=folder_path)
 
                 # Atualiza logs e estatísticas
                 self.update_logs()
                 self.update_statistics()
 
+    def _update_sweep_status(self):
+        """Mostra o andamento da organização inicial de cada pasta."""
+        progress = self.folder_watcher.sweep_progress()
+        if not progress:
+            self.sweep_status_label.setText("")
+            if self.sweep_timer.isActive():
+                self.sweep_timer.stop()
+                self.update_statistics()
+            return
+
+        lines = []
+        for folder_path, (done, submitted, enumerated) in sorted(progress.items()):
+            total = str(submitted) if enumerated else f"{submitted}+"
+            lines.append(f"Organizando {folder_path}: {done}/{total} arquivos")
+        self.sweep_status_label.setText("\n".join(lines))
+
     def update_statistics(self):
-        """Atualiza as estatísticas de espaço ocupado."""
-        # Limpa as estatísticas anteriores
-        while self.stats_layout.count():
-            item = self.stats_layout.takeAt(0)
-            widget = item.widget()
-            if widget:
-                widget.deleteLater()
+        """Atualiza as estatísticas a partir do registro incremental de espaço."""
+        # A aba é preenchida quando for exibida pela primeira vez
+        if not self._is_built(self.stats_tab):
+            return
+
+        if not self.ledger:
+            self.recalculate_statistics()
+            return
+
+        # Uma varredura em andamento atualiza a tela ao terminar
+        if self.stats_worker is not None:
+            return
+
+        type_stats, _ = self.ledger.totals(self._existing_folders())
+        self._show_statistics(type_stats)
+
+    def recalculate_statistics(self):
+        """Recalcula as estatísticas percorrendo o disco em segundo plano."""
+        if not self._is_built(self.stats_tab):
+            return
 
-        total_space = 0
-        type_stats = {}
+        from ui.statistics_worker import StatisticsWorker
 
-        # Para cada pasta monitorada
+        # Cancela uma varredura anterior ainda em andamento
+        self.cancel_statistics()
+
+        self.stats_worker = StatisticsWorker(self._existing_folders(), self.ledger, self)
+        self.stats_worker.partial.connect(self._on_statistics_partial)
+        self.stats_worker.progress.connect(self._on_statistics_progress)
+        self.stats_worker.completed.connect(self._on_statistics_completed)
+        self.stats_worker.finished.connect(self.stats_worker.deleteLater)
+
+        self.stats_status_label.setText("Calculando estatísticas...")
+        self.stats_scan_progress.setValue(0)
+        self.stats_scan_progress.setVisible(True)
+        self.cancel_stats_button.setEnabled(True)
+        self.stats_worker.start()
+
+    def _existing_folders(self):
+        """Retorna as pastas monitoradas que existem no disco."""
+        folders = []
         for i in range(self.folders_list.count()):
             folder_path = self.folders_list.item(i).text()
 
@@ -269,18 +448,119 @@ class MainWindow(QMainWindow):
                 folder_path = folder_path.split(" (Não encontrada)")[0]
 
             if os.path.exists(folder_path):
-                # Calcula o espaço usado por cada tipo
-                for file_type, data in FILE_TYPES.items():
-                    type_folder = os.path.join(folder_path, data["folder_name"])
+                folders.append(os.path.normpath(folder_path))
+
+        return folders
+
+    def cancel_statistics(self):
+        """Cancela a varredura de estatísticas em andamento."""
+        if self.stats_worker is not None:
+            # Desconecta para que resultados atrasados não sobrescrevam a tela
+            self.stats_worker.partial.disconnect()
+            self.stats_worker.progress.disconnect()
+            self.stats_worker.completed.disconnect()
+            self.stats_worker.cancel()
+            self.stats_worker = None
+
+            self.stats_status_label.setText("Cálculo cancelado")
+            self.stats_scan_progress.setVisible(False)
+            self.cancel_stats_button.setEnabled(False)
+
+    def stop_background_tasks(self):
+        """Interrompe as tarefas em segundo plano antes de encerrar o aplicativo."""
+        self.sweep_timer.stop()
+        worker = self.stats_worker
+        self.cancel_statistics()
+        if worker is not None:
+            worker.wait()
+
+        if self.undo_worker is not None:
+            self.undo_worker.cancel()
+            self.undo_worker.wait()
+
+    def undo_moves(self):
+        """Desfaz as últimas movimentações ou as de uma pasta em um período."""
+        if self.undo is None or self.undo_worker is not None:
+            return
+
+        from ui.undo_dialog import UndoDialog
+        from ui.undo_worker import UndoWorker
+
+        folder_path = None
+        selected_items = self.folders_list.selectedItems()
+        if selected_items:
+            folder_path = os.path.normpath(selected_items[0].text().split(" (Não encontrada)")[0])
+
+        dialog = UndoDialog(folder_path, self)
+        if dialog.exec_() != QDialog.Accepted:
+            return
+
+        self.undo_worker = UndoWorker(self.undo, dialog.selection(), self)
+        self.undo_worker.progress.connect(self._on_undo_progress)
+        self.undo_worker.completed.connect(self._on_undo_completed)
+        self.undo_worker.finished.connect(self.undo_worker.deleteLater)
+
+        self.undo_button.setEnabled(False)
+        self.undo_progress.setValue(0)
+        self.undo_progress.setVisible(True)
+        self.undo_worker.start()
+
+    def _on_undo_progress(self, done, total):
+        """Atualiza a barra de progresso do desfazer."""
+        self.undo_progress.setMaximum(max(total, 1))
+        self.undo_progress.setValue(done)
+        self.undo_progress.setFormat(f"Desfazendo movimentações: {done}/{total}")
+
+    def _on_undo_completed(self, counts, cancelled):
+        """Mostra o resultado do desfazer."""
+        self.undo_worker = None
+        self.undo_button.setEnabled(True)
+        self.undo_progress.setVisible(False)
+
+        message = f"{counts.get('undone', 0)} arquivos devolvidos à pasta de origem."
+        if counts.get("conflict"):
+            message += f"\n{counts['conflict']} mantidos (já existe um arquivo na origem)."
+        if counts.get("missing"):
+            message += f"\n{counts['missing']} não encontrados."
+        if counts.get("error"):
+            message += f"\n{counts['error']} com erro (veja os logs)."
+        if cancelled:
+            message += "\nOperação cancelada."
+        QMessageBox.information(self, "Desfazer Movimentações", message)
+
+        self.update_logs()
+        self.update_statistics()
+
+    def _on_statistics_partial(self, type_stats):
+        """Exibe os totais parciais recebidos do worker."""
+        self._show_statistics(type_stats)
+
+    def _on_statistics_progress(self, done, total, files_seen):
+        """Atualiza a barra de progresso da varredura."""
+        self.stats_scan_progress.setMaximum(max(total, 1))
+        self.stats_scan_progress.setValue(done)
+        self.stats_status_label.setText(
+            f"Calculando estatísticas... {done}/{total} pastas, {files_seen} arquivos"
+        )
+
+    def _on_statistics_completed(self, type_stats, cancelled):
+        """Exibe o resultado final da varredura."""
+        self.stats_worker = None
+        self.stats_scan_progress.setVisible(False)
+        self.cancel_stats_button.setEnabled(False)
+        self.stats_status_label.setText("Cálculo cancelado" if cancelled else "")
+        self._show_statistics(type_stats)
 
-                    if os.path.exists(type_folder):
-                        size = self._get_folder_size(type_folder)
-                        total_space += size
+    def _show_statistics(self, type_stats):
+        """Atualiza os rótulos de espaço ocupado."""
+        # Limpa as estatísticas anteriores
+        while self.stats_layout.count():
+            item = self.stats_layout.takeAt(0)
+            widget = item.widget()
+            if widget:
+                widget.deleteLater()
 
-                        if file_type in type_stats:
-                            type_stats[file_type] += size
-                        else:
-                            type_stats[file_type] = size
+        total_space = sum(type_stats.values())
 
         # Atualiza o total
         total_mb = total_space / (1024 * 1024)  # Bytes para MB
@@ -302,23 +582,49 @@ class MainWindow(QMainWindow):
 
     def update_logs(self):
         """Atualiza a exibição dos logs do sistema."""
+        # A aba é preenchida quando for exibida pela primeira vez
+        if not self._is_built(self.logs_tab):
+            return
+
         # Limpa o widget de texto
         self.log_text.clear()
 
-        # Carrega os logs
-        logs = self.db.get_logs(500)  # Últimos 500 logs
-        log_content = ""
-
-        for log in logs:
-            log_content += f"[{log['timestamp']}] {log['action']}: {log['details']}\n"
+        # Carrega os logs (incluindo os que ainda estão na fila de gravação)
+        self.db.flush_logs()
+        logs, self.logs_cursor = self.db.get_logs_before(
+            None, LOGS_PAGE_SIZE, level=self.log_level_combo.currentData()
+        )
+        self.more_logs_button.setEnabled(self.logs_cursor is not None)
 
-        self.log_text.setText(log_content)
+        self.log_text.setText(self._format_logs(logs))
 
         # Move o cursor para o final para mostrar os logs mais recentes
         cursor = self.log_text.textCursor()
         cursor.movePosition(cursor.End)
         self.log_text.setTextCursor(cursor)
 
+    def load_more_logs(self):
+        """Acrescenta a próxima página de logs mais antigos."""
+        if not self._is_built(self.logs_tab) or self.logs_cursor is None:
+            return
+
+        logs, self.logs_cursor = self.db.get_logs_before(
+            self.logs_cursor, LOGS_PAGE_SIZE, level=self.log_level_combo.currentData()
+        )
+        self.more_logs_button.setEnabled(self.logs_cursor is not None)
+
+        cursor = self.log_text.textCursor()
+        cursor.movePosition(cursor.End)
+        cursor.insertText(self._format_logs(logs))
+
+    def _format_logs(self, logs):
+        """Formata os registros de log para exibição."""
+        lines = []
+        for log in logs:
+            prefix = LOG_LEVEL_PREFIXES.get(log['level'], "")
+            lines.append(f"[{log['timestamp']}] {prefix}{log['action']}: {log['details']}\n")
+        return "".join(lines)
+
     def clear_logs(self):
         """Limpa os logs do sistema."""
         reply = QMessageBox.question(
@@ -341,27 +647,21 @@ class MainWindow(QMainWindow):
                     "A função para limpar logs não está implementada no banco de dados."
                 )
 
-    def _get_folder_size(self, folder_path):
-        """Retorna o tamanho total de uma pasta em bytes."""
-        total_size = 0
-        for dirpath, dirnames, filenames in os.walk(folder_path):
-            for filename in filenames:
-                file_path = os.path.join(dirpath, filename)
-                if os.path.exists(file_path):
-                    total_size += os.path.getsize(file_path)
-        return total_size
-
     def show_logs(self):
         """Mostra a aba de logs e atualiza seu conteúdo."""
+        built = self._ensure_tab(self.logs_tab)
         self.tabs.setCurrentWidget(self.logs_tab)
-        self.update_logs()
+        if not built:
+            self.update_logs()
         self.show()
         self.activateWindow()
 
     def show_stats(self):
         """Mostra a aba de estatísticas e atualiza seu conteúdo."""
+        built = self._ensure_tab(self.stats_tab)
         self.tabs.setCurrentWidget(self.stats_tab)
-        self.update_statistics()
+        if not built:
+            self.update_statistics()
         self.show()
         self.activateWindow()
 
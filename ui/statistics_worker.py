@@ -0,0 +1,101 @@
+# src/ui/statistics_worker.py
+import os
+import time
+from PyQt5.QtCore import QThread, pyqtSignal
+from config.file_types import FILE_TYPES
+from core.scanner import walk_files
+
+# Intervalo mínimo entre resultados parciais enviados à interface (segundos)
+PARTIAL_INTERVAL = 0.25
+
+# A cada quantos arquivos o cancelamento e os parciais são verificados
+CHECK_EVERY = 256
+
+
+class StatisticsWorker(QThread):
+    """Calcula o espaço ocupado por tipo de arquivo fora da thread da interface.
+
+    Quando recebe um SizeLedger, a contagem completa também reconcilia o registro
+    incremental de cada par (pasta, tipo) concluído.
+    """
+
+    # Totais acumulados por tipo ({tipo: bytes}) enquanto a varredura avança
+    partial = pyqtSignal(dict)
+    # Subpastas concluídas, total de subpastas e arquivos encontrados
+    progress = pyqtSignal(int, int, int)
+    # Totais finais e se a varredura foi cancelada
+    completed = pyqtSignal(dict, bool)
+
+    def __init__(self, folders, ledger=None, parent=None):
+        super().__init__(parent)
+        self.folders = list(folders)
+        self.ledger = ledger
+        self._last_partial = 0.0
+        self._files_seen = 0
+
+    def cancel(self):
+        """Solicita o cancelamento da varredura."""
+        self.requestInterruption()
+
+    def run(self):
+        type_stats = {}
+
+        # Cada par (pasta monitorada, subpasta de tipo) é uma unidade de progresso
+        targets = []
+        for folder_path in self.folders:
+            for file_type, data in FILE_TYPES.items():
+                type_folder = os.path.join(folder_path, data["folder_name"])
+                if os.path.isdir(type_folder):
+                    targets.append((folder_path, file_type, type_folder))
+                elif self.ledger:
+                    self.ledger.set_totals(folder_path, file_type, 0, 0)
+
+        self.progress.emit(0, len(targets), 0)
+
+        for done, (folder_path, file_type, type_folder) in enumerate(targets, start=1):
+            if self.ledger:
+                self.ledger.begin_count(folder_path, file_type)
+
+            result = self._get_folder_size(type_folder, type_stats, file_type)
+            if result is None:
+                if self.ledger:
+                    self.ledger.cancel_count(folder_path, file_type)
+                self.completed.emit(type_stats, True)
+                return
+
+            if self.ledger:
+                self.ledger.set_totals(folder_path, file_type, *result)
+
+            self.progress.emit(done, len(targets), self._files_seen)
+
+        self.completed.emit(type_stats, False)
+
+    def _get_folder_size(self, folder_path, type_stats, file_type):
+        """Retorna (bytes, arquivos, caminhos) de uma pasta, emitindo parciais; None se cancelado."""
+        total_size = 0
+        count = 0
+        # Caminhos vistos: o registro não conta duas vezes o que chegou durante a contagem
+        paths = set() if self.ledger else None
+        type_stats.setdefault(file_type, 0)
+
+        for record in walk_files(folder_path):
+            total_size += record.size
+            count += 1
+            if paths is not None:
+                paths.add(record.path)
+            type_stats[file_type] += record.size
+            self._files_seen += 1
+
+            if self._files_seen % CHECK_EVERY:
+                continue
+
+            if self.isInterruptionRequested():
+                return None
+
+            # Envia parciais com frequência limitada para não inundar a interface
+            now = time.monotonic()
+            if now - self._last_partial >= PARTIAL_INTERVAL:
+                self._last_partial = now
+                self.partial.emit(dict(type_stats))
+
+        return total_size, count, paths
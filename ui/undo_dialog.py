@@ -0,0 +1,66 @@
+# src/ui/undo_dialog.py
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QRadioButton, QSpinBox,
+                             QLabel, QDateTimeEdit, QDialogButtonBox)
+from PyQt5.QtCore import QDateTime
+
+# Formato das datas gravadas no diário de movimentações
+JOURNAL_TIME_FORMAT = "yyyy-MM-dd HH:mm:ss"
+# Com segundos: as movimentações do minuto atual também podem ser escolhidas
+DISPLAY_TIME_FORMAT = "dd/MM/yyyy HH:mm:ss"
+
+
+class UndoDialog(QDialog):
+    """Escolhe quais movimentações desfazer: as últimas N ou as de uma pasta em um período."""
+
+    def __init__(self, folder_path=None, parent=None):
+        super().__init__(parent)
+        self.folder_path = folder_path
+
+        self.setWindowTitle("Desfazer Movimentações")
+        layout = QVBoxLayout(self)
+
+        # Últimas N movimentações
+        last_layout = QHBoxLayout()
+        self.last_radio = QRadioButton("Últimas")
+        self.last_radio.setChecked(True)
+        last_layout.addWidget(self.last_radio)
+
+        self.last_spin = QSpinBox()
+        self.last_spin.setRange(1, 10000000)
+        self.last_spin.setValue(100)
+        last_layout.addWidget(self.last_spin)
+        last_layout.addWidget(QLabel("movimentações"))
+        layout.addLayout(last_layout)
+
+        # Movimentações da pasta selecionada em um período
+        self.folder_radio = QRadioButton(
+            f"Movimentações de {folder_path}" if folder_path else "Selecione uma pasta na lista")
+        self.folder_radio.setEnabled(bool(folder_path))
+        layout.addWidget(self.folder_radio)
+
+        range_layout = QHBoxLayout()
+        now = QDateTime.currentDateTime()
+        range_layout.addWidget(QLabel("De"))
+        self.since_edit = QDateTimeEdit(now.addDays(-1))
+        self.since_edit.setDisplayFormat(DISPLAY_TIME_FORMAT)
+        range_layout.addWidget(self.since_edit)
+        range_layout.addWidget(QLabel("até"))
+        self.until_edit = QDateTimeEdit(now)
+        self.until_edit.setDisplayFormat(DISPLAY_TIME_FORMAT)
+        range_layout.addWidget(self.until_edit)
+        layout.addLayout(range_layout)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+    def selection(self):
+        """Retorna os argumentos de MoveUndo.select para a escolha feita."""
+        if self.folder_radio.isChecked():
+            return {
+                "folder": self.folder_path,
+                "since": self.since_edit.dateTime().toString(JOURNAL_TIME_FORMAT),
+                "until": self.until_edit.dateTime().toString(JOURNAL_TIME_FORMAT),
+            }
+        return {"last": self.last_spin.value()}
@@ -0,0 +1,29 @@
+# src/ui/undo_worker.py
+from PyQt5.QtCore import QThread, pyqtSignal
+
+
+class UndoWorker(QThread):
+    """Desfaz movimentações fora da thread da interface."""
+
+    # Movimentações processadas e total
+    progress = pyqtSignal(int, int)
+    # Quantidade por resultado ({"undone": n, "conflict": n, ...}) e se foi cancelado
+    completed = pyqtSignal(dict, bool)
+
+    def __init__(self, undo, selection, parent=None):
+        super().__init__(parent)
+        self.undo = undo
+        # Argumentos de MoveUndo.select (last, folder, since, until)
+        self.selection = dict(selection)
+
+    def cancel(self):
+        """Solicita o cancelamento (o lote em andamento termina antes)."""
+        self.requestInterruption()
+
+    def run(self):
+        entries = self.undo.select(**self.selection)
+        self.progress.emit(0, len(entries))
+
+        counts = self.undo.run(entries, on_progress=self.progress.emit,
+                               is_cancelled=self.isInterruptionRequested)
+        self.completed.emit(counts, self.isInterruptionRequested())